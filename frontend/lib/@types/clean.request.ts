@@ -19,6 +19,10 @@ const schema = z
     trimWhiteSpaces: z.boolean(),
     removeDupRows: z.boolean(),
     enableNormalization: z.boolean(),
+    incremental: z.boolean().optional(),
+    profileStages: z.boolean().optional(),
+    traceMemory: z.boolean().optional(),
+    approximateProfile: z.boolean().nullable().optional(),
   })
   .refine(
     (data) => {
@@ -0,0 +1,271 @@
+// lib/jobs.ts
+import fs from "fs";
+import path from "path";
+import readline from "readline";
+import { randomUUID } from "crypto";
+import { spawn, type ChildProcessWithoutNullStreams } from "child_process";
+
+export const GENERATED_DIR = path.resolve(process.cwd(), "..", "generated");
+
+export type JobStage = "scrape" | "clean" | "train" | "predict";
+
+export const STAGE_SCRIPTS: Record<JobStage, string> = {
+  scrape: "scraper.py",
+  clean: "clean_data.py",
+  train: "train_model.py",
+  predict: "predict.py",
+};
+
+export type JobEvent = {
+  event: string;
+  id?: string;
+  ref?: string;
+  seq?: number;
+  stream?: "stdout" | "stderr";
+  line?: string;
+  status?: "succeeded" | "failed" | "cancelled";
+  exit_code?: number | null;
+  seconds?: number;
+  error?: string | null;
+  workdir?: string;
+  published?: string[];
+  [key: string]: any;
+};
+
+export type JobResult = {
+  id: string;
+  status: "succeeded" | "failed" | "cancelled";
+  exitCode: number | null;
+  seconds: number;
+  workdir?: string;
+  output: string[];
+  error?: string | null;
+};
+
+type Subscriber = {
+  output: string[];
+  onEvent?: (event: JobEvent) => void;
+  resolve: (result: JobResult) => void;
+  reject: (error: Error) => void;
+};
+
+type SchedulerState = {
+  process: ChildProcessWithoutNullStreams;
+  // Job id -> callers waiting on it (several when submissions coalesce)
+  subscribers: Map<string, Subscriber[]>;
+  // Request ref -> handler for the scheduler's reply (and replayed events)
+  requests: Map<string, (event: JobEvent) => void>;
+};
+
+// Kept on globalThis so Next.js hot reloads reuse the running scheduler
+const globalForJobs = globalThis as unknown as { jobScheduler?: SchedulerState };
+
+/**
+ * Python interpreter used for the generated scripts: the project venv when
+ * present, otherwise python on the PATH.
+ */
+export function pythonPath(): string {
+  const candidates = [
+    path.join(GENERATED_DIR, ".venv", "Scripts", "python.exe"), // Windows
+    path.join(GENERATED_DIR, ".venv", "bin", "python"), // macOS/Linux
+  ];
+  return candidates.find((p) => fs.existsSync(p)) ?? "python";
+}
+
+function settle(state: SchedulerState, event: JobEvent) {
+  const subscribers = state.subscribers.get(event.id!) ?? [];
+  for (const subscriber of subscribers) {
+    subscriber.onEvent?.(event);
+    if (event.event === "progress" && event.line !== undefined) {
+      subscriber.output.push(event.line);
+    } else if (event.event === "done") {
+      subscriber.resolve({
+        id: event.id!,
+        status: event.status!,
+        exitCode: event.exit_code ?? null,
+        seconds: event.seconds ?? 0,
+        workdir: event.workdir,
+        output: subscriber.output,
+        error: event.error,
+      });
+    }
+  }
+  if (event.event === "done") state.subscribers.delete(event.id!);
+}
+
+function startScheduler(): SchedulerState {
+  const child = spawn(pythonPath(), [path.join(GENERATED_DIR, "scheduler.py")], {
+    cwd: GENERATED_DIR,
+  });
+  const state: SchedulerState = {
+    process: child,
+    subscribers: new Map(),
+    requests: new Map(),
+  };
+
+  readline.createInterface({ input: child.stdout }).on("line", (line) => {
+    let event: JobEvent;
+    try {
+      event = JSON.parse(line);
+    } catch {
+      console.log(`scheduler: ${line}`);
+      return;
+    }
+
+    if (event.ref) {
+      state.requests.get(event.ref)?.(event);
+    } else if (event.id) {
+      settle(state, event);
+    }
+  });
+
+  child.stderr.on("data", (data) => {
+    console.error(`scheduler stderr: ${data}`);
+  });
+
+  child.on("exit", (code) => {
+    console.error(`Job scheduler exited with code ${code}`);
+    for (const subscribers of state.subscribers.values()) {
+      subscribers.forEach((s) => s.reject(new Error("Job scheduler exited")));
+    }
+    state.subscribers.clear();
+    if (globalForJobs.jobScheduler === state) {
+      globalForJobs.jobScheduler = undefined;
+    }
+  });
+
+  return state;
+}
+
+function getScheduler(): SchedulerState {
+  if (!globalForJobs.jobScheduler) {
+    globalForJobs.jobScheduler = startScheduler();
+  }
+  return globalForJobs.jobScheduler;
+}
+
+function send(state: SchedulerState, request: object) {
+  state.process.stdin.write(JSON.stringify(request) + "\n");
+}
+
+/**
+ * Queues a job with the scheduler (starting it on first use) and resolves
+ * once the job is done. Identical pending jobs are coalesced, so two callers
+ * may wait on the same job id.
+ *
+ * The script defaults to the one currently saved in generated/.
+ */
+export function runJob(
+  stage: JobStage,
+  options: {
+    script?: string;
+    priority?: number;
+    onEvent?: (event: JobEvent) => void;
+  } = {}
+): Promise<JobResult> {
+  const state = getScheduler();
+  const ref = randomUUID();
+  const script =
+    options.script ??
+    fs.readFileSync(path.join(GENERATED_DIR, STAGE_SCRIPTS[stage]), "utf-8");
+
+  return new Promise((resolve, reject) => {
+    state.requests.set(ref, (event) => {
+      state.requests.delete(ref);
+      if (event.event === "error") return reject(new Error(event.error!));
+
+      options.onEvent?.(event);
+      const subscribers = state.subscribers.get(event.id!) ?? [];
+      subscribers.push({ output: [], onEvent: options.onEvent, resolve, reject });
+      state.subscribers.set(event.id!, subscribers);
+    });
+    send(state, { op: "submit", ref, stage, script, priority: options.priority });
+  });
+}
+
+/**
+ * Replays a job's logged events after a sequence number, then follows its
+ * live events. Resolves once the job is done.
+ */
+export function watchJob(
+  id: string,
+  after: number,
+  onEvent: (event: JobEvent) => void
+): Promise<JobResult> {
+  const state = getScheduler();
+  const ref = randomUUID();
+  const output: string[] = [];
+
+  return new Promise((resolve, reject) => {
+    state.requests.set(ref, (event) => {
+      if (event.event === "error") {
+        state.requests.delete(ref);
+        return reject(new Error(event.error!));
+      }
+      if (event.event !== "watched") {
+        // Replayed event
+        onEvent(event);
+        if (event.event === "progress") output.push(event.line!);
+        if (event.event === "done") {
+          state.requests.delete(ref);
+          resolve({
+            id,
+            status: event.status!,
+            exitCode: event.exit_code ?? null,
+            seconds: event.seconds ?? 0,
+            workdir: event.workdir,
+            output,
+            error: event.error,
+          });
+        }
+        return;
+      }
+
+      state.requests.delete(ref);
+      const job = event.job;
+      if (["succeeded", "failed", "cancelled"].includes(job.status)) {
+        // Finished before the requested events
+        return resolve({
+          id,
+          status: job.status,
+          exitCode: job.exit_code,
+          seconds: 0,
+          workdir: job.workdir,
+          output,
+          error: job.error,
+        });
+      }
+
+      // Replay finished and the job is still queued or running
+      const subscribers = state.subscribers.get(id) ?? [];
+      subscribers.push({ output, onEvent, resolve, reject });
+      state.subscribers.set(id, subscribers);
+    });
+    send(state, { op: "watch", ref, id, after });
+  });
+}
+
+/**
+ * Lists the most recent jobs with their status.
+ */
+export function listJobs(): Promise<any[]> {
+  const state = getScheduler();
+  const ref = randomUUID();
+
+  return new Promise((resolve, reject) => {
+    state.requests.set(ref, (event) => {
+      state.requests.delete(ref);
+      if (event.event === "error") reject(new Error(event.error!));
+      else resolve(event.jobs);
+    });
+    send(state, { op: "list", ref });
+  });
+}
+
+/**
+ * Cancels a pending or running job. Callers waiting on it resolve with
+ * status "cancelled".
+ */
+export function cancelJob(id: string) {
+  send(getScheduler(), { op: "cancel", id });
+}
@@ -0,0 +1,130 @@
+// lib/profile.ts
+import fs from "fs";
+import path from "path";
+import { spawn } from "child_process";
+import { GENERATED_DIR, pythonPath } from "@/lib/jobs";
+
+export type ColumnProfile = {
+  name: string;
+  type: "numeric" | "categorical" | "datetime";
+  uniqueValues: number;
+  nullCount: number;
+  sampleValues: any[];
+};
+
+export type DatasetProfile = {
+  source: { file: string; size: number; mtime_ns: string; sha1: string };
+  generatedAt: string;
+  totalRows: number;
+  totalColumns: number;
+  totalCells: number;
+  totalMissingValues: number;
+  completenessRate: number;
+  // null in approximate profiles, which only estimate it (see errorBounds)
+  duplicateRows: number | null;
+  columnStats: {
+    columnName: string;
+    missingCount: number;
+    missingPercentage: number;
+  }[];
+  columns: ColumnProfile[];
+  numericColumns: string[];
+  categoricalColumns: string[];
+  summary: { [key: string]: any };
+  approximate?: boolean;
+  duplicateRowsEstimate?: number;
+  errorBounds?: {
+    uniqueValuesRelativeError: number;
+    duplicateRowsAbsoluteError: number;
+    quantileRankError: number;
+  };
+};
+
+export type ChartViews = {
+  source: DatasetProfile["source"];
+  generatedAt: string;
+  histograms: {
+    [column: string]: { binStart: number; binEnd: number; count: number }[];
+  };
+  groupCounts: { [column: string]: { value: string; count: number }[] };
+  crossTabs: {
+    row: string;
+    column: string;
+    rows: string[];
+    columns: string[];
+    counts: number[][];
+  }[];
+  sample: any[];
+  sampleStratify: string | null;
+};
+
+/**
+ * Reads a JSON sidecar written by the generated Python scripts next to a CSV.
+ * Returns null when it is missing or the CSV changed since it was written.
+ */
+function readSidecar<T extends { source: DatasetProfile["source"] }>(
+  csvPath: string,
+  suffix: string
+): T | null {
+  const sidecarPath = csvPath.replace(/\.csv$/, suffix);
+  if (!fs.existsSync(sidecarPath)) return null;
+
+  try {
+    const sidecar: T = JSON.parse(fs.readFileSync(sidecarPath, "utf-8"));
+    const stat = fs.statSync(csvPath, { bigint: true });
+    if (
+      String(stat.size) !== String(sidecar.source.size) ||
+      String(stat.mtimeNs) !== sidecar.source.mtime_ns
+    ) {
+      return null;
+    }
+    return sidecar;
+  } catch {
+    return null;
+  }
+}
+
+// CSV files whose sidecars are being rebuilt, kept across Next.js hot reloads
+const globalForProfiles = globalThis as unknown as { profileRebuilds?: Set<string> };
+if (!globalForProfiles.profileRebuilds) {
+  globalForProfiles.profileRebuilds = new Set();
+}
+const profileRebuilds = globalForProfiles.profileRebuilds;
+
+/**
+ * Rebuilds a CSV file's profile and chart views in the background with
+ * generated/profile_data.py, once at a time per file.
+ */
+function rebuildSidecars(csvPath: string) {
+  if (profileRebuilds.has(csvPath) || !fs.existsSync(csvPath)) return;
+  profileRebuilds.add(csvPath);
+  const child = spawn(
+    pythonPath(),
+    [path.join(GENERATED_DIR, "profile_data.py"), csvPath],
+    { cwd: GENERATED_DIR, stdio: "ignore" }
+  );
+  const done = () => profileRebuilds.delete(csvPath);
+  child.on("exit", done);
+  child.on("error", done);
+}
+
+/**
+ * Profile written by generated/profile_utils.py. A missing or stale profile
+ * (e.g. discarded by an incremental clean) is rebuilt in the background, so
+ * callers fall back to parsing the CSV only until it is ready.
+ */
+export function readProfile(csvPath: string): DatasetProfile | null {
+  const profile = readSidecar<DatasetProfile>(csvPath, ".profile.json");
+  if (!profile) rebuildSidecars(csvPath);
+  return profile;
+}
+
+/**
+ * Chart views written by generated/chart_utils.py, rebuilt in the background
+ * like the profile when missing or stale.
+ */
+export function readChartViews(csvPath: string): ChartViews | null {
+  const views = readSidecar<ChartViews>(csvPath, ".charts.json");
+  if (!views) rebuildSidecars(csvPath);
+  return views;
+}
@@ -0,0 +1,112 @@
+// lib/row-index.ts
+import fs from "fs";
+import csv from "csv-parser";
+
+// Layout written by generated/csv_utils.py (little-endian):
+// magic(4) version(u32) stride(u32) rows(u64) size(u64) mtime_ns(u64) header_end(u64)
+// fingerprint(20) followed by one u64 byte offset for every stride-th row
+const HEADER_SIZE = 64;
+const MAGIC = "OSIX";
+const VERSION = 2;
+
+export type RowIndex = {
+  stride: number;
+  rows: number;
+  headerEnd: number;
+  offsets: BigUint64Array;
+};
+
+/**
+ * Reads the binary row index next to a CSV file.
+ * Returns null when it is missing or the CSV changed since it was written.
+ */
+export function readRowIndex(csvPath: string): RowIndex | null {
+  const indexPath = csvPath.replace(/\.csv$/, ".idx");
+  if (!fs.existsSync(indexPath)) return null;
+
+  try {
+    const buf = fs.readFileSync(indexPath);
+    if (
+      buf.length < HEADER_SIZE ||
+      buf.toString("ascii", 0, 4) !== MAGIC ||
+      buf.readUInt32LE(4) !== VERSION
+    ) {
+      return null;
+    }
+
+    const stat = fs.statSync(csvPath, { bigint: true });
+    if (
+      buf.readBigUInt64LE(20) !== stat.size ||
+      buf.readBigUInt64LE(28) !== stat.mtimeNs
+    ) {
+      return null;
+    }
+
+    const count = (buf.length - HEADER_SIZE) / 8;
+    const offsets = new BigUint64Array(count);
+    for (let i = 0; i < count; i++) {
+      offsets[i] = buf.readBigUInt64LE(HEADER_SIZE + i * 8);
+    }
+
+    return {
+      stride: buf.readUInt32LE(8),
+      rows: Number(buf.readBigUInt64LE(12)),
+      headerEnd: Number(buf.readBigUInt64LE(36)),
+      offsets,
+    };
+  } catch {
+    return null;
+  }
+}
+
+function collectRows(
+  stream: fs.ReadStream,
+  options: csv.Options,
+  limit: number
+): Promise<any[]> {
+  return new Promise((resolve, reject) => {
+    const rows: any[] = [];
+    stream
+      .pipe(csv(options))
+      .on("data", (row) => {
+        if (rows.length < limit) rows.push(row);
+        if (rows.length >= limit) {
+          resolve(rows);
+          stream.destroy();
+        }
+      })
+      .on("end", () => resolve(rows))
+      .on("error", reject);
+  });
+}
+
+/**
+ * Reads rows [start, stop) by seeking to the nearest indexed offset, so only
+ * those rows (plus at most stride - 1 skipped ones) are parsed.
+ */
+export async function readRows(
+  csvPath: string,
+  index: RowIndex,
+  start: number,
+  stop: number
+): Promise<any[]> {
+  stop = Math.min(stop, index.rows);
+  if (start >= stop || index.headerEnd === 0) return [];
+
+  const [headerRow] = await collectRows(
+    fs.createReadStream(csvPath, { start: 0, end: index.headerEnd - 1 }),
+    { headers: false },
+    1
+  );
+  const headers = Object.values(headerRow ?? {}) as string[];
+
+  const block = Math.floor(start / index.stride);
+  const skip = start - block * index.stride;
+  const rows = await collectRows(
+    fs.createReadStream(csvPath, { start: Number(index.offsets[block]) }),
+    { headers },
+    skip + (stop - start)
+  );
+
+  return rows.slice(skip);
+}
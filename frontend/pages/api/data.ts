@@ -2,6 +2,8 @@
 import fs from "fs";
 import path from "path";
 import csv from "csv-parser";
+import { readProfile } from "@/lib/profile";
+import { readRowIndex, readRows } from "@/lib/row-index";
 import type { NextApiRequest, NextApiResponse } from "next";
 
 type ColumnStats = {
@@ -78,7 +80,7 @@ function calculateStatistics(allData: any[]): {
   };
 }
 
-export default function handler(
+export default async function handler(
   req: NextApiRequest,
   res: NextApiResponse<Data>
 ) {
@@ -107,52 +109,97 @@ export default function handler(
       });
     }
 
+    const startIndex = (page - 1) * pageSize;
+    const endIndex = startIndex + pageSize;
+
+    // With a fresh profile sidecar the statistics are precomputed, so the
+    // CSV only needs to be parsed up to the requested page
+    const profile = readProfile(csvPath);
+
+    let responded = false;
+    const sendPage = (
+      paginatedData: any[],
+      totalRows: number,
+      totalColumns: number,
+      stats: ReturnType<typeof calculateStatistics>
+    ) => {
+      if (responded) return;
+      responded = true;
+
+      const totalPages = Math.ceil(totalRows / pageSize);
+
+      // Validate page number
+      if (page > totalPages && totalRows > 0) {
+        return res.status(400).json({
+          error: `Page ${page} does not exist. Total pages: ${totalPages}`,
+        });
+      }
+
+      res.status(200).json({
+        data: paginatedData,
+        pagination: {
+          page,
+          pageSize,
+          totalRows,
+          totalPages,
+          hasNextPage: page < totalPages,
+          hasPreviousPage: page > 1,
+        },
+        statistics: {
+          totalRows,
+          totalColumns,
+          totalMissingValues: stats.totalMissingValues,
+          completenessRate: stats.completenessRate,
+          columnStats: stats.columnStats,
+        },
+      });
+    };
+
+    // With a fresh row index as well, seek straight to the requested page
+    const rowIndex = profile ? readRowIndex(csvPath) : null;
+    if (profile && rowIndex) {
+      const paginatedData = await readRows(
+        csvPath,
+        rowIndex,
+        startIndex,
+        endIndex
+      );
+      return sendPage(
+        paginatedData,
+        rowIndex.rows,
+        profile.totalColumns,
+        profile
+      );
+    }
+
     const results: any[] = [];
 
-    fs.createReadStream(csvPath)
-      .pipe(csv())
-      .on("data", (data) => results.push(data))
-      .on("end", () => {
-        const totalRows = results.length;
-        const totalPages = Math.ceil(totalRows / pageSize);
-
-        // Validate page number
-        if (page > totalPages && totalRows > 0) {
-          return res.status(400).json({
-            error: `Page ${page} does not exist. Total pages: ${totalPages}`,
-          });
+    const stream = fs.createReadStream(csvPath);
+    const parser = stream.pipe(csv());
+
+    const respond = () =>
+      sendPage(
+        results.slice(startIndex, endIndex),
+        profile ? profile.totalRows : results.length,
+        profile
+          ? profile.totalColumns
+          : results.length > 0
+          ? Object.keys(results[0]).length
+          : 0,
+        profile ?? calculateStatistics(results)
+      );
+
+    parser
+      .on("data", (data) => {
+        results.push(data);
+        if (profile && results.length >= endIndex) {
+          respond();
+          stream.destroy();
         }
-
-        // Calculate pagination
-        const startIndex = (page - 1) * pageSize;
-        const endIndex = startIndex + pageSize;
-        const paginatedData = results.slice(startIndex, endIndex);
-
-        // Calculate statistics
-        const stats = calculateStatistics(results);
-
-        res.status(200).json({
-          data: paginatedData,
-          pagination: {
-            page,
-            pageSize,
-            totalRows,
-            totalPages,
-            hasNextPage: page < totalPages,
-            hasPreviousPage: page > 1,
-          },
-          statistics: {
-            totalRows,
-            totalColumns:
-              results.length > 0 ? Object.keys(results[0]).length : 0,
-            totalMissingValues: stats.totalMissingValues,
-            completenessRate: stats.completenessRate,
-            columnStats: stats.columnStats,
-          },
-        });
       })
+      .on("end", respond)
       .on("error", (err) => {
-        res.status(500).json({ error: err.message });
+        if (!responded) res.status(500).json({ error: err.message });
       });
   } catch (err: any) {
     res.status(500).json({ error: err.message });
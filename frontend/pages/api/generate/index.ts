@@ -74,6 +74,7 @@ ${data.selectors
 
 from scraper_utils import fetch_page, scrape_items, generate_pagination_urls
 from csv_utils import save_to_csv
+from profile_utils import write_profile
 import sys
 
 # Configuration
@@ -86,6 +87,8 @@ PAGES = ${data.pages}`
 }
 CONTAINER_SELECTOR = "${data.container}"
 OUTPUT_FILE = "scraped_data.csv"
+# None: approximate profile above profile_utils.APPROXIMATE_PROFILE_ROWS rows
+APPROXIMATE_PROFILE = None
 
 # Field extractors configuration
 FIELD_EXTRACTORS = {
@@ -95,8 +98,13 @@ ${fieldExtractors}
 FIELDNAMES = ${JSON.stringify(fieldNames)}
 
 
-def main():
-    """Main scraping function"""
+def scrape():
+    """
+    Fetches the configured pages and extracts one row per container.
+    
+    Returns:
+        List of row dicts keyed by FIELDNAMES
+    """
     print("=" * 70)
     print("Web Scraper - Starting")
     print("=" * 70)
@@ -152,11 +160,19 @@ def main():
     `
     }
     
+    return all_data
+
+
+def main():
+    """Main scraping function"""
+    all_data = scrape()
+    
     # Save results to CSV
     print("=" * 70)
     if all_data:
         success = save_to_csv(all_data, FIELDNAMES, OUTPUT_FILE)
         if success:
+            write_profile(OUTPUT_FILE, approximate=APPROXIMATE_PROFILE)
             print(f"\\nSuccessfully scraped {len(all_data)} items!")
             print(f"Data saved to: {OUTPUT_FILE}")
             
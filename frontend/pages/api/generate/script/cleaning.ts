@@ -1,12 +1,9 @@
 // pages/api/clean-data.ts
 import fs from "fs";
 import path from "path";
-import { exec, spawn } from "child_process";
-import { promisify } from "util";
 import type { NextApiRequest, NextApiResponse } from "next";
 import { CleanRequestBodySchema } from "@/lib/@types/clean.request";
-
-const execAsync = promisify(exec);
+import { runJob } from "@/lib/jobs";
 
 type CleanOptions = {
   targetColumn: string;
@@ -24,6 +21,10 @@ type CleanOptions = {
   trimWhiteSpaces: boolean;
   removeDupRows: boolean;
   enableNormalization: boolean;
+  incremental?: boolean;
+  profileStages?: boolean;
+  traceMemory?: boolean;
+  approximateProfile?: boolean | null;
 };
 
 type Data =
@@ -45,6 +46,10 @@ function generateCleaningScript(options: CleanOptions): string {
     trimWhiteSpaces,
     removeDupRows,
     enableNormalization,
+    incremental,
+    profileStages,
+    traceMemory,
+    approximateProfile,
   } = options;
 
   // Determine target column parameter
@@ -56,53 +61,67 @@ function generateCleaningScript(options: CleanOptions): string {
   // Trim whitespaces
   if (trimWhiteSpaces) {
     operations.push(`
-        # Trim whitespaces
-        print("\\nTrimming whitespaces...")
-        df = trim_whitespaces(df)`);
+    # Trim whitespaces
+    print("\\nTrimming whitespaces...")
+    df = timer.run('trim_whitespaces', trim_whitespaces, df)
+`);
   }
 
   // Remove duplicates
   if (removeDupRows) {
     operations.push(`
-        # Remove duplicate rows
-        print("\\nRemoving duplicate rows...")
-        df = remove_duplicates(df)`);
+    # Remove duplicate rows
+    print("\\nRemoving duplicate rows...")
+    df = timer.run('remove_duplicates', remove_duplicates, df, seen_hashes)
+`);
   }
 
   // Null handling strategy
   if (nhs !== "none") {
     const nhsMapping = {
-      rows: `remove_rows_with_nulls(df, ${targetColParam})`,
-      columns: `remove_columns_with_nulls(df)`,
-      mean: `fill_nulls_with_mean(df, ${targetColParam})`,
-      median: `fill_nulls_with_median(df, ${targetColParam})`,
-      mode: `fill_nulls_with_mode(df, ${targetColParam})`,
-      zero: `fill_nulls_with_zero(df, ${targetColParam})`,
-      custom: `fill_nulls_with_custom(df, "${
+      rows: `remove_rows_with_nulls, df, ${targetColParam}`,
+      columns: `remove_columns_with_nulls, df`,
+      mean: `fill_nulls_with_mean, df, ${targetColParam}, fitted['fill']`,
+      median: `fill_nulls_with_median, df, ${targetColParam}, fitted['fill']`,
+      mode: `fill_nulls_with_mode, df, ${targetColParam}, fitted['fill']`,
+      zero: `fill_nulls_with_zero, df, ${targetColParam}`,
+      custom: `fill_nulls_with_custom, df, "${
         customValue || "N/A"
-      }", ${targetColParam})`,
+      }", ${targetColParam}`,
     };
 
     operations.push(`
-        # Handle null values (${nhs})
-        print("\\nHandling null values using strategy: ${nhs}")
-        df = ${nhsMapping[nhs]}`);
+    # Handle null values (${nhs})
+    print("\\nHandling null values using strategy: ${nhs}")
+    df = timer.run('null_handling', ${nhsMapping[nhs]})
+`);
   }
 
   // Normalization
   if (enableNormalization) {
     const normMapping = {
-      mix_max_0_1: `normalize_min_max_0_1(df, ${targetColParam})`,
-      "mix_max_-1_1": `normalize_min_max_neg1_1(df, ${targetColParam})`,
-      z_score_standard: `normalize_z_score(df, ${targetColParam})`,
+      mix_max_0_1: `normalize_min_max_0_1, df, ${targetColParam}, fitted['normalize']`,
+      "mix_max_-1_1": `normalize_min_max_neg1_1, df, ${targetColParam}, fitted['normalize']`,
+      z_score_standard: `normalize_z_score, df, ${targetColParam}, fitted['normalize']`,
     };
 
     operations.push(`
-        #Normalize data (${normalization})
-        print("\\nNormalizing data using: ${normalization}")
-        df = ${normMapping[normalization]}`);
+    #Normalize data (${normalization})
+    print("\\nNormalizing data using: ${normalization}")
+    df = timer.run('normalization', ${normMapping[normalization]})
+`);
   }
 
+  // Cleaning config, hashed by the incremental manifest to detect changes
+  const cleaningConfig = [
+    `    'target_column': '${targetColumn}',`,
+    `    'null_handling': '${nhs}',`,
+    `    'custom_value': ${nhs === "custom" ? `"${customValue || "N/A"}"` : "None"},`,
+    `    'normalization': ${enableNormalization ? `'${normalization}'` : "None"},`,
+    `    'trim_whitespaces': ${trimWhiteSpaces ? "True" : "False"},`,
+    `    'remove_duplicates': ${removeDupRows ? "True" : "False"},`,
+  ].join("\n");
+
   const script = `"""
 Data Cleaning Script
 Generated automatically
@@ -115,9 +134,11 @@ Configuration:
 - Remove Duplicates: ${removeDupRows}
 """
 
+import os
 import pandas as pd
 import sys
 from datetime import datetime
+from typing import Optional
 from clean_utils import (
     remove_rows_with_nulls,
     remove_columns_with_nulls,
@@ -133,17 +154,63 @@ from clean_utils import (
     remove_duplicates,
     print_statistics,
 )
+from incremental_utils import (
+    clean_appended_rows,
+    start_manifest,
+    save_manifest,
+)
+from profile_utils import write_profile, load_profile, discard_profile
+from chart_utils import write_chart_views, discard_chart_views
+from stage_utils import StageTimer, stages_path
+
+# Configuration
+CLEANING_CONFIG = {
+${cleaningConfig}
+}
+
+# Incremental mode re-fits everything when new rows exceed these thresholds
+DRIFT_THRESHOLDS = {
+    'delta_fraction': 0.5,
+    'mean_shift': 0.5,
+    'range_growth': 0.1,
+    'null_rate': 0.05,
+}
+
+
+def clean_frame(df: pd.DataFrame, fitted: dict, seen_hashes: set, timer: StageTimer = None) -> pd.DataFrame:
+    """
+    Applies the configured cleaning steps to a DataFrame.
+    
+    Args:
+        df: DataFrame to clean
+        fitted: Fill and normalization statistics, reused when present and recorded otherwise
+        seen_hashes: Hashes of rows already kept, used to drop duplicates across runs
+        timer: Records each step as a stage (not measured when omitted)
+        
+    Returns:
+        Cleaned DataFrame
+    """
+    timer = timer or StageTimer(enabled=False)
+${operations.join("")}    
+    return df
 
 
-def clean_data(input_file: str, output_file: str):
+def clean_data(input_file: str, output_file: str, incremental: bool = False, profile_stages: bool = True,
+               trace_memory: bool = False, approximate_profile: Optional[bool] = None):
     """
     Cleans the data according to the specified configuration.
     
     Args:
         input_file: Path to input CSV file
         output_file: Path to output CSV file
+        incremental: Only clean rows appended since the last run when possible
+        profile_stages: Record time and row counts per stage (see stage_utils)
+        trace_memory: Also record peak memory per stage (slows Python-heavy stages)
+        approximate_profile: Profile the output with sketches (True), exactly
+                             (False) or by its size (None, see profile_utils)
     """
     start_time = datetime.now()
+    timer = StageTimer(profile_stages, trace_memory)
     
     try:
         print("=" * 70)
@@ -153,22 +220,61 @@ def clean_data(input_file: str, output_file: str):
         print(f"📂 Output file: {output_file}")
         print()
         
+        if incremental:
+            print("Checking for new rows...")
+            appended = clean_appended_rows(
+                input_file, output_file, CLEANING_CONFIG,
+                lambda df, fitted, seen_hashes: clean_frame(df, fitted, seen_hashes, timer),
+                DRIFT_THRESHOLDS
+            )
+            if appended is not None:
+                if appended:
+                    # Rebuilt on next use (profile_data.py) instead of re-reading the whole file
+                    discard_profile(output_file)
+                    discard_chart_views(output_file)
+                timer.print_summary()
+                timer.save(stages_path(output_file))
+                execution_time = (datetime.now() - start_time).total_seconds()
+                print("\\n" + "=" * 70)
+                print(f"✅ Incremental cleaning completed: {appended} rows appended")
+                print(f"⏱️  Execution time: {execution_time:.2f} seconds")
+                print(f"📁 Cleaned data saved to: {output_file}")
+                print("=" * 70)
+                return appended, execution_time
+            print("  Falling back to a full clean\\n")
+        
         # Load data
         print("Loading data...")
-        df = pd.read_csv(input_file)
+        offset = os.path.getsize(input_file)
+        with timer.stage('load') as record:
+            df = pd.read_csv(input_file)
+            record['rows'] = len(df)
         print(f"✓ Loaded {len(df)} rows, {len(df.columns)} columns")
         print(f"  Columns: {', '.join(df.columns)}")
         
         # Display initial statistics
-        print_statistics(df, "Initial Data Statistics")
-          #${operations.join("\n\t\t")}
+        print_statistics(df, "Initial Data Statistics", load_profile(input_file))
+        
+        with timer.stage('start_manifest', len(df)):
+            manifest = start_manifest(input_file, offset, CLEANING_CONFIG, df)
+        df = clean_frame(df, manifest['fitted'], manifest['seen_hashes'], timer)
         
         # Save cleaned data
         print("\\n💾 Saving cleaned data...")
-        df.to_csv(output_file, index=False)
+        with timer.stage('save', len(df)):
+            df.to_csv(output_file, index=False)
+        with timer.stage('save_manifest', len(df)):
+            save_manifest(output_file, manifest, df)
+        with timer.stage('profile', len(df)):
+            profile = write_profile(output_file, df, approximate_profile)
+        with timer.stage('chart_views', len(df)):
+            write_chart_views(output_file, df)
         
         # Display final statistics
-        print_statistics(df, "Final Data Statistics")
+        print_statistics(df, "Final Data Statistics", profile)
+        
+        timer.print_summary()
+        timer.save(stages_path(output_file))
         
         # Execution time
         end_time = datetime.now()
@@ -198,8 +304,13 @@ def clean_data(input_file: str, output_file: str):
 if __name__ == "__main__":
     INPUT_FILE = "scraped_data.csv"
     OUTPUT_FILE = "clean_data.csv"
+    INCREMENTAL = ${incremental ? "True" : "False"}
+    PROFILE_STAGES = ${profileStages === false ? "False" : "True"}
+    TRACE_MEMORY = ${traceMemory ? "True" : "False"}
+    # None: approximate profile above profile_utils.APPROXIMATE_PROFILE_ROWS rows
+    APPROXIMATE_PROFILE = ${approximateProfile == null ? "None" : approximateProfile ? "True" : "False"}
     
-    clean_data(INPUT_FILE, OUTPUT_FILE)
+    clean_data(INPUT_FILE, OUTPUT_FILE, INCREMENTAL, PROFILE_STAGES, TRACE_MEMORY, APPROXIMATE_PROFILE)
 `;
 
   return script;
@@ -254,29 +365,22 @@ export default async function handler(
       });
     }
 
-    const pythonScriptPath = path.join(dir, "clean_data.py");
-    if (!fs.existsSync(pythonScriptPath)) res.redirect("/");
-    const venvPath = path.join(dir, ".venv", "Scripts", "python.exe"); // For macOS/Linux
-    const python = spawn(venvPath, [pythonScriptPath], {
-      cwd: dir,
-    });
-
-    python.stdout.on("data", (data) => {
-      console.log(`stdout: ${data}`);
-    });
-
-    python.stderr.on("data", (data) => {
-      console.error(`stderr: ${data}`);
+    // Queued with the job scheduler and run in a warm worker (see lib/jobs.ts)
+    const result = await runJob("clean", {
+      script,
+      onEvent: (event) => {
+        if (event.event === "progress") console.log(`${event.stream}: ${event.line}`);
+      },
     });
 
-    python.on("close", (code) => {
-      // You don't need the output, just send a success message or handle failure
-      if (code !== 0) {
-        res.status(500).json({ error: "Python script execution failed" });
-      } else {
-        res.redirect("/raw-data");
-      }
-    });
+    if (result.status !== "succeeded") {
+      res.status(500).json({
+        error: `Python script execution ${result.status}`,
+        details: result.output.slice(-20),
+      });
+    } else {
+      res.redirect("/raw-data");
+    }
 
     // Check if output file was created
     // const outputPath = path.join(dir, "clean_data.csv");
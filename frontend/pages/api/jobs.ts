@@ -0,0 +1,71 @@
+import type { NextApiRequest, NextApiResponse } from "next";
+import {
+  cancelJob,
+  listJobs,
+  runJob,
+  watchJob,
+  type JobEvent,
+  type JobStage,
+} from "@/lib/jobs";
+
+const STAGES: JobStage[] = ["scrape", "clean", "train", "predict"];
+
+/**
+ * POST { stage, priority? }: queues the stage's saved script and streams the
+ * job's events as newline-delimited JSON.
+ * GET ?id=&after=: streams a job's events after a sequence number, replaying
+ * logged ones first (to re-attach after a disconnect).
+ * GET: lists recent jobs.
+ * DELETE ?id=: cancels a job.
+ */
+export default async function handler(
+  req: NextApiRequest,
+  res: NextApiResponse
+) {
+  if (req.method === "DELETE") {
+    const id = String(req.query.id ?? "");
+    if (!id) return res.status(400).json({ error: "Job id is required" });
+    cancelJob(id);
+    return res.status(202).json({ message: "Cancellation requested", id });
+  }
+
+  if (req.method === "GET" && !req.query.id) {
+    try {
+      return res.status(200).json({ jobs: await listJobs() });
+    } catch (err: any) {
+      return res.status(500).json({ error: err.message });
+    }
+  }
+
+  if (req.method !== "GET" && req.method !== "POST") {
+    return res.status(405).json({ error: "Method not allowed" });
+  }
+
+  const body =
+    req.method === "POST" && typeof req.body === "string"
+      ? JSON.parse(req.body)
+      : req.body;
+  if (req.method === "POST" && !STAGES.includes(body?.stage)) {
+    return res.status(400).json({ error: `Unknown stage: ${body?.stage}` });
+  }
+
+  res.writeHead(200, {
+    "Content-Type": "application/x-ndjson",
+    "Cache-Control": "no-cache",
+  });
+  const write = (event: JobEvent) => {
+    if (!res.writableEnded) res.write(JSON.stringify(event) + "\n");
+  };
+
+  // Disconnecting does not cancel the job: it stays queued and can be watched again
+  try {
+    if (req.method === "POST") {
+      await runJob(body.stage, { priority: body.priority, onEvent: write });
+    } else {
+      await watchJob(String(req.query.id), Number(req.query.after ?? 0), write);
+    }
+  } catch (err: any) {
+    write({ event: "error", error: err.message });
+  }
+  res.end();
+}
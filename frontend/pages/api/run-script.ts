@@ -3,14 +3,14 @@ import path from "path";
 import csv from "csv-parser";
 
 import type { NextApiRequest, NextApiResponse } from "next";
-import { spawn } from "child_process";
+import { runJob } from "@/lib/jobs";
 
 type Data =
   | {
       [key: string]: any;
     }
   | { error: string; [key: string]: any };
-export default function handler(
+export default async function handler(
   req: NextApiRequest,
   res: NextApiResponse<Data>
 ) {
@@ -20,28 +20,23 @@ export default function handler(
     const dir = path.resolve(process.cwd(), "..", "generated");
 
     const pythonScriptPath = path.join(dir, "scraper.py");
-    if (!fs.existsSync(pythonScriptPath)) res.redirect("/");
-    const venvPath = path.join(dir, ".venv", "Scripts", "python.exe"); // For macOS/Linux
-    const python = spawn(venvPath, [pythonScriptPath], {
-      cwd: dir,
-    });
-
-    python.stdout.on("data", (data) => {
-      console.log(`stdout: ${data}`);
-    });
+    if (!fs.existsSync(pythonScriptPath)) return res.redirect("/");
 
-    python.stderr.on("data", (data) => {
-      console.error(`stderr: ${data}`);
+    // Queued with the job scheduler and run in a warm worker (see lib/jobs.ts)
+    const result = await runJob("scrape", {
+      onEvent: (event) => {
+        if (event.event === "progress") console.log(`${event.stream}: ${event.line}`);
+      },
     });
 
-    python.on("close", (code) => {
-      // You don't need the output, just send a success message or handle failure
-      if (code !== 0) {
-        res.status(500).json({ error: "Python script execution failed" });
-      } else {
-        res.redirect("/raw-data");
-      }
-    });
+    if (result.status !== "succeeded") {
+      res.status(500).json({
+        error: `Python script execution ${result.status}`,
+        details: result.output.slice(-20),
+      });
+    } else {
+      res.redirect("/raw-data");
+    }
   } catch (err: any) {
     res.status(500).json({ error: err.message });
   }
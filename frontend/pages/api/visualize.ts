@@ -2,6 +2,7 @@
 import fs from "fs";
 import path from "path";
 import csv from "csv-parser";
+import { readChartViews, readProfile, type ChartViews } from "@/lib/profile";
 import type { NextApiRequest, NextApiResponse } from "next";
 
 type ColumnInfo = {
@@ -38,6 +39,12 @@ type Data =
         [key: string]: NumericStats | FrequencyData[];
       };
       rawData: any[];
+      charts?: {
+        histograms: ChartViews["histograms"];
+        groupCounts: ChartViews["groupCounts"];
+        crossTabs: ChartViews["crossTabs"];
+        sampleStratify: ChartViews["sampleStratify"];
+      };
     }
   | { error: string };
 
@@ -137,6 +144,63 @@ export default function handler(
       });
     }
 
+    // Serve precomputed statistics from a fresh profile sidecar and only
+    // parse the rows sent for charts
+    const profile = readProfile(csvPath);
+    if (profile) {
+      if (profile.totalRows === 0) {
+        return res.status(404).json({ error: "CSV file is empty" });
+      }
+
+      // Precomputed chart views make the payload independent of the row count
+      const charts = readChartViews(csvPath);
+      if (charts) {
+        return res.status(200).json({
+          columns: profile.columns,
+          numericColumns: profile.numericColumns,
+          categoricalColumns: profile.categoricalColumns,
+          totalRows: profile.totalRows,
+          summary: profile.summary,
+          rawData: charts.sample,
+          charts: {
+            histograms: charts.histograms,
+            groupCounts: charts.groupCounts,
+            crossTabs: charts.crossTabs,
+            sampleStratify: charts.sampleStratify ?? null,
+          },
+        });
+      }
+
+      const rawData: any[] = [];
+      const stream = fs.createReadStream(csvPath);
+      const sendProfile = () => {
+        if (res.headersSent) return;
+        res.status(200).json({
+          columns: profile.columns,
+          numericColumns: profile.numericColumns,
+          categoricalColumns: profile.categoricalColumns,
+          totalRows: profile.totalRows,
+          summary: profile.summary,
+          rawData,
+        });
+      };
+
+      stream
+        .pipe(csv())
+        .on("data", (data) => {
+          rawData.push(data);
+          if (rawData.length >= 100) {
+            sendProfile();
+            stream.destroy();
+          }
+        })
+        .on("end", sendProfile)
+        .on("error", (err) => {
+          if (!res.headersSent) res.status(500).json({ error: err.message });
+        });
+      return;
+    }
+
     const results: any[] = [];
 
     fs.createReadStream(csvPath)
@@ -42,7 +42,17 @@ export default function MLTrainingPage() {
     targetVariable: "",
     featureColumns: [] as string[],
     modelType: "decision_tree" as "decision_tree" | "random_forest",
-    balancingTechnique: "smote" as "smote" | "class_weights" | "both",
+    balancingTechnique: "smote" as
+      | "smote"
+      | "class_weights"
+      | "both"
+      | "undersample"
+      | "cluster_centroids"
+      | "smote_subset"
+      | "all",
+    featureEncoding: "label" as "label" | "sparse",
+    online: false,
+    search: false,
     testSize: 0.2,
     randomState: 42,
   });
@@ -136,6 +146,19 @@ export default function MLTrainingPage() {
     }
   };
 
+  const MODEL_NAMES: Record<string, string> = {
+    baseline: "Baseline",
+    smote_balanced: "SMOTE Balanced",
+    class_weighted: "Class Weighted",
+    undersampled: "Undersampled",
+    cluster_centroids: "Cluster Centroids",
+    smote_subset: "Subset SMOTE",
+    tuned: "Tuned",
+    online: "Online",
+  };
+
+  const getModelName = (name: string) => MODEL_NAMES[name] ?? name;
+
   const getMetricColor = (value: number) => {
     if (value >= 0.8) return "text-green-600";
     if (value >= 0.6) return "text-blue-600";
@@ -271,10 +294,8 @@ export default function MLTrainingPage() {
                     onChange={(e) =>
                       setConfig({
                         ...config,
-                        balancingTechnique: e.target.value as
-                          | "smote"
-                          | "class_weights"
-                          | "both",
+                        balancingTechnique: e.target
+                          .value as typeof config.balancingTechnique,
                       })
                     }
                     className="w-full px-3 py-2 border rounded-md"
@@ -282,12 +303,86 @@ export default function MLTrainingPage() {
                     <option value="smote">SMOTE (Oversampling)</option>
                     <option value="class_weights">Class Weights</option>
                     <option value="both">Both (SMOTE + Class Weights)</option>
+                    <option value="undersample">Random Undersampling</option>
+                    <option value="cluster_centroids">
+                      Cluster-Centroid Undersampling
+                    </option>
+                    <option value="smote_subset">
+                      SMOTE on Subset (Approximate k-NN)
+                    </option>
+                    <option value="all">All (Compare Every Strategy)</option>
                   </select>
                   <p className="text-xs text-muted-foreground mt-1">
                     Technique to handle class imbalance
                   </p>
                 </Field>
 
+                {/* Feature Encoding */}
+                <Field>
+                  <FieldLabel htmlFor="encoding">Feature Encoding</FieldLabel>
+                  <select
+                    id="encoding"
+                    value={config.featureEncoding}
+                    onChange={(e) =>
+                      setConfig({
+                        ...config,
+                        featureEncoding: e.target.value as "label" | "sparse",
+                      })
+                    }
+                    className="w-full px-3 py-2 border rounded-md"
+                  >
+                    <option value="label">Label Encoding</option>
+                    <option value="sparse">
+                      Sparse (One-Hot + Hashed Text)
+                    </option>
+                  </select>
+                  <p className="text-xs text-muted-foreground mt-1">
+                    Sparse encoding suits free-text or high-cardinality columns
+                  </p>
+                </Field>
+
+                {/* Hyperparameter Search */}
+                <Field>
+                  <label className="flex items-center gap-2 cursor-pointer">
+                    <input
+                      id="search"
+                      type="checkbox"
+                      checked={config.search}
+                      onChange={(e) =>
+                        setConfig({ ...config, search: e.target.checked })
+                      }
+                      className="w-4 h-4"
+                    />
+                    <span className="text-sm font-medium">
+                      Hyperparameter Search
+                    </span>
+                  </label>
+                  <p className="text-xs text-muted-foreground mt-1">
+                    Tune depth, leaf size, trees and SMOTE neighbours by
+                    successive halving and add the best as a Tuned Model
+                  </p>
+                </Field>
+
+                {/* Online Updates */}
+                <Field>
+                  <label className="flex items-center gap-2 cursor-pointer">
+                    <input
+                      id="online"
+                      type="checkbox"
+                      checked={config.online}
+                      onChange={(e) =>
+                        setConfig({ ...config, online: e.target.checked })
+                      }
+                      className="w-4 h-4"
+                    />
+                    <span className="text-sm font-medium">Online Updates</span>
+                  </label>
+                  <p className="text-xs text-muted-foreground mt-1">
+                    Update an SGD model with rows added since the last run
+                    instead of retraining from scratch
+                  </p>
+                </Field>
+
                 <Field>
                   <FieldLabel htmlFor="testsize">Test Set Size</FieldLabel>
                   <Input
@@ -486,6 +581,15 @@ export default function MLTrainingPage() {
                               <TableHead className="font-medium">
                                 F1-Score
                               </TableHead>
+                              <TableHead className="font-medium">
+                                Balancing Time
+                              </TableHead>
+                              <TableHead className="font-medium">
+                                Fit Time
+                              </TableHead>
+                              <TableHead className="font-medium">
+                                Peak Memory
+                              </TableHead>
                             </TableRow>
                           </TableHeader>
                           <TableBody>
@@ -495,9 +599,7 @@ export default function MLTrainingPage() {
                                   <TableCell className="font-medium">
                                     {name === "baseline"
                                       ? "Baseline (No Balancing)"
-                                      : name === "smote_balanced"
-                                        ? "SMOTE Balanced"
-                                        : "Class Weighted"}
+                                      : getModelName(name)}
                                   </TableCell>
                                   <TableCell
                                     className={`px-4 py-3 text-center font-mono ${getMetricColor(model.metrics.accuracy)}`}
@@ -519,6 +621,23 @@ export default function MLTrainingPage() {
                                   >
                                     {model.metrics.f1_score.toFixed(4)}
                                   </TableCell>
+                                  <TableCell className="px-4 py-3 text-center font-mono">
+                                    {model.cost?.balance_seconds != null
+                                      ? `${model.cost.balance_seconds.toFixed(2)}s`
+                                      : "—"}
+                                  </TableCell>
+                                  <TableCell className="px-4 py-3 text-center font-mono">
+                                    {model.cost
+                                      ? `${model.cost.fit_seconds.toFixed(2)}s`
+                                      : "—"}
+                                  </TableCell>
+                                  <TableCell className="px-4 py-3 text-center font-mono">
+                                    {model.cost?.peak_memory_mb != null
+                                      ? `${model.cost.peak_memory_mb.toFixed(1)} MB`
+                                      : model.cost
+                                        ? "not traced"
+                                        : "—"}
+                                  </TableCell>
                                 </TableRow>
                               ),
                             )}
@@ -531,6 +650,15 @@ export default function MLTrainingPage() {
                           mean of precision and recall, providing a balanced
                           measure especially useful for imbalanced datasets.
                         </p>
+                        {!result.memory_tracing?.enabled && (
+                          <p className="mt-2">
+                            Peak memory is opt-in: enable memory tracing
+                            (traceMemory in the training request, or
+                            TRAINING_CONFIG[&apos;trace_memory&apos;] = True in
+                            train_model.py) to record it. Tracing slows
+                            balancing and fitting.
+                          </p>
+                        )}
                       </div>
                     </CardContent>
                   </Card>
@@ -543,12 +671,7 @@ export default function MLTrainingPage() {
                       <Card key={name}>
                         <CardHeader>
                           <CardTitle>
-                            Confusion Matrix -{" "}
-                            {name === "baseline"
-                              ? "Baseline"
-                              : name === "smote_balanced"
-                                ? "SMOTE"
-                                : "Class Weighted"}
+                            Confusion Matrix - {getModelName(name)}
                           </CardTitle>
                           <CardDescription>
                             Actual vs Predicted class distribution
@@ -603,6 +726,66 @@ export default function MLTrainingPage() {
                     ),
                   )}
                 </div>
+                {/* Stage Timings */}
+                {result.stages?.length > 0 && (
+                  <Card>
+                    <CardHeader>
+                      <CardTitle>Where the Time Goes</CardTitle>
+                      <CardDescription>
+                        Wall time and CPU time per stage, plus peak traced
+                        memory when memory tracing is enabled
+                      </CardDescription>
+                    </CardHeader>
+                    <CardContent>
+                      <div className="overflow-x-auto">
+                        <Table>
+                          <TableHeader>
+                            <TableRow className="border-b">
+                              <TableHead className="font-medium">Stage</TableHead>
+                              <TableHead className="font-medium">Rows</TableHead>
+                              <TableHead className="font-medium">Wall</TableHead>
+                              <TableHead className="font-medium">CPU</TableHead>
+                              <TableHead className="font-medium">
+                                Peak Memory
+                              </TableHead>
+                            </TableRow>
+                          </TableHeader>
+                          <TableBody>
+                            {result.stages.map((stage: any, i: number) => (
+                              <TableRow key={`${stage.stage}-${i}`}>
+                                <TableCell className="font-medium">
+                                  {stage.stage}
+                                </TableCell>
+                                <TableCell className="px-4 py-3 text-center font-mono">
+                                  {stage.rows ?? "—"}
+                                  {stage.rows_out != null &&
+                                  stage.rows_out !== stage.rows
+                                    ? ` → ${stage.rows_out}`
+                                    : ""}
+                                </TableCell>
+                                <TableCell className="px-4 py-3 text-center font-mono">
+                                  {stage.wall_seconds.toFixed(3)}s
+                                </TableCell>
+                                <TableCell className="px-4 py-3 text-center font-mono">
+                                  {stage.cpu_seconds != null
+                                    ? `${stage.cpu_seconds.toFixed(3)}s`
+                                    : "—"}
+                                </TableCell>
+                                <TableCell className="px-4 py-3 text-center font-mono">
+                                  {stage.peak_memory_mb != null
+                                    ? `${stage.peak_memory_mb.toFixed(1)} MB`
+                                    : result.memory_tracing?.enabled
+                                      ? "—"
+                                      : "not traced"}
+                                </TableCell>
+                              </TableRow>
+                            ))}
+                          </TableBody>
+                        </Table>
+                      </div>
+                    </CardContent>
+                  </Card>
+                )}
                 {/* Best Model Recommendation */}
                 <Card className="border-border bg-card">
                   <CardHeader>
@@ -619,6 +802,7 @@ export default function MLTrainingPage() {
                           f1: model.metrics.f1_score,
                         }),
                       );
+                      if (models.length === 0) return null;
                       const best = models.reduce((a, b) =>
                         a.f1 > b.f1 ? a : b,
                       );
@@ -628,11 +812,7 @@ export default function MLTrainingPage() {
                           <p className="text-lg font-semibold text-green-800">
                             Best performing model:{" "}
                             <strong>
-                              {best.name === "baseline"
-                                ? "Baseline"
-                                : best.name === "smote_balanced"
-                                  ? "SMOTE Balanced"
-                                  : "Class Weighted"}
+                              {getModelName(best.name)}
                             </strong>
                           </p>
                           <p className="text-sm text-green-700">
@@ -76,6 +76,22 @@ type VisualizationData = {
     [key: string]: NumericStats | FrequencyData[];
   };
   rawData: any[];
+  charts?: {
+    histograms: {
+      [key: string]: { binStart: number; binEnd: number; count: number }[];
+    };
+    groupCounts: { [key: string]: { value: string; count: number }[] };
+    crossTabs: CrossTab[];
+    sampleStratify: string | null;
+  };
+};
+
+type CrossTab = {
+  row: string;
+  column: string;
+  rows: string[];
+  columns: string[];
+  counts: number[][];
 };
 
 const COLORS = [
@@ -97,6 +113,7 @@ export default function VisualizationPage() {
   const [error, setError] = useState("");
   const [dataSource, setDataSource] = useState<"raw" | "cleaned">("cleaned");
   const [selectedColumn, setSelectedColumn] = useState<string>("");
+  const [crossColumn, setCrossColumn] = useState<string>("");
 
   const fetchData = async (source: "raw" | "cleaned") => {
     try {
@@ -173,6 +190,22 @@ export default function VisualizationPage() {
   );
   const selectedSummary = data.summary[selectedColumn];
 
+  // Cross-tabs pairing the selected column with another categorical column
+  const crossTabs = (data.charts?.crossTabs ?? []).filter(
+    (tab) => tab.row === selectedColumn || tab.column === selectedColumn
+  );
+  const crossTab =
+    crossTabs.find(
+      (tab) => tab.row === crossColumn || tab.column === crossColumn
+    ) ?? crossTabs[0];
+  const crossPartner = (tab: CrossTab) =>
+    tab.row === selectedColumn ? tab.column : tab.row;
+  const crossMax = crossTab ? Math.max(1, ...crossTab.counts.flat()) : 1;
+  const groupCounts = data.charts?.groupCounts[selectedColumn];
+  const sampleColumns = data.rawData.length
+    ? Object.keys(data.rawData[0])
+    : [];
+
   return (
     <Layout>
       <SiteHeader title="Visualization" />
@@ -448,6 +481,37 @@ export default function VisualizationPage() {
                   </Card>
                 )}
 
+                {/* Precomputed Histogram for Numeric Columns */}
+                {selectedColumnData.type === "numeric" &&
+                  data.charts?.histograms[selectedColumn] && (
+                    <Card>
+                      <CardHeader>
+                        <CardTitle>{selectedColumn} - Histogram</CardTitle>
+                        <CardDescription>
+                          Value counts per bin across all rows
+                        </CardDescription>
+                      </CardHeader>
+                      <CardContent>
+                        <ResponsiveContainer width="100%" height={300}>
+                          <BarChart
+                            data={data.charts.histograms[selectedColumn].map(
+                              (bin) => ({
+                                range: `${bin.binStart.toFixed(1)}-${bin.binEnd.toFixed(1)}`,
+                                count: bin.count,
+                              })
+                            )}
+                          >
+                            <CartesianGrid strokeDasharray="3 3" />
+                            <XAxis dataKey="range" />
+                            <YAxis />
+                            <Tooltip />
+                            <Bar dataKey="count" fill="#8884d8" />
+                          </BarChart>
+                        </ResponsiveContainer>
+                      </CardContent>
+                    </Card>
+                  )}
+
                 {/* Frequency Chart for Categorical Columns */}
                 {selectedColumnData.type === "categorical" &&
                   Array.isArray(selectedSummary) && (
@@ -560,9 +624,158 @@ export default function VisualizationPage() {
                       </Card>
                     </>
                   )}
+
+                {/* Precomputed Group Counts for Categorical Columns */}
+                {selectedColumnData.type === "categorical" && groupCounts && (
+                  <Card>
+                    <CardHeader>
+                      <CardTitle>{selectedColumn} - Group Counts</CardTitle>
+                      <CardDescription>
+                        Rows per value across all rows, less frequent values
+                        grouped as Other
+                      </CardDescription>
+                    </CardHeader>
+                    <CardContent>
+                      <ResponsiveContainer width="100%" height={300}>
+                        <BarChart data={groupCounts}>
+                          <CartesianGrid strokeDasharray="3 3" />
+                          <XAxis
+                            dataKey="value"
+                            angle={-45}
+                            textAnchor="end"
+                            height={100}
+                          />
+                          <YAxis />
+                          <Tooltip />
+                          <Bar dataKey="count" fill="#82CA9D" name="Rows" />
+                        </BarChart>
+                      </ResponsiveContainer>
+                    </CardContent>
+                  </Card>
+                )}
+
+                {/* Precomputed Cross-Tabulation with another Column */}
+                {crossTab && (
+                  <Card>
+                    <CardHeader>
+                      <CardTitle>
+                        {selectedColumn} × {crossPartner(crossTab)} -
+                        Cross-Tabulation
+                      </CardTitle>
+                      <CardDescription>
+                        Rows for each pair of values across all rows
+                      </CardDescription>
+                    </CardHeader>
+                    <CardContent className="space-y-4">
+                      {crossTabs.length > 1 && (
+                        <Select
+                          value={crossPartner(crossTab)}
+                          onValueChange={setCrossColumn}
+                        >
+                          <SelectTrigger className="w-64">
+                            <SelectValue placeholder="Compare with..." />
+                          </SelectTrigger>
+                          <SelectContent>
+                            {crossTabs.map((tab) => (
+                              <SelectItem
+                                key={crossPartner(tab)}
+                                value={crossPartner(tab)}
+                              >
+                                {crossPartner(tab)}
+                              </SelectItem>
+                            ))}
+                          </SelectContent>
+                        </Select>
+                      )}
+                      <div className="overflow-x-auto">
+                        <table className="text-xs">
+                          <thead>
+                            <tr className="border-b">
+                              <th className="px-2 py-1 text-left font-medium">
+                                {crossTab.row} / {crossTab.column}
+                              </th>
+                              {crossTab.columns.map((col) => (
+                                <th
+                                  key={col}
+                                  className="px-2 py-1 text-right font-medium"
+                                >
+                                  {col}
+                                </th>
+                              ))}
+                            </tr>
+                          </thead>
+                          <tbody>
+                            {crossTab.rows.map((row, i) => (
+                              <tr key={row} className="border-b">
+                                <td className="px-2 py-1 font-medium">{row}</td>
+                                {crossTab.counts[i].map((count, j) => (
+                                  <td
+                                    key={j}
+                                    className="px-2 py-1 text-right font-mono"
+                                    style={{
+                                      backgroundColor: `rgba(136, 132, 216, ${
+                                        count / crossMax
+                                      })`,
+                                    }}
+                                  >
+                                    {count}
+                                  </td>
+                                ))}
+                              </tr>
+                            ))}
+                          </tbody>
+                        </table>
+                      </div>
+                    </CardContent>
+                  </Card>
+                )}
               </>
             )}
 
+            {/* Row Sample from the precomputed chart views */}
+            {data.charts && data.rawData.length > 0 && (
+              <Card>
+                <CardHeader>
+                  <CardTitle>Sample Rows</CardTitle>
+                  <CardDescription>
+                    {data.rawData.length} of {data.totalRows} rows,{" "}
+                    {data.charts.sampleStratify
+                      ? `stratified by ${data.charts.sampleStratify}`
+                      : "drawn uniformly at random"}
+                  </CardDescription>
+                </CardHeader>
+                <CardContent>
+                  <div className="overflow-auto max-h-96">
+                    <table className="w-full text-xs">
+                      <thead>
+                        <tr className="border-b">
+                          {sampleColumns.map((col) => (
+                            <th
+                              key={col}
+                              className="px-2 py-1 text-left font-medium"
+                            >
+                              {col}
+                            </th>
+                          ))}
+                        </tr>
+                      </thead>
+                      <tbody>
+                        {data.rawData.map((row, idx) => (
+                          <tr key={idx} className="border-b">
+                            {sampleColumns.map((col) => (
+                              <td key={col} className="px-2 py-1">
+                                {String(row[col])}
+                              </td>
+                            ))}
+                          </tr>
+                        ))}
+                      </tbody>
+                    </table>
+                  </div>
+                </CardContent>
+              </Card>
+            )}
+
             <Card>
               <CardHeader>
                 <CardTitle>Column Overview</CardTitle>
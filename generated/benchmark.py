@@ -0,0 +1,282 @@
+"""
+Scale Benchmark Script
+Times each clean_utils function, the full clean_data() pipeline and
+train_models() on synthetic datasets of increasing size, generated with the
+schema and value distributions of scraped_data.csv (see synthetic_utils).
+Records wall time, CPU time, throughput and peak traced memory per
+benchmark and size to JSON, and flags benchmarks whose time or memory grows
+faster than the row count.
+
+Usage: python benchmark.py [sizes...]   (e.g. python benchmark.py 10000 1000000)
+"""
+
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import sklearn
+from datetime import datetime
+from typing import Callable, Dict, List
+from clean_utils import (
+    hash_rows,
+    remove_rows_with_nulls,
+    remove_columns_with_nulls,
+    fill_nulls_with_mean,
+    fill_nulls_with_median,
+    fill_nulls_with_mode,
+    fill_nulls_with_zero,
+    fill_nulls_with_custom,
+    normalize_min_max_0_1,
+    normalize_min_max_neg1_1,
+    normalize_z_score,
+    trim_whitespaces,
+    remove_duplicates,
+)
+from feature_utils import cache_dir
+from synthetic_utils import load_schema, write_synthetic_csv
+from clean_data import clean_data
+from train_model import TRAINING_CONFIG, train_models
+
+BENCHMARK_DIR = 'benchmark_data'
+SUPERLINEAR_EXPONENT = 1.2   # growth exponent (time ~ rows^k) above which scaling is flagged
+MIN_SCALING_SECONDS = 0.5    # shorter timings are dominated by fixed costs and not judged
+
+# clean_utils functions, each given its own copy of the loaded data
+CLEAN_FUNCTIONS: Dict[str, Callable[[pd.DataFrame], object]] = {
+    'trim_whitespaces': trim_whitespaces,
+    'remove_duplicates': remove_duplicates,
+    'remove_duplicates [seen_hashes]': lambda df: remove_duplicates(df, set()),
+    'remove_rows_with_nulls': lambda df: remove_rows_with_nulls(df, 'all'),
+    'remove_columns_with_nulls': remove_columns_with_nulls,
+    'fill_nulls_with_mean': lambda df: fill_nulls_with_mean(df, 'all', {}),
+    'fill_nulls_with_median': lambda df: fill_nulls_with_median(df, 'all', {}),
+    'fill_nulls_with_mode': lambda df: fill_nulls_with_mode(df, 'all', {}),
+    'fill_nulls_with_zero': lambda df: fill_nulls_with_zero(df, 'all'),
+    'fill_nulls_with_custom': lambda df: fill_nulls_with_custom(df, 'N/A', 'all'),
+    'normalize_min_max_0_1': lambda df: normalize_min_max_0_1(df, 'all', {}),
+    'normalize_min_max_neg1_1': lambda df: normalize_min_max_neg1_1(df, 'all', {}),
+    'normalize_z_score': lambda df: normalize_z_score(df, 'all', {}),
+    'hash_rows': hash_rows,
+}
+
+
+def _measure(name: str, rows: int, step: Callable, setup: Callable = None, trace_memory: bool = True) -> Dict:
+    """
+    Runs one benchmark with its output silenced, recording wall and CPU time,
+    throughput and peak traced memory, or the error that stopped it.
+
+    tracemalloc slows down code that allocates many Python objects several
+    times over, so times come from an untraced run and peak memory from a
+    second, traced one.
+
+    Args:
+        name: Benchmark name
+        rows: Rows processed
+        step: Function to measure, given setup's result when setup is set
+        setup: Prepares a fresh input for each run, outside the measurement
+        trace_memory: Measure peak memory (runs the step twice)
+
+    Returns:
+        Benchmark record
+    """
+    record = {'benchmark': name, 'rows': rows}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            args = (setup(),) if setup else ()
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            step(*args)
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 4)
+            record['cpu_seconds'] = round(time.process_time() - cpu_start, 4)
+            del args
+
+            if trace_memory:
+                args = (setup(),) if setup else ()
+                tracemalloc.start()
+                try:
+                    step(*args)
+                    record['peak_memory_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+                finally:
+                    tracemalloc.stop()
+                del args
+    except (Exception, SystemExit) as e:
+        record['error'] = str(e) or type(e).__name__
+
+    wall = record.get('wall_seconds')
+    record['rows_per_second'] = round(rows / wall) if wall else None
+    peak = record.get('peak_memory_mb')
+    status = f"❌ {record['error']}" if 'error' in record else f"{record['rows_per_second'] or 0:,} rows/s"
+    print(f"  {name:<34}{'' if wall is None else f'{wall:.3f}s':>10}"
+          f"{'' if peak is None else f'{peak:.1f} MB':>12}  {status}")
+    return record
+
+
+def benchmark_size(schema: Dict, n_rows: int, training_config: Dict, seed: int = 42,
+                   trace_memory: bool = True) -> List[Dict]:
+    """
+    Runs every benchmark on a synthetic dataset of one size.
+
+    Args:
+        schema: Schema from synthetic_utils.fit_schema
+        n_rows: Number of rows
+        training_config: Configuration passed to train_models
+        seed: Random seed of the synthetic data
+        trace_memory: Measure peak memory (runs each benchmark twice)
+
+    Returns:
+        Benchmark records
+    """
+    print(f"\n📏 {n_rows:,} rows")
+    input_file = os.path.join(BENCHMARK_DIR, f'synthetic_{n_rows}.csv')
+    output_file = os.path.join(BENCHMARK_DIR, f'synthetic_{n_rows}_clean.csv')
+    print("  Generating data...")
+    write_synthetic_csv(schema, input_file, n_rows, seed)
+
+    records = [_measure('read_csv', n_rows, lambda: pd.read_csv(input_file), trace_memory=trace_memory)]
+    if 'error' not in records[0]:
+        df = pd.read_csv(input_file)
+        for name, function in CLEAN_FUNCTIONS.items():
+            records.append(_measure(name, n_rows, function, df.copy, trace_memory))
+        del df
+
+    records.append(_measure('clean_data', n_rows, lambda: clean_data(input_file, output_file, False, False),
+                            trace_memory=trace_memory))
+    if os.path.isfile(output_file):
+        clean_rows = sum(1 for _ in open(output_file, 'r', encoding='utf-8')) - 1
+        records.append(_measure(
+            'train_models', clean_rows, lambda _: train_models(output_file, None, training_config),
+            # Cold runs: no encoded features from an earlier run
+            lambda: shutil.rmtree(cache_dir(output_file), ignore_errors=True), trace_memory
+        ))
+
+    return records
+
+
+def scaling_report(records: List[Dict]) -> List[Dict]:
+    """
+    Compares consecutive sizes of each benchmark: the growth exponent k in
+    cost ~ rows^k is about 1 for linear scaling.
+
+    Args:
+        records: Benchmark records over several sizes
+
+    Returns:
+        One entry per benchmark and pair of sizes, with 'superlinear' set when
+        time or memory grows with an exponent above SUPERLINEAR_EXPONENT
+    """
+    report = []
+    by_benchmark: Dict[str, List[Dict]] = {}
+    for record in records:
+        if 'error' not in record and record['rows']:
+            by_benchmark.setdefault(record['benchmark'], []).append(record)
+
+    for name, runs in by_benchmark.items():
+        runs = sorted(runs, key=lambda r: r['rows'])
+        for small, large in zip(runs, runs[1:]):
+            if large['rows'] <= small['rows']:
+                continue
+            growth = math.log(large['rows'] / small['rows'])
+            entry = {'benchmark': name, 'from_rows': small['rows'], 'to_rows': large['rows']}
+            for measure, key, floor in (('time', 'wall_seconds', MIN_SCALING_SECONDS),
+                                        ('memory', 'peak_memory_mb', 1.0)):
+                if small.get(key) and large.get(key, 0) >= floor:
+                    entry[f'{measure}_exponent'] = round(math.log(large[key] / small[key]) / growth, 2)
+            entry['superlinear'] = [
+                measure for measure in ('time', 'memory')
+                if entry.get(f'{measure}_exponent', 0) > SUPERLINEAR_EXPONENT
+            ]
+            report.append(entry)
+    return report
+
+
+def run_benchmarks(source_file: str, sizes: List[int], output_file: str, seed: int = 42,
+                   trace_memory: bool = True) -> Dict:
+    """
+    Benchmarks cleaning and training at each size and saves the results.
+
+    Args:
+        source_file: CSV whose schema and distributions the synthetic data follows
+        sizes: Row counts
+        output_file: Results JSON filename
+        seed: Random seed of the synthetic data
+        trace_memory: Measure peak memory (runs each benchmark twice)
+
+    Returns:
+        Results dict
+    """
+    start_time = datetime.now()
+    print("=" * 70)
+    print("⏱️  Scale Benchmark - Starting")
+    print("=" * 70)
+    print(f"📂 Source schema: {source_file}")
+    print(f"📏 Sizes: {', '.join(f'{n:,}' for n in sizes)}")
+
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    schema = load_schema(source_file, os.path.join(BENCHMARK_DIR, 'schema.json'))
+    # Measured from outside, and no model files written over the trained ones
+    training_config = {**TRAINING_CONFIG, 'profile_stages': False, 'save_model': False}
+
+    records = []
+    for n_rows in sorted(sizes):
+        records.extend(benchmark_size(schema, n_rows, training_config, seed, trace_memory))
+
+    scaling = scaling_report(records)
+    flagged = [entry for entry in scaling if entry['superlinear']]
+
+    results = {
+        'created': datetime.now().isoformat(),
+        'source_file': source_file,
+        'sizes': sorted(sizes),
+        'seed': seed,
+        'trace_memory': trace_memory,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'scikit-learn': sklearn.__version__,
+        },
+        'superlinear_exponent': SUPERLINEAR_EXPONENT,
+        'benchmarks': records,
+        'scaling': scaling,
+    }
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print("\n" + "=" * 70)
+    if flagged:
+        print(f"⚠️  Super-linear scaling in {len(flagged)} case(s):")
+        for entry in flagged:
+            exponents = ', '.join(f"{m} ~ rows^{entry[f'{m}_exponent']}" for m in entry['superlinear'])
+            print(f"  {entry['benchmark']}: {entry['from_rows']:,} → {entry['to_rows']:,} rows ({exponents})")
+    else:
+        print("✓ No super-linear scaling detected")
+    print(f"⏱️  Execution time: {(datetime.now() - start_time).total_seconds():.2f} seconds")
+    print(f"📁 Results saved to: {output_file}")
+    print("=" * 70)
+    return results
+
+
+if __name__ == "__main__":
+    SOURCE_FILE = "scraped_data.csv"
+    OUTPUT_FILE = "benchmark_results.json"
+    SIZES = [int(arg.replace('_', '')) for arg in sys.argv[1:]] or [10_000, 1_000_000, 10_000_000]
+    SEED = 42
+    TRACE_MEMORY = True
+
+    try:
+        run_benchmarks(SOURCE_FILE, SIZES, OUTPUT_FILE, SEED, TRACE_MEMORY)
+    except Exception as e:
+        print(f"\n❌ An error occurred: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,251 @@
+# chart_utils.py
+"""
+Chart aggregation utilities
+Precomputes chart-ready views (histograms, group-by counts, cross-tabs and a
+row sample) after cleaning, so the visualization page receives payloads whose
+size does not depend on the number of rows
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+from profile_utils import file_key, read_csv_cells
+
+HISTOGRAM_BINS = 20
+TOP_GROUPS = 20
+MAX_CROSSTAB_CARDINALITY = 60
+SAMPLE_SIZE = 100
+
+
+def charts_path(csv_file: str) -> str:
+    """
+    Returns the chart views sidecar path for a CSV file.
+
+    Args:
+        csv_file: CSV filename
+
+    Returns:
+        Sidecar filename (e.g. clean_data.charts.json)
+    """
+    return os.path.splitext(csv_file)[0] + '.charts.json'
+
+
+def histogram(values: pd.Series, bins: int = HISTOGRAM_BINS) -> List[Dict]:
+    """
+    Bins a numeric column.
+
+    Args:
+        values: Numeric Series (nulls are ignored)
+        bins: Number of equal-width bins
+
+    Returns:
+        List of {'binStart', 'binEnd', 'count'}
+    """
+    numbers = pd.to_numeric(values, errors='coerce').dropna().to_numpy(dtype=float)
+    if len(numbers) == 0:
+        return []
+    counts, edges = np.histogram(numbers, bins=bins)
+    return [
+        {'binStart': float(edges[i]), 'binEnd': float(edges[i + 1]), 'count': int(counts[i])}
+        for i in range(len(counts))
+    ]
+
+
+def group_counts(values: pd.Series, top: int = TOP_GROUPS) -> List[Dict]:
+    """
+    Counts rows per value, keeping the most frequent values and folding the
+    rest into an 'Other' group.
+
+    Args:
+        values: Categorical Series (nulls are ignored)
+        top: Number of groups to keep
+
+    Returns:
+        List of {'value', 'count'}
+    """
+    counts = values.dropna().astype(str).value_counts()
+    groups = [{'value': value, 'count': int(count)} for value, count in counts.head(top).items()]
+    other = int(counts.iloc[top:].sum())
+    if other:
+        groups.append({'value': 'Other', 'count': other})
+    return groups
+
+
+def cross_tab(df: pd.DataFrame, row_col: str, col_col: str, top: int = TOP_GROUPS) -> Dict:
+    """
+    Counts rows for each pair of values of two categorical columns.
+
+    Args:
+        df: DataFrame
+        row_col: Column used for rows
+        col_col: Column used for columns
+        top: Number of values kept per column (the rest become 'Other')
+
+    Returns:
+        Dict with 'rows', 'columns' and a 'counts' matrix
+    """
+    pair = df[[row_col, col_col]].dropna().astype(str)
+    for col in (row_col, col_col):
+        keep = pair[col].value_counts().index[:top]
+        pair[col] = pair[col].where(pair[col].isin(keep), 'Other')
+    table = pd.crosstab(pair[row_col], pair[col_col])
+    return {
+        'rows': table.index.tolist(),
+        'columns': table.columns.tolist(),
+        'counts': table.to_numpy().astype(int).tolist(),
+    }
+
+
+def sample_rows(df: pd.DataFrame, size: int = SAMPLE_SIZE, stratify: Optional[str] = None,
+                random_state: int = 42) -> pd.DataFrame:
+    """
+    Draws a uniform random sample of rows, or a sample stratified by one column.
+    Stratified samples give every group one row, then split the remaining
+    rows between groups at random in proportion to their sizes (a
+    multivariate hypergeometric draw), so quotas add up to exactly size and
+    never favour early rows. With more groups than size, size groups are
+    picked at random, weighted by their sizes.
+
+    Args:
+        df: DataFrame to sample
+        size: Number of rows to return
+        stratify: Optional column to stratify by
+        random_state: Random seed
+
+    Returns:
+        Sampled rows in their original order
+    """
+    if len(df) <= size:
+        return df
+    if stratify is None or stratify not in df.columns:
+        return df.sample(n=size, random_state=random_state).sort_index()
+
+    rng = np.random.default_rng(random_state)
+    codes, _ = pd.factorize(df[stratify].astype(str))
+    sizes = np.bincount(codes)
+    if len(sizes) >= size:
+        quotas = np.zeros(len(sizes), dtype=np.int64)
+        quotas[rng.choice(len(sizes), size=size, replace=False, p=sizes / sizes.sum())] = 1
+    else:
+        quotas = 1 + rng.multivariate_hypergeometric(sizes - 1, size - len(sizes))
+
+    # Each group's quota is drawn uniformly from its rows
+    order = rng.permutation(len(df))
+    order = order[np.argsort(codes[order], kind='stable')]
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    picked = np.concatenate([order[start:start + quota] for start, quota in zip(starts, quotas)])
+    return df.iloc[np.sort(picked)]
+
+
+def build_chart_views(df: pd.DataFrame, bins: int = HISTOGRAM_BINS,
+                      pairs: Optional[List[Tuple[str, str]]] = None,
+                      sample_size: int = SAMPLE_SIZE, stratify: Optional[str] = None) -> Dict:
+    """
+    Builds chart-ready views of a DataFrame.
+
+    Args:
+        df: DataFrame to aggregate
+        bins: Histogram bins for numeric columns
+        pairs: Categorical column pairs to cross-tabulate; defaults to every
+               pair of columns with at most MAX_CROSSTAB_CARDINALITY values
+        sample_size: Rows in the sample sent for row-level charts
+        stratify: Optional column to stratify the sample by
+
+    Returns:
+        Dict with 'histograms', 'groupCounts', 'crossTabs', 'sample' and the
+        'sampleStratify' column (None for a uniform sample)
+    """
+    numeric_cols = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+    categorical_cols = [col for col in df.columns if col not in numeric_cols]
+
+    if pairs is None:
+        low_cardinality = [col for col in categorical_cols if df[col].nunique() <= MAX_CROSSTAB_CARDINALITY]
+        pairs = list(combinations(low_cardinality, 2))
+
+    sample = sample_rows(df, sample_size, stratify)
+    return {
+        'histograms': {col: histogram(df[col], bins) for col in numeric_cols},
+        'groupCounts': {col: group_counts(df[col]) for col in categorical_cols},
+        'crossTabs': [
+            {'row': row_col, 'column': col_col, **cross_tab(df, row_col, col_col)}
+            for row_col, col_col in pairs
+            if row_col in df.columns and col_col in df.columns
+        ],
+        'sample': json.loads(sample.astype(object).where(sample.notna(), '').to_json(orient='records', force_ascii=False)),
+        'sampleStratify': stratify if stratify in df.columns else None,
+    }
+
+
+def discard_chart_views(csv_file: str) -> None:
+    """
+    Removes the chart views sidecar of a CSV file, e.g. once rows were
+    appended to it, so it is rebuilt on next use (see profile_data.py).
+
+    Args:
+        csv_file: CSV filename
+    """
+    try:
+        os.remove(charts_path(csv_file))
+    except FileNotFoundError:
+        pass
+
+
+def write_chart_views(csv_file: str, df: Optional[pd.DataFrame] = None, **options) -> Optional[Dict]:
+    """
+    Builds the chart views of a CSV file and writes them next to it.
+
+    Args:
+        csv_file: CSV filename
+        df: DataFrame already holding the file contents (read from disk like
+            the profile does if None, see profile_utils.read_csv_cells)
+        **options: Passed to build_chart_views
+
+    Returns:
+        Chart views dict, or None if aggregation failed
+    """
+    try:
+        if df is None:
+            df = read_csv_cells(csv_file)
+        views = build_chart_views(df, **options)
+        views['source'] = file_key(csv_file)
+        views['generatedAt'] = datetime.now().isoformat()
+
+        with open(charts_path(csv_file), 'w', encoding='utf-8') as f:
+            json.dump(views, f, ensure_ascii=False, separators=(',', ':'))
+
+        print(f"✓ Chart views saved to {charts_path(csv_file)}")
+        return views
+
+    except Exception as e:
+        print(f"Error writing chart views for {csv_file}: {e}")
+        return None
+
+
+def load_chart_views(csv_file: str) -> Optional[Dict]:
+    """
+    Loads the chart views sidecar of a CSV file if it matches the current file.
+
+    Args:
+        csv_file: CSV filename
+
+    Returns:
+        Chart views dict, or None if missing or stale
+    """
+    path = charts_path(csv_file)
+    if not os.path.isfile(path) or not os.path.isfile(csv_file):
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            views = json.load(f)
+        source = views['source']
+        stat = os.stat(csv_file)
+        if source['size'] != stat.st_size or source['mtime_ns'] != str(stat.st_mtime_ns):
+            return None
+        return views
+    except (OSError, ValueError, KeyError):
+        return None
@@ -10,9 +10,11 @@ Configuration:
 - Remove Duplicates: true
 """
 
+import os
 import pandas as pd
 import sys
 from datetime import datetime
+from typing import Optional
 from clean_utils import (
     remove_rows_with_nulls,
     remove_columns_with_nulls,
@@ -28,17 +30,80 @@ from clean_utils import (
     remove_duplicates,
     print_statistics,
 )
+from incremental_utils import (
+    clean_appended_rows,
+    start_manifest,
+    save_manifest,
+)
+from profile_utils import write_profile, load_profile, discard_profile
+from chart_utils import write_chart_views, discard_chart_views
+from stage_utils import StageTimer, stages_path
+
+# Configuration
+CLEANING_CONFIG = {
+    'target_column': 'all',
+    'null_handling': 'rows',
+    'custom_value': None,
+    'normalization': None,
+    'trim_whitespaces': True,
+    'remove_duplicates': True,
+}
+
+# Incremental mode re-fits everything when new rows exceed these thresholds
+DRIFT_THRESHOLDS = {
+    'delta_fraction': 0.5,
+    'mean_shift': 0.5,
+    'range_growth': 0.1,
+    'null_rate': 0.05,
+}
 
 
-def clean_data(input_file: str, output_file: str):
+def clean_frame(df: pd.DataFrame, fitted: dict, seen_hashes: set, timer: StageTimer = None) -> pd.DataFrame:
+    """
+    Applies the configured cleaning steps to a DataFrame.
+    
+    Args:
+        df: DataFrame to clean
+        fitted: Fill and normalization statistics, reused when present and recorded otherwise
+        seen_hashes: Hashes of rows already kept, used to drop duplicates across runs
+        timer: Records each step as a stage (not measured when omitted)
+        
+    Returns:
+        Cleaned DataFrame
+    """
+    timer = timer or StageTimer(enabled=False)
+
+    # Trim whitespaces
+    print("\nTrimming whitespaces...")
+    df = timer.run('trim_whitespaces', trim_whitespaces, df)
+
+    # Remove duplicate rows
+    print("\nRemoving duplicate rows...")
+    df = timer.run('remove_duplicates', remove_duplicates, df, seen_hashes)
+
+    # Handle null values (rows)
+    print("\nHandling null values using strategy: rows")
+    df = timer.run('null_handling', remove_rows_with_nulls, df, 'all')
+    
+    return df
+
+
+def clean_data(input_file: str, output_file: str, incremental: bool = False, profile_stages: bool = True,
+               trace_memory: bool = False, approximate_profile: Optional[bool] = None):
     """
     Cleans the data according to the specified configuration.
     
     Args:
         input_file: Path to input CSV file
         output_file: Path to output CSV file
+        incremental: Only clean rows appended since the last run when possible
+        profile_stages: Record time and row counts per stage (see stage_utils)
+        trace_memory: Also record peak memory per stage (slows Python-heavy stages)
+        approximate_profile: Profile the output with sketches (True), exactly
+                             (False) or by its size (None, see profile_utils)
     """
     start_time = datetime.now()
+    timer = StageTimer(profile_stages, trace_memory)
     
     try:
         print("=" * 70)
@@ -48,33 +113,61 @@ def clean_data(input_file: str, output_file: str):
         print(f"📂 Output file: {output_file}")
         print()
         
+        if incremental:
+            print("Checking for new rows...")
+            appended = clean_appended_rows(
+                input_file, output_file, CLEANING_CONFIG,
+                lambda df, fitted, seen_hashes: clean_frame(df, fitted, seen_hashes, timer),
+                DRIFT_THRESHOLDS
+            )
+            if appended is not None:
+                if appended:
+                    # Rebuilt on next use (profile_data.py) instead of re-reading the whole file
+                    discard_profile(output_file)
+                    discard_chart_views(output_file)
+                timer.print_summary()
+                timer.save(stages_path(output_file))
+                execution_time = (datetime.now() - start_time).total_seconds()
+                print("\n" + "=" * 70)
+                print(f"✅ Incremental cleaning completed: {appended} rows appended")
+                print(f"⏱️  Execution time: {execution_time:.2f} seconds")
+                print(f"📁 Cleaned data saved to: {output_file}")
+                print("=" * 70)
+                return appended, execution_time
+            print("  Falling back to a full clean\n")
+        
         # Load data
         print("Loading data...")
-        df = pd.read_csv(input_file)
+        offset = os.path.getsize(input_file)
+        with timer.stage('load') as record:
+            df = pd.read_csv(input_file)
+            record['rows'] = len(df)
         print(f"✓ Loaded {len(df)} rows, {len(df.columns)} columns")
         print(f"  Columns: {', '.join(df.columns)}")
         
         # Display initial statistics
-        print_statistics(df, "Initial Data Statistics")
-          #
-        # Trim whitespaces
-        print("\nTrimming whitespaces...")
-        df = trim_whitespaces(df)
-		
-        # Remove duplicate rows
-        print("\nRemoving duplicate rows...")
-        df = remove_duplicates(df)
-		
-        # Handle null values (rows)
-        print("\nHandling null values using strategy: rows")
-        df = remove_rows_with_nulls(df, 'all')
+        print_statistics(df, "Initial Data Statistics", load_profile(input_file))
+        
+        with timer.stage('start_manifest', len(df)):
+            manifest = start_manifest(input_file, offset, CLEANING_CONFIG, df)
+        df = clean_frame(df, manifest['fitted'], manifest['seen_hashes'], timer)
         
         # Save cleaned data
         print("\n💾 Saving cleaned data...")
-        df.to_csv(output_file, index=False)
+        with timer.stage('save', len(df)):
+            df.to_csv(output_file, index=False)
+        with timer.stage('save_manifest', len(df)):
+            save_manifest(output_file, manifest, df)
+        with timer.stage('profile', len(df)):
+            profile = write_profile(output_file, df, approximate_profile)
+        with timer.stage('chart_views', len(df)):
+            write_chart_views(output_file, df)
         
         # Display final statistics
-        print_statistics(df, "Final Data Statistics")
+        print_statistics(df, "Final Data Statistics", profile)
+        
+        timer.print_summary()
+        timer.save(stages_path(output_file))
         
         # Execution time
         end_time = datetime.now()
@@ -104,5 +197,10 @@ def clean_data(input_file: str, output_file: str):
 if __name__ == "__main__":
     INPUT_FILE = "scraped_data.csv"
     OUTPUT_FILE = "clean_data.csv"
+    INCREMENTAL = False
+    PROFILE_STAGES = True
+    TRACE_MEMORY = False
+    # None: approximate profile above profile_utils.APPROXIMATE_PROFILE_ROWS rows
+    APPROXIMATE_PROFILE = None
     
-    clean_data(INPUT_FILE, OUTPUT_FILE)
+    clean_data(INPUT_FILE, OUTPUT_FILE, INCREMENTAL, PROFILE_STAGES, TRACE_MEMORY, APPROXIMATE_PROFILE)
@@ -6,7 +6,51 @@ Save this file in your backend directory alongside other utility files
 
 import pandas as pd
 import numpy as np
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Dict, Set, Any, Callable
+
+def _fitted(stats: Optional[Dict], col: str, compute: Callable[[], Any]) -> Any:
+    """
+    Returns the fitted value for a column, computing and recording it if missing.
+    
+    Args:
+        stats: Dict of fitted values keyed by column, or None to always compute
+        col: Column name
+        compute: Callable returning the value fitted on the current data
+        
+    Returns:
+        Fitted value
+    """
+    if stats is None:
+        return compute()
+    if col not in stats:
+        value = compute()
+        values = value if isinstance(value, tuple) else (value,)
+        values = [v.item() if isinstance(v, np.generic) else v for v in values]
+        stats[col] = values if isinstance(value, tuple) else values[0]
+    value = stats[col]
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _first_mode(series: pd.Series) -> Any:
+    """
+    Returns the most frequent value of a Series, or None if it has no values.
+    """
+    mode_result = series.mode()
+    return None if mode_result.empty else mode_result[0]
+
+
+def hash_rows(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash each row of a DataFrame (index excluded).
+    
+    Args:
+        df: DataFrame to hash
+        
+    Returns:
+        Array of uint64 row hashes
+    """
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
 
 def remove_rows_with_nulls(df: pd.DataFrame, columns: Union[List[str], str] = 'all') -> pd.DataFrame:
     """
@@ -51,13 +95,16 @@ def remove_columns_with_nulls(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def fill_nulls_with_mean(df: pd.DataFrame, columns: Union[List[str], str] = 'all') -> pd.DataFrame:
+def fill_nulls_with_mean(df: pd.DataFrame, columns: Union[List[str], str] = 'all',
+                        stats: Optional[Dict] = None) -> pd.DataFrame:
     """
     Fill null values with column mean (numeric columns only).
     
     Args:
         df: DataFrame to clean
         columns: Column name, list of columns, or 'all'
+        stats: Optional dict of fitted fill values; reused when a column is present,
+               recorded otherwise
         
     Returns:
         Cleaned DataFrame
@@ -66,7 +113,7 @@ def fill_nulls_with_mean(df: pd.DataFrame, columns: Union[List[str], str] = 'all
     
     for col in target_cols:
         if col in df.columns and df[col].dtype in ['int64', 'float64']:
-            mean_val = df[col].mean()
+            mean_val = _fitted(stats, col, lambda: df[col].mean())
             nulls = df[col].isnull().sum()
             if nulls > 0:
                 df[col].fillna(mean_val, inplace=True)
@@ -75,13 +122,16 @@ def fill_nulls_with_mean(df: pd.DataFrame, columns: Union[List[str], str] = 'all
     return df
 
 
-def fill_nulls_with_median(df: pd.DataFrame, columns: Union[List[str], str] = 'all') -> pd.DataFrame:
+def fill_nulls_with_median(df: pd.DataFrame, columns: Union[List[str], str] = 'all',
+                          stats: Optional[Dict] = None) -> pd.DataFrame:
     """
     Fill null values with column median (numeric columns only).
     
     Args:
         df: DataFrame to clean
         columns: Column name, list of columns, or 'all'
+        stats: Optional dict of fitted fill values; reused when a column is present,
+               recorded otherwise
         
     Returns:
         Cleaned DataFrame
@@ -90,7 +140,7 @@ def fill_nulls_with_median(df: pd.DataFrame, columns: Union[List[str], str] = 'a
     
     for col in target_cols:
         if col in df.columns and df[col].dtype in ['int64', 'float64']:
-            median_val = df[col].median()
+            median_val = _fitted(stats, col, lambda: df[col].median())
             nulls = df[col].isnull().sum()
             if nulls > 0:
                 df[col].fillna(median_val, inplace=True)
@@ -99,13 +149,16 @@ def fill_nulls_with_median(df: pd.DataFrame, columns: Union[List[str], str] = 'a
     return df
 
 
-def fill_nulls_with_mode(df: pd.DataFrame, columns: Union[List[str], str] = 'all') -> pd.DataFrame:
+def fill_nulls_with_mode(df: pd.DataFrame, columns: Union[List[str], str] = 'all',
+                        stats: Optional[Dict] = None) -> pd.DataFrame:
     """
     Fill null values with column mode (most frequent value).
     
     Args:
         df: DataFrame to clean
         columns: Column name, list of columns, or 'all'
+        stats: Optional dict of fitted fill values; reused when a column is present,
+               recorded otherwise
         
     Returns:
         Cleaned DataFrame
@@ -114,9 +167,8 @@ def fill_nulls_with_mode(df: pd.DataFrame, columns: Union[List[str], str] = 'all
     
     for col in target_cols:
         if col in df.columns:
-            mode_result = df[col].mode()
-            if not mode_result.empty:
-                mode_val = mode_result[0]
+            mode_val = _fitted(stats, col, lambda: _first_mode(df[col]))
+            if mode_val is not None:
                 nulls = df[col].isnull().sum()
                 if nulls > 0:
                     df[col].fillna(mode_val, inplace=True)
@@ -173,13 +225,16 @@ def fill_nulls_with_custom(df: pd.DataFrame, value: any, columns: Union[List[str
     return df
 
 
-def normalize_min_max_0_1(df: pd.DataFrame, columns: Union[List[str], str] = 'all') -> pd.DataFrame:
+def normalize_min_max_0_1(df: pd.DataFrame, columns: Union[List[str], str] = 'all',
+                          stats: Optional[Dict] = None) -> pd.DataFrame:
     """
     Normalize numeric columns to [0, 1] range using Min-Max scaling.
     
     Args:
         df: DataFrame to normalize
         columns: Column name, list of columns, or 'all' for all numeric columns
+        stats: Optional dict of fitted scaling parameters; reused when a column is
+               present, recorded otherwise
         
     Returns:
         Normalized DataFrame
@@ -191,8 +246,7 @@ def normalize_min_max_0_1(df: pd.DataFrame, columns: Union[List[str], str] = 'al
     
     for col in target_cols:
         if col in df.columns and df[col].dtype in ['int64', 'float64']:
-            min_val = df[col].min()
-            max_val = df[col].max()
+            min_val, max_val = _fitted(stats, col, lambda: (df[col].min(), df[col].max()))
             if max_val != min_val:
                 df[col] = (df[col] - min_val) / (max_val - min_val)
                 print(f"  {col}: Normalized to [0, 1]")
@@ -200,13 +254,16 @@ def normalize_min_max_0_1(df: pd.DataFrame, columns: Union[List[str], str] = 'al
     return df
 
 
-def normalize_min_max_neg1_1(df: pd.DataFrame, columns: Union[List[str], str] = 'all') -> pd.DataFrame:
+def normalize_min_max_neg1_1(df: pd.DataFrame, columns: Union[List[str], str] = 'all',
+                             stats: Optional[Dict] = None) -> pd.DataFrame:
     """
     Normalize numeric columns to [-1, 1] range using Min-Max scaling.
     
     Args:
         df: DataFrame to normalize
         columns: Column name, list of columns, or 'all' for all numeric columns
+        stats: Optional dict of fitted scaling parameters; reused when a column is
+               present, recorded otherwise
         
     Returns:
         Normalized DataFrame
@@ -218,8 +275,7 @@ def normalize_min_max_neg1_1(df: pd.DataFrame, columns: Union[List[str], str] =
     
     for col in target_cols:
         if col in df.columns and df[col].dtype in ['int64', 'float64']:
-            min_val = df[col].min()
-            max_val = df[col].max()
+            min_val, max_val = _fitted(stats, col, lambda: (df[col].min(), df[col].max()))
             if max_val != min_val:
                 df[col] = 2 * (df[col] - min_val) / (max_val - min_val) - 1
                 print(f"  {col}: Normalized to [-1, 1]")
@@ -227,13 +283,16 @@ def normalize_min_max_neg1_1(df: pd.DataFrame, columns: Union[List[str], str] =
     return df
 
 
-def normalize_z_score(df: pd.DataFrame, columns: Union[List[str], str] = 'all') -> pd.DataFrame:
+def normalize_z_score(df: pd.DataFrame, columns: Union[List[str], str] = 'all',
+                      stats: Optional[Dict] = None) -> pd.DataFrame:
     """
     Normalize numeric columns using Z-Score standardization (mean=0, std=1).
     
     Args:
         df: DataFrame to normalize
         columns: Column name, list of columns, or 'all' for all numeric columns
+        stats: Optional dict of fitted scaling parameters; reused when a column is
+               present, recorded otherwise
         
     Returns:
         Normalized DataFrame
@@ -245,8 +304,7 @@ def normalize_z_score(df: pd.DataFrame, columns: Union[List[str], str] = 'all')
     
     for col in target_cols:
         if col in df.columns and df[col].dtype in ['int64', 'float64']:
-            mean_val = df[col].mean()
-            std_val = df[col].std()
+            mean_val, std_val = _fitted(stats, col, lambda: (df[col].mean(), df[col].std()))
             if std_val != 0:
                 df[col] = (df[col] - mean_val) / std_val
                 print(f"  {col}: Standardized (mean=0, std=1)")
@@ -272,35 +330,50 @@ def trim_whitespaces(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+def remove_duplicates(df: pd.DataFrame, seen_hashes: Optional[Set[int]] = None) -> pd.DataFrame:
     """
     Remove duplicate rows from DataFrame.
     
     Args:
         df: DataFrame to clean
+        seen_hashes: Optional set of row hashes already kept by an earlier run;
+                     matching rows are dropped and kept rows are added to it
         
     Returns:
         Cleaned DataFrame
     """
     before_rows = len(df)
     df = df.drop_duplicates()
+    if seen_hashes is not None:
+        hashes = hash_rows(df)
+        keep = ~np.isin(hashes, np.fromiter(seen_hashes, dtype=np.uint64, count=len(seen_hashes)))
+        df = df[keep]
+        seen_hashes.update(hashes[keep].tolist())
     removed_dups = before_rows - len(df)
     print(f"  Removed {removed_dups} duplicate rows")
     
     return df
 
 
-def print_statistics(df: pd.DataFrame, title: str = "Data Statistics"):
+def print_statistics(df: pd.DataFrame, title: str = "Data Statistics", profile: Optional[Dict] = None):
     """
     Print DataFrame statistics.
     
     Args:
         df: DataFrame to analyze
         title: Title for the statistics section
+        profile: Optional precomputed profile (see profile_utils) to read the
+                 missing value and duplicate counts from instead of recomputing them
     """
+    missing = profile['totalMissingValues'] if profile else df.isnull().sum().sum()
+    duplicates = profile['duplicateRows'] if profile else df.duplicated().sum()
+    if duplicates is None:
+        # Approximate profiles only bound the duplicate count
+        duplicates = (f"~{profile['duplicateRowsEstimate']} "
+                      f"(± {profile['errorBounds']['duplicateRowsAbsoluteError']}, approximate)")
     print(f"\n📊 {title}:")
     print(f"  Total rows: {len(df)}")
     print(f"  Total columns: {len(df.columns)}")
     print(f"  Total cells: {df.size}")
-    print(f"  Missing values: {df.isnull().sum().sum()}")
-    print(f"  Duplicate rows: {df.duplicated().sum()}")
\ No newline at end of file
+    print(f"  Missing values: {missing}")
+    print(f"  Duplicate rows: {duplicates}")
\ No newline at end of file
@@ -1,5 +1,20 @@
 import csv
-from typing import List, Dict
+import io
+import os
+import struct
+import numpy as np
+from typing import List, Dict, Optional
+from incremental_utils import fingerprint
+
+# Binary row index: every ROW_INDEX_STRIDE-th row start offset, so a page of
+# rows can be read by seeking instead of parsing the whole file
+ROW_INDEX_STRIDE = 256
+ROW_INDEX_MAGIC = b'OSIX'
+ROW_INDEX_VERSION = 2
+# magic, version, stride, row count, indexed file size, file mtime (ns), header end,
+# sha1 of the indexed file (see incremental_utils.fingerprint)
+ROW_INDEX_HEADER = struct.Struct('<4sIIQQQQ20s')
+SCAN_CHUNK_BYTES = 1 << 23
 
 def save_to_csv(data: List[Dict], fieldnames: List[str], output_file: str) -> bool:
     """
@@ -24,6 +39,7 @@ def save_to_csv(data: List[Dict], fieldnames: List[str], output_file: str) -> bo
             writer.writerows(data)
         
         print(f"✓ Successfully saved {len(data)} items to {output_file}")
+        build_row_index(output_file)
         return True
         
     except Exception as e:
@@ -48,7 +64,6 @@ def append_to_csv(data: List[Dict], fieldnames: List[str], output_file: str) ->
     
     try:
         # Check if file exists to determine if we need to write headers
-        import os
         file_exists = os.path.isfile(output_file)
         
         with open(output_file, 'a', newline='', encoding='utf-8') as csvfile:
@@ -60,8 +75,172 @@ def append_to_csv(data: List[Dict], fieldnames: List[str], output_file: str) ->
             writer.writerows(data)
         
         print(f"✓ Appended {len(data)} items to {output_file}")
+        build_row_index(output_file, resume=file_exists)
         return True
         
     except Exception as e:
         print(f"Error appending to CSV: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def index_path(csv_file: str) -> str:
+    """
+    Returns the row index path for a CSV file (e.g. scraped_data.idx).
+    """
+    return os.path.splitext(csv_file)[0] + '.idx'
+
+
+def _scan_row_starts(f, position: int, end: int) -> np.ndarray:
+    """
+    Finds the byte offset of every row starting after position, treating
+    newlines inside quoted fields as part of the field.
+    
+    Args:
+        f: CSV file opened in binary mode
+        position: Offset of a row start (outside quotes)
+        end: Offset to stop scanning at
+        
+    Returns:
+        Array of row start offsets in (position, end)
+    """
+    starts = []
+    in_quotes = 0
+    f.seek(position)
+    while position < end:
+        block = np.frombuffer(f.read(min(SCAN_CHUNK_BYTES, end - position)), dtype=np.uint8)
+        if len(block) == 0:
+            break
+        # Quote parity after each byte ("" escapes toggle twice, so cancel out)
+        parity = (np.cumsum(block == ord('"'), dtype=np.uint8) + in_quotes) & 1
+        newlines = np.flatnonzero((block == ord('\n')) & (parity == 0))
+        starts.append(newlines.astype(np.uint64) + np.uint64(position + 1))
+        in_quotes = int(parity[-1])
+        position += len(block)
+    starts = np.concatenate(starts) if starts else np.empty(0, dtype=np.uint64)
+    return starts[starts < end]
+
+
+def read_row_index(csv_file: str) -> Optional[Dict]:
+    """
+    Loads the row index of a CSV file.
+    
+    Args:
+        csv_file: CSV filename
+        
+    Returns:
+        Dict with stride, rows, size, mtime_ns, header_end, fingerprint and
+        offsets, or None if the index is missing or unreadable
+    """
+    try:
+        with open(index_path(csv_file), 'rb') as f:
+            header = f.read(ROW_INDEX_HEADER.size)
+            magic, version, stride, rows, size, mtime_ns, header_end, digest = ROW_INDEX_HEADER.unpack(header)
+            if magic != ROW_INDEX_MAGIC or version != ROW_INDEX_VERSION:
+                return None
+            offsets = np.frombuffer(f.read(), dtype='<u8')
+    except (OSError, struct.error):
+        return None
+    
+    return {
+        'stride': stride,
+        'rows': rows,
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'header_end': header_end,
+        'fingerprint': digest.hex(),
+        'offsets': offsets,
+    }
+
+
+def build_row_index(csv_file: str, stride: int = ROW_INDEX_STRIDE, resume: bool = False) -> Optional[Dict]:
+    """
+    Writes the binary row index of a CSV file.
+    
+    Args:
+        csv_file: CSV filename
+        stride: Record the offset of every stride-th row
+        resume: The file was only appended to since the existing index was
+                written, so scan just the new bytes (checked against the
+                fingerprint of the indexed prefix; rebuilt when it differs)
+        
+    Returns:
+        The index dict, or None if indexing failed
+    """
+    try:
+        stat = os.stat(csv_file)
+        previous = read_row_index(csv_file)
+        
+        with open(csv_file, 'rb') as f:
+            if (resume and previous and previous['stride'] == stride and len(previous['offsets'])
+                    and previous['size'] <= stat.st_size
+                    and fingerprint(csv_file, previous['size']) == previous['fingerprint']):
+                # Resume from the last indexed row start
+                offsets = previous['offsets']
+                header_end = previous['header_end']
+                resume_at = int(offsets[-1])
+                first_row = (len(offsets) - 1) * stride
+                new_starts = np.concatenate([offsets[-1:], _scan_row_starts(f, resume_at, stat.st_size)])
+                offsets = offsets[:-1]
+            else:
+                header_starts = _scan_row_starts(f, 0, stat.st_size)
+                header_end = int(header_starts[0]) if len(header_starts) else stat.st_size
+                first_row = 0
+                new_starts = header_starts
+                offsets = np.empty(0, dtype=np.uint64)
+        
+        # new_starts holds the starts of rows first_row, first_row + 1, ...
+        total_rows = first_row + len(new_starts)
+        picked = new_starts[(np.arange(len(new_starts)) % stride) == 0]
+        offsets = np.concatenate([offsets, picked]).astype('<u8')
+        
+        with open(index_path(csv_file), 'wb') as f:
+            f.write(ROW_INDEX_HEADER.pack(ROW_INDEX_MAGIC, ROW_INDEX_VERSION, stride, total_rows,
+                                          stat.st_size, stat.st_mtime_ns, header_end,
+                                          bytes.fromhex(fingerprint(csv_file, stat.st_size))))
+            f.write(offsets.tobytes())
+        
+        return read_row_index(csv_file)
+        
+    except Exception as e:
+        print(f"Error indexing CSV: {e}")
+        return None
+
+
+def read_rows(csv_file: str, start: int, stop: int) -> List[Dict]:
+    """
+    Reads rows [start, stop) of a CSV file, seeking with the row index so only
+    those rows are parsed. The index is rebuilt if it is stale.
+    
+    Args:
+        csv_file: CSV filename
+        start: First row (0-based, header excluded)
+        stop: Row to stop before
+        
+    Returns:
+        List of row dictionaries
+    """
+    index = read_row_index(csv_file)
+    stat = os.stat(csv_file)
+    if index is None or index['size'] != stat.st_size or index['mtime_ns'] != stat.st_mtime_ns:
+        index = build_row_index(csv_file)
+        if index is None:
+            return []
+    
+    stop = min(stop, index['rows'])
+    if start >= stop:
+        return []
+    
+    stride = index['stride']
+    with open(csv_file, 'rb') as f:
+        header = f.read(index['header_end']).decode('utf-8')
+        fieldnames = next(csv.reader(io.StringIO(header, newline='')))
+        f.seek(int(index['offsets'][start // stride]))
+        text = io.TextIOWrapper(f, encoding='utf-8', newline='')
+        reader = csv.DictReader(text, fieldnames=fieldnames)
+        rows = []
+        for position, row in enumerate(reader, start=start - start % stride):
+            if position >= stop:
+                break
+            if position >= start:
+                rows.append(row)
+        return rows
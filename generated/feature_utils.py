@@ -0,0 +1,397 @@
+# feature_utils.py
+"""
+Feature encoding utilities
+Encodes the training features and target once per dataset and configuration,
+and caches the result as memory-mapped arrays so repeat training runs (and
+worker processes) load them without re-reading or re-encoding the CSV.
+
+Two encodings are available:
+- 'label': one ordinal column per feature (dense)
+- 'sparse': numeric columns as-is, low-cardinality categoricals one-hot
+  encoded and high-cardinality text hashed over word n-grams into a fixed
+  number of columns (CSR, no vocabulary kept in memory)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from scipy import sparse
+from typing import Dict, List, Optional, Tuple, Union
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import LabelEncoder
+from profile_utils import file_key, load_profile
+from sketch_utils import as_text
+from stage_utils import StageTimer
+
+# Bump when the encoding below changes, so stale caches are not reused
+ENCODING_VERSION = 2
+MAX_CACHE_ENTRIES = 4
+
+MAX_ONE_HOT_CARDINALITY = 50
+HASH_FEATURES = 2 ** 12
+HASH_NGRAMS = (1, 2)
+
+
+def cache_dir(input_file: str) -> str:
+    """
+    Returns the directory holding the feature caches of a CSV file.
+
+    Args:
+        input_file: CSV filename
+
+    Returns:
+        Directory name (e.g. clean_data.features)
+    """
+    return os.path.splitext(input_file)[0] + '.features'
+
+
+def dataset_hash(input_file: str) -> str:
+    """
+    Returns the content hash of a CSV file, reusing the profile sidecar's hash
+    when the profile is still fresh.
+
+    Args:
+        input_file: CSV filename
+
+    Returns:
+        sha1 hex digest
+    """
+    profile = load_profile(input_file)
+    if profile is not None:
+        return profile['source']['sha1']
+    return file_key(input_file)['sha1']
+
+
+def cache_key(input_file: str, feature_cols: List[str], target_col: str, encoding: str = 'label',
+              dataset: Optional[str] = None) -> str:
+    """
+    Builds the cache key from the dataset hash and the feature/target config.
+
+    Args:
+        input_file: CSV filename
+        feature_cols: Feature columns
+        target_col: Target column
+        encoding: 'label' or 'sparse'
+        dataset: Content hash of the data, when it is not read from input_file
+
+    Returns:
+        sha1 hex digest
+    """
+    payload = {
+        'dataset': dataset or dataset_hash(input_file),
+        'features': list(feature_cols),
+        'target': target_col,
+        'encoding': encoding,
+        'version': ENCODING_VERSION,
+    }
+    if encoding == 'sparse':
+        payload['sparse'] = [MAX_ONE_HOT_CARDINALITY, HASH_FEATURES, list(HASH_NGRAMS)]
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _category_labels(values: pd.Series) -> pd.Series:
+    """
+    Category labels of a column, the same whether a batch was read as text,
+    integers or floats (see as_text), with nulls labelled 'missing'.
+    """
+    return as_text(values).fillna('missing')
+
+
+def fit_sparse_spec(df: pd.DataFrame, feature_cols: List[str]) -> Dict:
+    """
+    Decides how each feature is encoded in the sparse encoding.
+
+    Args:
+        df: Cleaned DataFrame
+        feature_cols: Feature columns
+
+    Returns:
+        Dict with 'numeric' columns, 'one_hot' (column -> categories),
+        'hashed' columns and 'hash_features'
+    """
+    spec = {'numeric': [], 'one_hot': {}, 'hashed': [], 'hash_features': HASH_FEATURES}
+    for col in feature_cols:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            spec['numeric'].append(col)
+            continue
+        categories = _category_labels(df[col]).unique()
+        if len(categories) <= MAX_ONE_HOT_CARDINALITY:
+            spec['one_hot'][col] = sorted(categories.tolist())
+        else:
+            spec['hashed'].append(col)
+    return spec
+
+
+def sparse_transform(df: pd.DataFrame, spec: Dict, verbose: bool = True) -> sparse.csr_matrix:
+    """
+    Encodes features as a CSR matrix following a sparse spec. Categories not
+    seen when the spec was fitted get no one-hot column.
+
+    Args:
+        df: DataFrame holding the spec's columns
+        spec: Spec returned by fit_sparse_spec
+        verbose: Print progress for hashed columns
+
+    Returns:
+        CSR matrix with numeric, one-hot and hashed columns, in that order
+    """
+    n_rows = len(df)
+    blocks = []
+
+    if spec['numeric']:
+        blocks.append(sparse.csr_matrix(df[spec['numeric']].fillna(0).to_numpy(dtype=np.float64)))
+
+    for col, categories in spec['one_hot'].items():
+        codes = pd.Categorical(_category_labels(df[col]), categories=categories).codes
+        rows = np.flatnonzero(codes >= 0)
+        blocks.append(sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, codes[rows])), shape=(n_rows, len(categories))
+        ))
+
+    if spec['hashed']:
+        hasher = HashingVectorizer(
+            n_features=spec['hash_features'], ngram_range=HASH_NGRAMS,
+            alternate_sign=False, norm=None, binary=True, dtype=np.float64
+        )
+        for col in spec['hashed']:
+            if verbose:
+                print(f"  Hashing '{col}' into {spec['hash_features']} columns...")
+            blocks.append(hasher.transform(as_text(df[col]).fillna('')))
+
+    return sparse.hstack(blocks, format='csr', dtype=np.float64)
+
+
+def encode_features(df: pd.DataFrame, feature_cols: List[str], target_col: str,
+                    encoding: str = 'label') -> Dict:
+    """
+    Drops rows without a target, label-encodes the target and encodes the
+    features.
+
+    Args:
+        df: Cleaned DataFrame
+        feature_cols: Feature columns
+        target_col: Target column
+        encoding: 'label' (categoricals label-encoded, missing numbers filled
+                  with 0) or 'sparse' (see sparse_transform)
+
+    Returns:
+        Dict with 'X', 'y' (int64 vector), 'target_classes', 'feature_names'
+        and either 'encoders' (column -> classes) or 'sparse_spec'. For the
+        label encoding X is an int64 matrix when every feature is integer and
+        float64 otherwise; for the sparse encoding it is a CSR matrix.
+    """
+    df = df[df[target_col].notna()]
+
+    target_encoder = LabelEncoder()
+    y = target_encoder.fit_transform(as_text(df[target_col]))
+
+    encoded = {
+        'y': y.astype(np.int64),
+        'target_classes': target_encoder.classes_.tolist(),
+        'feature_names': list(feature_cols),
+    }
+
+    if encoding == 'sparse':
+        spec = fit_sparse_spec(df, feature_cols)
+        encoded['X'] = sparse_transform(df, spec)
+        encoded['sparse_spec'] = spec
+        return encoded
+
+    X = df[feature_cols].copy()
+    encoders = {}
+    for col in X.columns:
+        if X[col].dtype == 'object' or X[col].dtype.name == 'category':
+            print(f"  Encoding '{col}'...")
+            le_feat = LabelEncoder()
+            X[col] = le_feat.fit_transform(_category_labels(X[col]))
+            encoders[col] = le_feat.classes_.tolist()
+
+    X = X.fillna(0)
+
+    # Integer matrices keep SMOTE's synthetic rows on valid category codes
+    all_integer = all(pd.api.types.is_integer_dtype(X[col]) for col in X.columns)
+
+    encoded['X'] = X.to_numpy(dtype=np.int64 if all_integer else np.float64)
+    encoded['encoders'] = encoders
+    return encoded
+
+
+def transform_features(df: pd.DataFrame, feature_cols: List[str], encoders: Dict[str, List[str]],
+                       sparse_spec: Optional[Dict] = None) -> Tuple[Union[np.ndarray, sparse.csr_matrix], Dict[str, int]]:
+    """
+    Encodes new rows with the encoders fitted at training time, without a
+    per-row Python loop. Categories not seen in training are encoded as -1
+    (label encoding) or get no one-hot column (sparse encoding).
+
+    Args:
+        df: New rows holding the feature columns
+        feature_cols: Feature columns, in training order
+        encoders: Label encoding classes (column -> classes)
+        sparse_spec: Sparse spec when the model was trained on the sparse encoding
+
+    Returns:
+        Tuple of (feature matrix, column -> number of unknown categories)
+    """
+    unknown = {}
+
+    if sparse_spec is not None:
+        for col, categories in sparse_spec['one_hot'].items():
+            codes = pd.Categorical(_category_labels(df[col]), categories=categories).codes
+            unknown[col] = int((codes < 0).sum())
+        return sparse_transform(df, sparse_spec, verbose=False), unknown
+
+    X = np.empty((len(df), len(feature_cols)), dtype=np.float64)
+    for i, col in enumerate(feature_cols):
+        if col in encoders:
+            codes = pd.Categorical(_category_labels(df[col]), categories=encoders[col]).codes
+            unknown[col] = int((codes < 0).sum())
+            X[:, i] = codes
+        else:
+            X[:, i] = pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    return X, unknown
+
+
+def label_encoder_from_classes(classes: List[str]) -> LabelEncoder:
+    """
+    Rebuilds a fitted LabelEncoder from its classes.
+    """
+    encoder = LabelEncoder()
+    encoder.classes_ = np.array(classes, dtype=object)
+    return encoder
+
+
+def _prune(directory: str, keep: str):
+    """
+    Removes the oldest cache entries beyond MAX_CACHE_ENTRIES.
+    """
+    entries = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name != keep and '.tmp' not in name
+    ]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[MAX_CACHE_ENTRIES - 1:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _save_cache(path: str, encoded: Dict, meta: Dict):
+    """
+    Writes a cache entry to a temporary directory and renames it into place,
+    so readers never see a partially written entry.
+    """
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    X = encoded['X']
+    if sparse.issparse(X):
+        for part in ('data', 'indices', 'indptr'):
+            np.save(os.path.join(tmp_path, f'X_{part}.npy'), getattr(X, part))
+    else:
+        np.save(os.path.join(tmp_path, 'X.npy'), X)
+    np.save(os.path.join(tmp_path, 'y.npy'), encoded['y'])
+    with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # Another run cached the same entry first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def open_matrix(path: str) -> Union[np.ndarray, sparse.csr_matrix]:
+    """
+    Memory-maps the feature matrix of a cache entry.
+
+    Args:
+        path: Cache entry directory
+
+    Returns:
+        Read-only dense memmap, or a CSR matrix over memory-mapped arrays
+    """
+    dense_file = os.path.join(path, 'X.npy')
+    if os.path.isfile(dense_file):
+        return np.load(dense_file, mmap_mode='r')
+
+    with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+        shape = tuple(json.load(f)['shape'])
+    parts = [np.load(os.path.join(path, f'X_{part}.npy'), mmap_mode='r')
+             for part in ('data', 'indices', 'indptr')]
+    return sparse.csr_matrix(tuple(parts), shape=shape, copy=False)
+
+
+def load_features(input_file: str, feature_cols: List[str], target_col: str,
+                  encoding: str = 'label', timer: Optional[StageTimer] = None,
+                  df: Optional[pd.DataFrame] = None, dataset: Optional[str] = None) -> Dict:
+    """
+    Returns the encoded training data of a CSV file, from the cache when the
+    dataset and configuration are unchanged, otherwise encoding and caching it.
+
+    Args:
+        input_file: Cleaned CSV filename (the cache lives next to it)
+        feature_cols: Feature columns
+        target_col: Target column
+        encoding: 'label' or 'sparse' (see encode_features)
+        timer: Records the load and encode stages
+        df: Cleaned DataFrame already in memory, used instead of reading input_file
+        dataset: Content hash of df (required with df)
+
+    Returns:
+        Dict with 'X' and 'y' (read-only, memory-mapped), 'encoding',
+        'encoders' (column -> fitted LabelEncoder), 'sparse_spec',
+        'target_encoder', 'feature_names', 'cache_path' and 'cached'
+        (whether the cache was hit)
+    """
+    timer = timer or StageTimer(enabled=False)
+    key = cache_key(input_file, feature_cols, target_col, encoding, dataset if df is not None else None)
+    directory = cache_dir(input_file)
+    path = os.path.join(directory, key)
+    meta_file = os.path.join(path, 'meta.json')
+
+    cached = os.path.isfile(meta_file)
+    if cached:
+        print(f"✓ Loading encoded features from cache ({key[:12]})")
+        with timer.stage('load_cache') as record:
+            os.utime(path)
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            record['rows'] = meta['shape'][0]
+    else:
+        if df is None:
+            with timer.stage('load') as record:
+                df = pd.read_csv(input_file)
+                record['rows'] = len(df)
+
+        print("Encoding features...")
+        with timer.stage('encode', len(df)) as record:
+            encoded = encode_features(df, feature_cols, target_col, encoding)
+            record['rows_out'] = len(encoded['y'])
+            meta = {
+                'features': list(feature_cols),
+                'target': target_col,
+                'encoding': encoding,
+                'feature_names': encoded['feature_names'],
+                'encoders': encoded.get('encoders', {}),
+                'sparse_spec': encoded.get('sparse_spec'),
+                'target_classes': encoded['target_classes'],
+                'shape': list(encoded['X'].shape),
+                'created': datetime.now().isoformat(),
+            }
+            os.makedirs(directory, exist_ok=True)
+            _save_cache(path, encoded, meta)
+            _prune(directory, key)
+        print(f"✓ Encoded features cached in {path}")
+
+    return {
+        'X': open_matrix(path),
+        'y': np.load(os.path.join(path, 'y.npy'), mmap_mode='r'),
+        'encoding': meta['encoding'],
+        'encoders': {col: label_encoder_from_classes(classes) for col, classes in meta['encoders'].items()},
+        'sparse_spec': meta['sparse_spec'],
+        'target_encoder': label_encoder_from_classes(meta['target_classes']),
+        'feature_names': meta['feature_names'],
+        'cache_path': path,
+        'cached': cached,
+    }
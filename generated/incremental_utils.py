@@ -0,0 +1,348 @@
+# incremental_utils.py
+"""
+Incremental cleaning utilities
+Keeps a manifest next to the cleaned output so re-runs only clean the rows
+appended to the input since the previous run
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Callable, Dict, Optional, Set, Tuple
+
+FINGERPRINT_BYTES = 65536
+
+DEFAULT_DRIFT_THRESHOLDS = {
+    'delta_fraction': 0.5,   # new rows relative to rows already cleaned
+    'mean_shift': 0.5,       # shift of a numeric mean, in historical standard deviations
+    'range_growth': 0.1,     # growth of a numeric range, relative to the historical range
+    'null_rate': 0.05,       # absolute change of a column's null rate
+}
+
+
+def manifest_path(output_file: str) -> str:
+    """
+    Returns the manifest path used for a cleaned output file.
+
+    Args:
+        output_file: Cleaned CSV filename
+
+    Returns:
+        Manifest filename (e.g. clean_data.manifest.json)
+    """
+    return os.path.splitext(output_file)[0] + '.manifest.json'
+
+
+def _hashes_path(manifest_file: str) -> str:
+    return os.path.splitext(manifest_file)[0] + '.hashes.npy'
+
+
+def config_hash(config: Dict) -> str:
+    """
+    Hashes a cleaning configuration so manifests are invalidated when it changes.
+    """
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def fingerprint(input_file: str, offset: int) -> str:
+    """
+    Hashes the head of the file and the bytes just before the offset, which is
+    enough to notice the input being rewritten rather than appended to.
+
+    Args:
+        input_file: Filename
+        offset: Length of the prefix that must be unchanged
+
+    Returns:
+        sha1 hex digest
+    """
+    digest = hashlib.sha1()
+    with open(input_file, 'rb') as f:
+        digest.update(f.read(min(offset, FINGERPRINT_BYTES)))
+        tail_start = max(0, offset - FINGERPRINT_BYTES)
+        f.seek(tail_start)
+        digest.update(f.read(offset - tail_start))
+    return digest.hexdigest()
+
+
+def summarize(df: pd.DataFrame) -> Dict:
+    """
+    Summarizes raw input rows for drift detection.
+
+    Args:
+        df: Raw (uncleaned) DataFrame
+
+    Returns:
+        Dict with the row count and per-column null counts, plus count, mean,
+        sum of squared deviations, min and max for numeric columns
+    """
+    columns = {}
+    nulls = df.isnull().sum()
+    for col in df.columns:
+        info = {'nulls': int(nulls[col])}
+        if df[col].dtype in ['int64', 'float64']:
+            values = df[col].dropna().to_numpy(dtype=float)
+            info['count'] = int(len(values))
+            if len(values):
+                mean = float(values.mean())
+                info.update({
+                    'mean': mean,
+                    'm2': float(((values - mean) ** 2).sum()),
+                    'min': float(values.min()),
+                    'max': float(values.max()),
+                })
+        columns[col] = info
+    return {'rows': int(len(df)), 'columns': columns}
+
+
+def merge_summary(summary: Dict, delta: Dict) -> Dict:
+    """
+    Merges the summary of appended rows into the running summary.
+
+    Args:
+        summary: Summary of the rows already cleaned
+        delta: Summary of the appended rows
+
+    Returns:
+        Combined summary
+    """
+    columns = {}
+    for col, old in summary['columns'].items():
+        new = delta['columns'].get(col, {'nulls': 0})
+        info = {'nulls': old['nulls'] + new['nulls']}
+        if 'count' in old:
+            n_a, n_b = old['count'], new.get('count', 0)
+            info['count'] = n_a + n_b
+            if n_b == 0 or n_a == 0:
+                source = old if n_b == 0 else new
+                info.update({k: source[k] for k in ('mean', 'm2', 'min', 'max') if k in source})
+            else:
+                # Chan et al. pairwise update of mean and squared deviations
+                diff = new['mean'] - old['mean']
+                total = n_a + n_b
+                info.update({
+                    'mean': old['mean'] + diff * n_b / total,
+                    'm2': old['m2'] + new['m2'] + diff ** 2 * n_a * n_b / total,
+                    'min': min(old['min'], new['min']),
+                    'max': max(old['max'], new['max']),
+                })
+        columns[col] = info
+    return {'rows': summary['rows'] + delta['rows'], 'columns': columns}
+
+
+def detect_drift(summary: Dict, delta: Dict, thresholds: Optional[Dict] = None) -> Optional[str]:
+    """
+    Checks whether appended rows differ enough from the history that the fitted
+    fill and normalization statistics should be recomputed.
+
+    Args:
+        summary: Summary of the rows already cleaned
+        delta: Summary of the appended rows
+        thresholds: Drift thresholds (defaults to DEFAULT_DRIFT_THRESHOLDS)
+
+    Returns:
+        Description of the first threshold exceeded, or None
+    """
+    limits = {**DEFAULT_DRIFT_THRESHOLDS, **(thresholds or {})}
+
+    if summary['rows'] == 0 or delta['rows'] / summary['rows'] > limits['delta_fraction']:
+        return f"{delta['rows']} new rows vs {summary['rows']} already cleaned"
+
+    for col, old in summary['columns'].items():
+        new = delta['columns'].get(col)
+        if new is None:
+            return f"column '{col}' missing from new rows"
+
+        null_shift = abs(new['nulls'] / delta['rows'] - old['nulls'] / summary['rows'])
+        if null_shift > limits['null_rate']:
+            return f"{col}: null rate changed by {null_shift:.2%}"
+
+        if old.get('count', 0) > 1 and new.get('count', 0) > 0:
+            std = np.sqrt(old['m2'] / (old['count'] - 1))
+            if std > 0 and abs(new['mean'] - old['mean']) / std > limits['mean_shift']:
+                return f"{col}: mean moved from {old['mean']:.2f} to {new['mean']:.2f}"
+
+            span = old['max'] - old['min']
+            growth = max(old['min'] - new['min'], new['max'] - old['max'], 0)
+            if growth > 0 and (span == 0 or growth / span > limits['range_growth']):
+                return f"{col}: range grew to [{min(old['min'], new['min'])}, {max(old['max'], new['max'])}]"
+
+    return None
+
+
+def start_manifest(input_file: str, offset: int, config: Dict, df: pd.DataFrame) -> Dict:
+    """
+    Creates a manifest for a full clean of the input file.
+
+    Args:
+        input_file: Input CSV filename
+        offset: Input file size (in bytes) when it was read
+        config: Cleaning configuration
+        df: Raw DataFrame loaded from the input file
+
+    Returns:
+        Manifest dict whose 'fitted' and 'seen_hashes' entries are filled in by
+        the cleaning steps
+    """
+    return {
+        'input_file': os.path.basename(input_file),
+        'offset': offset,
+        'fingerprint': fingerprint(input_file, offset),
+        'config_hash': config_hash(config),
+        'columns': list(df.columns),
+        'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+        'summary': summarize(df),
+        'fitted': {'fill': {}, 'normalize': {}},
+        'seen_hashes': set(),
+        'cleaned_rows': 0,
+    }
+
+
+def save_manifest(output_file: str, manifest: Dict, cleaned: pd.DataFrame) -> None:
+    """
+    Records the rows just cleaned and writes the manifest next to the output file.
+
+    Args:
+        output_file: Cleaned CSV filename
+        manifest: Manifest dict
+        cleaned: DataFrame of the rows written by this run
+    """
+    manifest_file = manifest_path(output_file)
+    manifest['output_columns'] = list(cleaned.columns)
+    manifest['cleaned_rows'] += len(cleaned)
+    manifest['updated_at'] = datetime.now().isoformat()
+
+    hashes = manifest['seen_hashes']
+    np.save(_hashes_path(manifest_file), np.fromiter(hashes, dtype=np.uint64, count=len(hashes)))
+
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump({k: v for k, v in manifest.items() if k != 'seen_hashes'}, f, indent=2, ensure_ascii=False)
+
+
+def load_manifest(output_file: str) -> Optional[Dict]:
+    """
+    Loads the manifest written alongside a cleaned output file.
+
+    Args:
+        output_file: Cleaned CSV filename
+
+    Returns:
+        Manifest dict, or None if missing or unreadable
+    """
+    manifest_file = manifest_path(output_file)
+    if not os.path.isfile(manifest_file) or not os.path.isfile(output_file):
+        return None
+
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        manifest['seen_hashes'] = set(np.load(_hashes_path(manifest_file)).tolist())
+        return manifest
+    except (OSError, ValueError, KeyError) as e:
+        print(f"  Ignoring unreadable manifest {manifest_file}: {e}")
+        return None
+
+
+def discard_manifest(output_file: str):
+    """
+    Removes the manifest of a cleaned output file that was rewritten by other
+    means, so the next incremental run starts with a full clean.
+
+    Args:
+        output_file: Cleaned CSV filename
+    """
+    manifest_file = manifest_path(output_file)
+    for path in (manifest_file, _hashes_path(manifest_file)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def read_delta(input_file: str, manifest: Dict, config: Dict) -> Tuple[Optional[pd.DataFrame], int]:
+    """
+    Reads the rows appended to the input file since the manifest was written.
+
+    Args:
+        input_file: Input CSV filename
+        manifest: Manifest from the previous run
+        config: Current cleaning configuration
+
+    Returns:
+        Tuple of (appended rows or None if a full clean is required, new byte offset)
+    """
+    size = os.path.getsize(input_file)
+    offset = manifest['offset']
+
+    if manifest['config_hash'] != config_hash(config):
+        print("  Cleaning configuration changed since last run")
+        return None, size
+    if size < offset or fingerprint(input_file, offset) != manifest['fingerprint']:
+        print("  Input file was rewritten since last run")
+        return None, size
+    if size == offset:
+        return pd.DataFrame(columns=manifest['columns']), size
+
+    with open(input_file, 'rb') as f:
+        f.seek(offset)
+        delta = pd.read_csv(f, header=None, names=manifest['columns'])
+
+    try:
+        delta = delta.astype(manifest['dtypes'])
+    except (ValueError, TypeError) as e:
+        print(f"  New rows do not match the previous column types: {e}")
+        return None, size
+
+    return delta, size
+
+
+def clean_appended_rows(input_file: str, output_file: str, config: Dict,
+                        clean_frame: Callable[[pd.DataFrame, Dict, Set[int]], pd.DataFrame],
+                        thresholds: Optional[Dict] = None) -> Optional[int]:
+    """
+    Cleans only the rows appended to the input file and appends them to the output.
+
+    Args:
+        input_file: Input CSV filename
+        output_file: Cleaned CSV filename
+        config: Cleaning configuration
+        clean_frame: Function applying the cleaning steps given (df, fitted, seen_hashes)
+        thresholds: Drift thresholds (defaults to DEFAULT_DRIFT_THRESHOLDS)
+
+    Returns:
+        Number of rows appended to the output, or None if a full clean is required
+    """
+    manifest = load_manifest(output_file)
+    if manifest is None:
+        print("  No manifest from a previous run")
+        return None
+
+    delta, offset = read_delta(input_file, manifest, config)
+    if delta is None:
+        return None
+    if delta.empty:
+        print("✓ No new rows since last run")
+        return 0
+    print(f"✓ Loaded {len(delta)} new rows from byte offset {manifest['offset']}")
+
+    delta_summary = summarize(delta)
+    reason = detect_drift(manifest['summary'], delta_summary, thresholds)
+    if reason:
+        print(f"  Drift threshold exceeded ({reason})")
+        return None
+
+    cleaned = clean_frame(delta, manifest['fitted'], manifest['seen_hashes'])
+    if list(cleaned.columns) != manifest['output_columns']:
+        print("  Cleaned columns differ from the previous run")
+        return None
+
+    print(f"\n💾 Appending {len(cleaned)} cleaned rows...")
+    cleaned.to_csv(output_file, mode='a', header=False, index=False)
+
+    manifest['offset'] = offset
+    manifest['fingerprint'] = fingerprint(input_file, offset)
+    manifest['summary'] = merge_summary(manifest['summary'], delta_summary)
+    save_manifest(output_file, manifest, cleaned)
+
+    return len(cleaned)
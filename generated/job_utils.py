@@ -0,0 +1,541 @@
+# job_utils.py
+"""
+Job queue utilities
+Persistent queue of scrape/clean/train/predict jobs in a local SQLite file,
+with per-stage priorities and concurrency limits, coalescing of identical
+jobs, and an event log per job. A job waits for earlier jobs of the stages it
+reads from (e.g. train waits for a clean submitted before it), and an
+identical job never runs twice at once. Each job runs in its own working
+directory holding copies of its inputs; its outputs are published back to the
+shared directory with atomic renames, so readers never see a partial file,
+and are refused when a newer job already published over them.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from model_utils import LATEST_FILE, MODEL_DIR, read_latest
+
+JOB_DB = 'jobs.db'
+JOBS_DIR = 'jobs'
+KEEP_FINISHED = 20   # finished jobs whose working directory and event log are kept for inspection
+
+# Stage -> script, inputs copied into the job directory (a CSV brings its
+# sidecars along, e.g. clean_data.profile.json; 'models' brings the latest
+# model and the online checkpoints), directories shared through a link instead
+# of copied, stages whose earlier jobs must finish first, default priority
+# (higher runs first) and the number of jobs of the stage allowed to run at once
+STAGES = {
+    'scrape': {'script': 'scraper.py', 'inputs': [], 'shared': [], 'after': [], 'priority': 0, 'concurrency': 2},
+    'clean': {'script': 'clean_data.py', 'inputs': ['scraped_data.csv', 'clean_data.csv'], 'shared': [],
+              'after': ['scrape'], 'priority': 1, 'concurrency': 2},
+    'train': {'script': 'train_model.py', 'inputs': ['clean_data.csv', 'models'],
+              'shared': ['clean_data.features'], 'after': ['clean'], 'priority': 2, 'concurrency': 1},
+    'predict': {'script': 'predict.py', 'inputs': ['scraped_data.csv', 'models'], 'shared': [],
+                'after': ['scrape', 'train'], 'priority': 2, 'concurrency': 2},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    stage TEXT NOT NULL,
+    script TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    workdir TEXT,
+    created TEXT NOT NULL,
+    started TEXT,
+    finished TEXT,
+    exit_code INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority DESC, created);
+CREATE TABLE IF NOT EXISTS events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE TABLE IF NOT EXISTS outputs (
+    path TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    job_created TEXT NOT NULL,
+    published TEXT NOT NULL
+);
+"""
+
+JOB_FIELDS = ['id', 'stage', 'config_hash', 'priority', 'status', 'workdir',
+              'created', 'started', 'finished', 'exit_code', 'error']
+
+
+class PublishConflict(Exception):
+    """
+    Raised when a job's outputs were already published by a newer job.
+    """
+
+
+def job_hash(stage: str, script: str) -> str:
+    """
+    Hashes a job's configuration. Generated scripts embed their whole
+    configuration, so the stage and script source identify the job.
+
+    Args:
+        stage: Job stage
+        script: Script source
+
+    Returns:
+        Hex digest
+    """
+    return hashlib.sha1(f"{stage}\0{script}".encode('utf-8')).hexdigest()
+
+
+def is_input(stage: str, path: str) -> bool:
+    """
+    Whether a shared path (relative to the shared directory) is one of a
+    stage's inputs.
+    """
+    path = path.replace(os.sep, '/')
+    for name in STAGES[stage]['inputs']:
+        base, ext = os.path.splitext(name)
+        if ext == '.csv':
+            if path == name or (path.startswith(base + '.') and '/' not in path and not path.endswith('.py')):
+                return True
+        elif path == name or path.startswith(name + '/'):
+            return True
+    return False
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = JOB_DB):
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def _job(self, row) -> Optional[Dict]:
+        return dict(zip(JOB_FIELDS, row)) if row else None
+
+    def _joinable(self, stage: str, config_hash: str) -> Optional[Tuple[str, int]]:
+        """
+        Finds an identical pending or running job a new submission can share:
+        one that no newer job of an upstream stage would have to run before,
+        and, when it is running, whose inputs were not republished since it
+        started. Called inside a transaction.
+
+        Returns:
+            Tuple of (job id, priority), or None
+        """
+        upstream = STAGES[stage]['after']
+        rows = self.conn.execute(
+            "SELECT id, priority, status, created, started FROM jobs "
+            "WHERE status IN ('pending', 'running') AND stage = ? AND config_hash = ? "
+            "ORDER BY status = 'running', created",
+            (stage, config_hash)
+        ).fetchall()
+        for job_id, priority, status, created, started in rows:
+            if upstream and self.conn.execute(
+                f"SELECT 1 FROM jobs WHERE status IN ('pending', 'running') AND created > ? "
+                f"AND stage IN ({', '.join('?' * len(upstream))}) LIMIT 1",
+                (created, *upstream)
+            ).fetchone():
+                continue
+            if status == 'running':
+                republished = self.conn.execute(
+                    'SELECT path FROM outputs WHERE published > ?', (started,)
+                ).fetchall()
+                if any(is_input(stage, path) for path, in republished):
+                    continue
+            return job_id, priority
+        return None
+
+    def submit(self, stage: str, script: str, priority: Optional[int] = None) -> Tuple[str, bool]:
+        """
+        Queues a job, or joins an identical pending or running one (raising
+        its priority if this submission's is higher). A job that cannot be
+        joined, e.g. because its inputs changed since it started, is queued
+        and waits until the identical job finishes.
+
+        Args:
+            stage: Job stage (see STAGES)
+            script: Script source to run
+            priority: Priority (defaults to the stage's)
+
+        Returns:
+            Tuple of (job id, whether it was coalesced with an existing job)
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        priority = STAGES[stage]['priority'] if priority is None else priority
+        config_hash = job_hash(stage, script)
+
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                joined = self._joinable(stage, config_hash)
+                if joined:
+                    if priority > joined[1]:
+                        self.conn.execute('UPDATE jobs SET priority = ? WHERE id = ?', (priority, joined[0]))
+                    job_id, coalesced = joined[0], True
+                else:
+                    job_id, coalesced = uuid.uuid4().hex[:12], False
+                    self.conn.execute(
+                        "INSERT INTO jobs (id, stage, script, config_hash, priority, status, created) "
+                        "VALUES (?, ?, ?, ?, ?, 'pending', ?)",
+                        (job_id, stage, script, config_hash, priority, datetime.now().isoformat())
+                    )
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return job_id, coalesced
+
+    def claim(self, limits: Dict[str, int]) -> Optional[Dict]:
+        """
+        Marks the highest-priority pending job that can start as running: its
+        stage is below its concurrency limit, no identical job is running and
+        no earlier job of an upstream stage (see STAGES 'after') is pending or
+        running.
+
+        Args:
+            limits: Stage -> maximum running jobs
+
+        Returns:
+            Job dict (with 'script'), or None if nothing can start
+        """
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                active = self.conn.execute(
+                    "SELECT stage, config_hash, status, created FROM jobs WHERE status IN ('pending', 'running')"
+                ).fetchall()
+                running = {}
+                running_hashes = set()
+                for stage, config_hash, status, _ in active:
+                    if status == 'running':
+                        running[stage] = running.get(stage, 0) + 1
+                        running_hashes.add(config_hash)
+
+                job = None
+                for row in self.conn.execute(
+                    f"SELECT {', '.join(JOB_FIELDS)}, script FROM jobs WHERE status = 'pending' "
+                    f"ORDER BY priority DESC, created"
+                ).fetchall():
+                    candidate = {**self._job(row[:-1]), 'script': row[-1]}
+                    stage = candidate['stage']
+                    upstream = STAGES.get(stage, {}).get('after', [])
+                    if running.get(stage, 0) >= limits.get(stage, 0) or candidate['config_hash'] in running_hashes:
+                        continue
+                    if any(s in upstream and created < candidate['created'] for s, _, _, created in active):
+                        continue
+                    job = candidate
+                    break
+
+                if job is not None:
+                    job['status'], job['started'] = 'running', datetime.now().isoformat()
+                    self.conn.execute(
+                        "UPDATE jobs SET status = 'running', started = ? WHERE id = ?",
+                        (job['started'], job['id'])
+                    )
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return job
+
+    def update(self, job_id: str, **fields):
+        """
+        Updates columns of a job.
+
+        Args:
+            job_id: Job id
+            **fields: Column -> value
+        """
+        with self.lock:
+            self.conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def finish(self, job_id: str, status: str, exit_code: Optional[int] = None, error: Optional[str] = None):
+        """
+        Records a job's final status.
+
+        Args:
+            job_id: Job id
+            status: 'succeeded', 'failed' or 'cancelled'
+            exit_code: Script exit code
+            error: Error message
+        """
+        self.update(job_id, status=status, exit_code=exit_code, error=error,
+                    finished=datetime.now().isoformat())
+
+    def cancel_pending(self, job_id: str) -> bool:
+        """
+        Cancels a job that has not started.
+
+        Returns:
+            True if the job was pending
+        """
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'pending'",
+                (datetime.now().isoformat(), job_id)
+            )
+        return cursor.rowcount > 0
+
+    def requeue_running(self) -> List[str]:
+        """
+        Returns jobs left running by a scheduler that stopped to the queue.
+
+        Returns:
+            Requeued job ids
+        """
+        with self.lock:
+            ids = [row[0] for row in self.conn.execute("SELECT id FROM jobs WHERE status = 'running'")]
+            self.conn.execute("UPDATE jobs SET status = 'pending', started = NULL WHERE status = 'running'")
+        return ids
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Returns a job (without its script), or None.
+        """
+        with self.lock:
+            row = self.conn.execute(f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def list(self, limit: int = 50) -> List[Dict]:
+        """
+        Returns the most recently created jobs.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(JOB_FIELDS)} FROM jobs ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def add_event(self, job_id: str, event: Dict) -> int:
+        """
+        Appends an event to a job's log.
+
+        Returns:
+            Sequence number of the event (from 1)
+        """
+        with self.lock:
+            seq = self.conn.execute(
+                'SELECT COALESCE(MAX(seq), 0) + 1 FROM events WHERE job_id = ?', (job_id,)
+            ).fetchone()[0]
+            self.conn.execute('INSERT INTO events VALUES (?, ?, ?)', (job_id, seq, json.dumps(event)))
+        return seq
+
+    def events(self, job_id: str, after: int = 0) -> List[Tuple[int, Dict]]:
+        """
+        Returns a job's logged events after a sequence number.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT seq, event FROM events WHERE job_id = ? AND seq > ? ORDER BY seq', (job_id, after)
+            ).fetchall()
+        return [(seq, json.loads(event)) for seq, event in rows]
+
+    def prune_finished(self, keep: int) -> List[str]:
+        """
+        Drops the event logs of finished jobs beyond the newest `keep` and
+        returns those that still have a working directory to remove.
+        """
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self.conn.execute(
+                    "SELECT id, workdir FROM jobs WHERE status IN ('succeeded', 'failed', 'cancelled') "
+                    "AND (workdir IS NOT NULL OR id IN (SELECT job_id FROM events)) "
+                    "AND id NOT IN (SELECT id FROM jobs WHERE status IN ('succeeded', 'failed', 'cancelled') "
+                    "ORDER BY finished DESC LIMIT ?)", (keep,)
+                ).fetchall()
+                self.conn.executemany('DELETE FROM events WHERE job_id = ?', [(job_id,) for job_id, _ in rows])
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return [job_id for job_id, workdir in rows if workdir is not None]
+
+    def check_outputs(self, job: Dict, paths: List[str]):
+        """
+        Raises PublishConflict if any of the paths was published by a job
+        submitted after this one.
+        """
+        with self.lock:
+            newer = [
+                (path, job_id) for path in paths
+                for job_id, in self.conn.execute(
+                    'SELECT job_id FROM outputs WHERE path = ? AND job_created > ?', (path, job['created'])
+                )
+            ]
+        if newer:
+            raise PublishConflict(
+                f"{', '.join(path for path, _ in newer)} already published by newer job "
+                f"{newer[0][1]}; resubmit to rebuild on it"
+            )
+
+    def record_outputs(self, job: Dict, paths: List[str]):
+        """
+        Records which job last published each path.
+        """
+        now = datetime.now().isoformat()
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?)',
+                [(path, job['id'], job['created'], now) for path in paths]
+            )
+
+
+def _model_files(shared_dir: str) -> List[str]:
+    """
+    Model files a job needs: the latest model's pointer and artifact, and the
+    online checkpoints. Older artifacts are left out.
+    """
+    model_dir = os.path.join(shared_dir, MODEL_DIR)
+    if not os.path.isdir(model_dir):
+        return []
+    names = sorted(name for name in os.listdir(model_dir) if fnmatch.fnmatch(name, 'online_*.joblib'))
+    latest = read_latest(model_dir)
+    if latest is not None:
+        names.append(LATEST_FILE)
+        artifact = latest.get('file')
+        if artifact and os.path.isfile(os.path.join(model_dir, artifact)):
+            names.append(artifact)
+    return [os.path.join(MODEL_DIR, name) for name in names]
+
+
+def _input_paths(shared_dir: str, name: str) -> List[str]:
+    """
+    Files and directories making up an input: a CSV with its sidecars, or a
+    single file or directory.
+    """
+    if name == MODEL_DIR:
+        return _model_files(shared_dir)
+    base, ext = os.path.splitext(name)
+    if ext != '.csv':
+        return [name] if os.path.exists(os.path.join(shared_dir, name)) else []
+    return sorted(
+        entry for entry in os.listdir(shared_dir)
+        if (entry == name or entry.startswith(base + '.'))
+        and not entry.endswith('.py') and os.path.isfile(os.path.join(shared_dir, entry))
+    )
+
+
+def _snapshot(root: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Maps every file under root (not following links) to (size, mtime_ns).
+    """
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not os.path.islink(os.path.join(dirpath, d))]
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if not os.path.islink(path):
+                stat = os.stat(path)
+                files[os.path.relpath(path, root)] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def stage_job(job: Dict, shared_dir: str, jobs_dir: str = JOBS_DIR) -> str:
+    """
+    Creates a job's working directory: its script, copies of its inputs and
+    links to shared directories. Records what was staged so publish_job can
+    tell outputs from inputs.
+
+    Args:
+        job: Job dict from JobQueue.claim
+        shared_dir: Directory holding the shared data
+        jobs_dir: Directory holding job working directories
+
+    Returns:
+        Working directory path
+    """
+    spec = STAGES[job['stage']]
+    workdir = os.path.abspath(os.path.join(jobs_dir, job['id']))
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(workdir)
+
+    for name in spec['inputs']:
+        for entry in _input_paths(shared_dir, name):
+            source = os.path.join(shared_dir, entry)
+            target = os.path.join(workdir, entry)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.isdir(source):
+                shutil.copytree(source, target)
+            elif entry.endswith('.joblib') and not os.path.basename(entry).startswith('online_'):
+                # Model artifacts are never rewritten, so a hard link is enough
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy2(source, target)
+            else:
+                shutil.copy2(source, target)
+
+    for name in spec['shared']:
+        source = os.path.abspath(os.path.join(shared_dir, name))
+        os.makedirs(source, exist_ok=True)
+        try:
+            os.symlink(source, os.path.join(workdir, name), target_is_directory=True)
+        except OSError:
+            # No symlink permission (e.g. Windows without developer mode): work on a private copy
+            pass
+
+    with open(os.path.join(workdir, spec['script']), 'w', encoding='utf-8') as f:
+        f.write(job['script'])
+    with open(os.path.join(workdir, '.staged.json'), 'w', encoding='utf-8') as f:
+        json.dump(_snapshot(workdir), f)
+    return workdir
+
+
+def publish_job(job: Dict, workdir: str, shared_dir: str, queue: JobQueue) -> List[str]:
+    """
+    Copies the files a job created or changed into the shared directory.
+    Each file is written to a temporary name and renamed over the old one.
+    Nothing is published if a job submitted later already published any of
+    them, so a slow job never overwrites newer results.
+
+    Args:
+        job: Job dict
+        workdir: Job working directory
+        shared_dir: Directory holding the shared data
+        queue: Queue recording which job published each file
+
+    Returns:
+        Published paths, relative to the shared directory
+
+    Raises:
+        PublishConflict: A newer job published one of the outputs
+    """
+    with open(os.path.join(workdir, '.staged.json'), encoding='utf-8') as f:
+        staged = {path: tuple(value) for path, value in json.load(f).items()}
+    private = {STAGES[job['stage']]['script'], '.staged.json'}
+
+    changed = [
+        path for path, state in sorted(_snapshot(workdir).items())
+        if path not in private and staged.get(path) != state
+    ]
+    queue.check_outputs(job, changed)
+
+    for path in changed:
+        target = os.path.join(shared_dir, path)
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        tmp = f"{target}.{job['id']}.tmp"
+        shutil.copy2(os.path.join(workdir, path), tmp)
+        os.replace(tmp, target)
+    queue.record_outputs(job, changed)
+    return changed
@@ -0,0 +1,245 @@
+# model_utils.py
+"""
+Model persistence and batch inference utilities
+Saves a trained estimator with its encoders and feature config as a versioned
+joblib artifact, and scores new CSV/Parquet files in streaming batches
+without retraining
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+import joblib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from feature_utils import transform_features
+
+# Bump when the artifact layout changes
+ARTIFACT_VERSION = 1
+MODEL_DIR = 'models'
+LATEST_FILE = 'latest.json'
+PREDICT_BATCH_SIZE = 50_000
+# Artifacts kept per model directory (the latest one is always kept)
+KEEP_MODELS = 5
+# <target>_<YYYYmmdd_HHMMSS>[_<suffix>].joblib; online checkpoints don't match
+ARTIFACT_NAME = re.compile(r'_(\d{8}_\d{6})(?:_[0-9a-f]+)?\.joblib$')
+
+
+def read_latest(model_dir: str = MODEL_DIR) -> Optional[Dict]:
+    """
+    Reads the pointer to the latest saved model.
+
+    Args:
+        model_dir: Directory holding model artifacts
+
+    Returns:
+        Dict with the artifact 'file' name and its metadata, or None if no
+        model was saved
+    """
+    try:
+        with open(os.path.join(model_dir, LATEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def prune_models(model_dir: str = MODEL_DIR, keep: int = KEEP_MODELS) -> List[str]:
+    """
+    Deletes all but the keep newest model artifacts. The artifact latest.json
+    points to is never deleted, and online checkpoints are not artifacts.
+
+    Args:
+        model_dir: Directory holding model artifacts
+        keep: Number of artifacts to keep
+
+    Returns:
+        Names of the deleted artifacts
+    """
+    if not os.path.isdir(model_dir):
+        return []
+    latest = (read_latest(model_dir) or {}).get('file')
+    artifacts = sorted(
+        (name for name in os.listdir(model_dir) if ARTIFACT_NAME.search(name)),
+        key=lambda name: (ARTIFACT_NAME.search(name).group(1), name), reverse=True
+    )
+    removed = []
+    for name in artifacts[keep:]:
+        if name == latest:
+            continue
+        try:
+            os.remove(os.path.join(model_dir, name))
+            removed.append(name)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def save_model(model, features: Dict, config: Dict, variant: Dict, metrics: Dict,
+               model_dir: str = MODEL_DIR, keep: int = KEEP_MODELS) -> str:
+    """
+    Saves a fitted model with everything needed to score new rows, marks it
+    as the latest model and prunes older artifacts.
+
+    Args:
+        model: Fitted estimator
+        features: Dict returned by feature_utils.load_features
+        config: Training configuration
+        variant: Variant the model was trained as
+        metrics: Test metrics of the model
+        model_dir: Directory holding model artifacts
+        keep: Number of artifacts kept (see prune_models)
+
+    Returns:
+        Artifact path
+    """
+    created = datetime.now()
+    artifact = {
+        'artifact_version': ARTIFACT_VERSION,
+        'created': created.isoformat(),
+        'model': model,
+        'model_type': config['model_type'],
+        'variant': variant['name'],
+        'balancing': variant['label'],
+        'target': config['target'],
+        'features': list(config['features']),
+        'encoding': features['encoding'],
+        'encoders': {col: encoder.classes_.tolist() for col, encoder in features['encoders'].items()},
+        'sparse_spec': features['sparse_spec'],
+        'target_classes': features['target_encoder'].classes_.tolist(),
+        'metrics': {key: metrics[key] for key in ('accuracy', 'precision', 'recall', 'f1_score')},
+    }
+
+    os.makedirs(model_dir, exist_ok=True)
+    # The random suffix keeps runs finishing in the same second apart
+    name = f"{config['target']}_{created:%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}.joblib"
+    path = os.path.join(model_dir, name)
+    # Left uncompressed so load_model can memory-map the tree arrays
+    joblib.dump(artifact, path)
+
+    with open(os.path.join(model_dir, LATEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'file': name,
+            'artifact_version': ARTIFACT_VERSION,
+            'target': config['target'],
+            'variant': variant['name'],
+            'created': artifact['created'],
+        }, f, indent=2, ensure_ascii=False)
+
+    print(f"✓ Model saved to {path}")
+    removed = prune_models(model_dir, keep)
+    if removed:
+        print(f"✓ Removed {len(removed)} older model artifact(s)")
+    return path
+
+
+def load_model(model_path: Optional[str] = None, model_dir: str = MODEL_DIR) -> Dict:
+    """
+    Loads a model artifact, memory-mapping its arrays.
+
+    Args:
+        model_path: Artifact path (defaults to the latest saved model)
+        model_dir: Directory holding model artifacts
+
+    Returns:
+        Artifact dict (see save_model)
+    """
+    if model_path is None:
+        latest = read_latest(model_dir)
+        if latest is None:
+            raise FileNotFoundError(f"No saved model found in {model_dir}. Please train a model first.")
+        model_path = os.path.join(model_dir, latest['file'])
+
+    artifact = joblib.load(model_path, mmap_mode='r')
+    if artifact.get('artifact_version') != ARTIFACT_VERSION:
+        raise ValueError(
+            f"{model_path} has artifact version {artifact.get('artifact_version')}, "
+            f"expected {ARTIFACT_VERSION}. Please retrain the model."
+        )
+    return artifact
+
+
+def iter_batches(input_file: str, batch_size: int = PREDICT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Reads a CSV or Parquet file in batches.
+
+    Args:
+        input_file: CSV or Parquet filename
+        batch_size: Rows per batch
+
+    Returns:
+        Iterator of DataFrames
+    """
+    if input_file.endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(input_file).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_file, chunksize=batch_size)
+
+
+def predict_file(input_file: str, output_file: str, model_path: Optional[str] = None,
+                 batch_size: int = PREDICT_BATCH_SIZE) -> Dict:
+    """
+    Scores a CSV or Parquet file with a saved model, batch by batch, and writes
+    the input rows with the predicted class and its probability to a CSV file.
+
+    Args:
+        input_file: CSV or Parquet file with the model's feature columns
+        output_file: Output CSV filename
+        model_path: Artifact path (defaults to the latest saved model)
+        batch_size: Rows scored per batch
+
+    Returns:
+        Dict with the rows scored, elapsed seconds, rows per second and the
+        number of unknown categories per column
+    """
+    artifact = load_model(model_path)
+    model = artifact['model']
+    target = artifact['target']
+    classes = np.array(artifact['target_classes'], dtype=object)[model.classes_]
+    print(f"✓ Loaded {artifact['model_type']} model ({artifact['variant']}) predicting '{target}'")
+
+    total = 0
+    unknown_totals = {}
+    start = time.perf_counter()
+
+    for i, batch in enumerate(iter_batches(input_file, batch_size)):
+        missing = [col for col in artifact['features'] if col not in batch.columns]
+        if missing:
+            raise ValueError(f"Input is missing feature columns: {', '.join(missing)}")
+
+        X, unknown = transform_features(batch, artifact['features'], artifact['encoders'], artifact['sparse_spec'])
+        proba = model.predict_proba(X)
+        best = proba.argmax(axis=1)
+
+        batch[f'predicted_{target}'] = classes[best]
+        batch['prediction_probability'] = proba[np.arange(len(best)), best].round(4)
+        batch.to_csv(output_file, mode='w' if i == 0 else 'a', header=i == 0, index=False, encoding='utf-8')
+
+        total += len(batch)
+        for col, count in unknown.items():
+            unknown_totals[col] = unknown_totals.get(col, 0) + count
+        print(f"  Batch {i + 1}: {total} rows scored")
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+
+    print(f"\n✓ Scored {total} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    for col, count in unknown_totals.items():
+        if count:
+            print(f"  '{col}': {count} values unseen in training")
+    print(f"✓ Predictions saved to {output_file}")
+
+    return {
+        'rows': total,
+        'seconds': elapsed,
+        'rows_per_second': rate,
+        'unknown_categories': unknown_totals,
+    }
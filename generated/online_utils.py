@@ -0,0 +1,267 @@
+# online_utils.py
+"""
+Online training utilities
+Updates a partial_fit model (SGD or naive Bayes over hashed features) with
+only the rows appended to the training data since the last checkpoint. Every
+batch is scored before the model learns from it, and the resulting rolling
+holdout metrics are used to detect drift and trigger a full retrain.
+"""
+
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from feature_utils import HASH_FEATURES, as_text, sparse_transform
+from incremental_utils import config_hash, fingerprint
+from model_utils import ARTIFACT_VERSION, MODEL_DIR
+
+ONLINE_CHUNKSIZE = 1_000
+HOLDOUT_WINDOW = 5_000
+MIN_DRIFT_ROWS = 100
+HISTORY_LIMIT = 100
+DEFAULT_F1_DROP = 0.1   # drop of a batch's F1 below the rolling F1 that triggers a full retrain
+# Bump when the hashed features change, so checkpoints fed the old ones are retrained
+ONLINE_FEATURE_VERSION = 2
+
+
+def checkpoint_path(target: str, model_dir: str = MODEL_DIR) -> str:
+    """
+    Returns the online checkpoint path for a target.
+
+    Args:
+        target: Target column
+        model_dir: Directory holding model artifacts
+
+    Returns:
+        Checkpoint filename (e.g. models/online_contract_type.joblib)
+    """
+    return os.path.join(model_dir, f'online_{target}.joblib')
+
+
+def make_online_model(online_model: str, random_state: int):
+    """
+    Creates an unfitted estimator supporting partial_fit and predict_proba.
+
+    Args:
+        online_model: 'sgd' (logistic regression by SGD) or 'naive_bayes'
+        random_state: Random seed
+
+    Returns:
+        scikit-learn estimator
+    """
+    if online_model == 'naive_bayes':
+        return MultinomialNB()
+    return SGDClassifier(loss='log_loss', random_state=random_state)
+
+
+def _online_config(config: Dict) -> Dict:
+    """
+    Parts of the training config that invalidate the checkpoint when changed.
+    """
+    return {
+        'target': config['target'],
+        'features': list(config['features']),
+        'online_model': config.get('online_model', 'sgd'),
+        'random_state': config['random_state'],
+        'hash_features': HASH_FEATURES,
+        'feature_version': ONLINE_FEATURE_VERSION,
+    }
+
+
+def _read_chunks(input_file: str, offset: int, columns: List[str], chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Reads a CSV file from a byte offset (0 for the whole file) in chunks.
+    """
+    if offset == 0:
+        yield from pd.read_csv(input_file, chunksize=chunksize)
+        return
+    with open(input_file, 'rb') as f:
+        f.seek(offset)
+        yield from pd.read_csv(f, header=None, names=columns, chunksize=chunksize)
+
+
+def _new_state(input_file: str, config: Dict) -> Dict:
+    """
+    Starts an empty checkpoint for a full pass over the input file. The
+    checkpoint is also a model artifact that predict.py can load.
+    """
+    target = config['target']
+    options = _online_config(config)
+    classes = sorted(as_text(pd.read_csv(input_file, usecols=[target])[target]).dropna().unique())
+
+    return {
+        'artifact_version': ARTIFACT_VERSION,
+        'created': datetime.now().isoformat(),
+        'model': make_online_model(options['online_model'], config['random_state']),
+        'model_type': options['online_model'],
+        'variant': 'online',
+        'balancing': 'none',
+        'target': target,
+        'features': options['features'],
+        'encoding': 'hashed',
+        'encoders': {},
+        'sparse_spec': {'numeric': [], 'one_hot': {}, 'hashed': options['features'], 'hash_features': HASH_FEATURES},
+        'target_classes': classes,
+        'metrics': {},
+        'online': {
+            'config_hash': config_hash(options),
+            'columns': list(pd.read_csv(input_file, nrows=0).columns),
+            'offset': 0,
+            'fingerprint': None,
+            'rows_seen': 0,
+            'class_counts': [0] * len(classes),
+            'holdout_true': np.empty(0, dtype=np.int64),
+            'holdout_pred': np.empty(0, dtype=np.int64),
+            'history': [],
+        },
+    }
+
+
+def load_checkpoint(path: str) -> Optional[Dict]:
+    """
+    Loads an online checkpoint.
+
+    Args:
+        path: Checkpoint filename
+
+    Returns:
+        Checkpoint dict, or None if missing or unreadable
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        state = joblib.load(path)
+        return state if state.get('artifact_version') == ARTIFACT_VERSION else None
+    except Exception as e:
+        print(f"  Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def _resume_reason(state: Optional[Dict], input_file: str, config: Dict) -> Optional[str]:
+    """
+    Returns why the checkpoint cannot be resumed, or None if it can.
+    """
+    if state is None:
+        return "no checkpoint"
+    online = state['online']
+    if online['config_hash'] != config_hash(_online_config(config)):
+        return "training configuration changed"
+    size = os.path.getsize(input_file)
+    if size < online['offset'] or fingerprint(input_file, online['offset']) != online['fingerprint']:
+        return "training data was rewritten"
+    return None
+
+
+def _consume(state: Dict, input_file: str, chunksize: int, f1_drop: Optional[float]) -> Optional[str]:
+    """
+    Scores then learns from every row after the checkpoint offset.
+
+    Returns:
+        Reason a full retrain is required (new classes or drift), or None
+    """
+    online = state['online']
+    model = state['model']
+    target = state['target']
+    classes = state['target_classes']
+    size = os.path.getsize(input_file)
+
+    for chunk in _read_chunks(input_file, online['offset'], online['columns'], chunksize):
+        chunk = chunk[chunk[target].notna()]
+        if chunk.empty:
+            continue
+
+        labels = as_text(chunk[target])
+        new_classes = sorted(set(labels.unique()) - set(classes))
+        if new_classes:
+            return f"new target classes {new_classes}"
+
+        X = sparse_transform(chunk, state['sparse_spec'], verbose=False)
+        y = pd.Categorical(labels, categories=classes).codes.astype(np.int64)
+
+        if online['rows_seen']:
+            # Test-then-train: the batch is a holdout for the model so far
+            y_pred = model.predict(X)
+            batch_f1 = float(f1_score(y, y_pred, average='weighted', zero_division=0))
+            window_f1 = (
+                float(f1_score(online['holdout_true'], online['holdout_pred'], average='weighted', zero_division=0))
+                if len(online['holdout_true']) else None
+            )
+            online['history'].append({
+                'rows': int(len(y)),
+                'f1_score': batch_f1,
+                'rolling_f1_score': window_f1,
+                'at': datetime.now().isoformat(),
+            })
+            online['history'] = online['history'][-HISTORY_LIMIT:]
+            online['holdout_true'] = np.concatenate([online['holdout_true'], y])[-HOLDOUT_WINDOW:]
+            online['holdout_pred'] = np.concatenate([online['holdout_pred'], y_pred])[-HOLDOUT_WINDOW:]
+
+            if (f1_drop is not None and window_f1 is not None and len(y) >= MIN_DRIFT_ROWS
+                    and batch_f1 < window_f1 - f1_drop):
+                return f"F1 on new rows fell to {batch_f1:.4f} from a rolling {window_f1:.4f}"
+
+        model.partial_fit(X, y, classes=np.arange(len(classes)))
+        online['rows_seen'] += int(len(y))
+        online['class_counts'] = (np.asarray(online['class_counts']) + np.bincount(y, minlength=len(classes))).tolist()
+
+    online['offset'] = size
+    online['fingerprint'] = fingerprint(input_file, size)
+    return None
+
+
+def update_online_model(input_file: str, config: Dict, chunksize: int = ONLINE_CHUNKSIZE,
+                        f1_drop: float = DEFAULT_F1_DROP) -> Dict:
+    """
+    Brings the online model up to date with the training data. Resumes from
+    the checkpoint when possible, so only appended rows are read; falls back
+    to a full pass when there is no usable checkpoint, the data was rewritten,
+    new target classes appear or the rolling F1 drops by more than f1_drop.
+
+    Args:
+        input_file: Cleaned CSV filename
+        config: Training configuration ('online_model' selects 'sgd' or 'naive_bayes')
+        chunksize: Rows per partial_fit batch
+        f1_drop: F1 drop that triggers a full retrain
+
+    Returns:
+        Checkpoint dict, with 'full_retrain' and 'new_rows' describing this update
+    """
+    path = checkpoint_path(config['target'])
+    state = load_checkpoint(path)
+    reason = _resume_reason(state, input_file, config)
+    new_rows = 0
+
+    if reason is None:
+        online = state['online']
+        print(f"✓ Resuming from checkpoint at byte offset {online['offset']} ({online['rows_seen']} rows seen)")
+        rows_before = online['rows_seen']
+        reason = _consume(state, input_file, chunksize, f1_drop)
+        new_rows = state['online']['rows_seen'] - rows_before
+
+    if reason is not None:
+        print(f"Full pass over {input_file} ({reason})")
+        state = _new_state(input_file, config)
+        _consume(state, input_file, chunksize, f1_drop=None)
+        new_rows = state['online']['rows_seen']
+
+    holdout_true, holdout_pred = state['online']['holdout_true'], state['online']['holdout_pred']
+    if len(holdout_true):
+        state['metrics'] = {
+            'accuracy': float(accuracy_score(holdout_true, holdout_pred)),
+            'precision': float(precision_score(holdout_true, holdout_pred, average='weighted', zero_division=0)),
+            'recall': float(recall_score(holdout_true, holdout_pred, average='weighted', zero_division=0)),
+            'f1_score': float(f1_score(holdout_true, holdout_pred, average='weighted', zero_division=0)),
+        }
+    state['updated'] = datetime.now().isoformat()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(state, path)
+    print(f"✓ Online model updated with {new_rows} rows, checkpoint saved to {path}")
+
+    state['full_retrain'] = reason
+    state['new_rows'] = new_rows
+    return state
@@ -0,0 +1,200 @@
+"""
+Pipeline Runner Script
+Runs scrape -> clean -> train in one process, handing DataFrames from one
+stage to the next in memory instead of writing and re-parsing CSV files.
+Each stage's output is stored under a key built from its input's content and
+its configuration (see pipeline_utils), so a stage whose input and
+configuration are unchanged is skipped on re-run. CSV and JSON files are only
+written as exports.
+
+Stage configurations come from the generated scraper.py, clean_data.py and
+train_model.py.
+
+Usage: python pipeline.py [--force]
+"""
+
+import json
+import sys
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Optional
+from csv_utils import build_row_index
+from profile_utils import write_profile
+from chart_utils import write_chart_views
+from incremental_utils import discard_manifest
+from stage_utils import StageTimer
+from pipeline_utils import StageCache, as_read_csv, frame_hash, rows_to_frame, stage_key
+import clean_data
+import train_model
+
+
+def _export_frame(cache: StageCache, df: pd.DataFrame, path: str, key: str, charts: bool = False):
+    """
+    Writes a stage's DataFrame as a CSV export with the sidecars the UI reads,
+    unless the file already holds this output.
+    """
+    if cache.export_current(path, key):
+        print(f"✓ {path} is up to date")
+        return
+    df.to_csv(path, index=False)
+    build_row_index(path)
+    write_profile(path, df)
+    if charts:
+        write_chart_views(path, df)
+    cache.record_export(path, key)
+    print(f"✓ Exported {len(df)} rows to {path}")
+
+
+def _scrape_stage(cache: StageCache, timer: StageTimer, source_file: Optional[str],
+                  max_age: Optional[float], force: bool):
+    """
+    Returns the scraped DataFrame, its content hash and whether it was reused.
+    """
+    if source_file:
+        # Start from an existing scrape: read it once
+        with timer.stage('scrape [read]') as record:
+            df = pd.read_csv(source_file)
+            record['rows'] = len(df)
+        return df, frame_hash(df), False
+
+    import scraper
+    config = {
+        'target_url': scraper.TARGET_URL,
+        'pagination_template': getattr(scraper, 'PAGINATION_TEMPLATE', None),
+        'pages': getattr(scraper, 'PAGES', 1),
+        'container': scraper.CONTAINER_SELECTOR,
+        'fields': scraper.FIELD_EXTRACTORS,
+        'fieldnames': scraper.FIELDNAMES,
+    }
+    key = stage_key('scrape', None, config)
+    meta = None if force else cache.meta('scrape', key, max_age)
+    if meta is not None:
+        print(f"✓ Reusing scrape from {meta['created']} ({meta['rows']} rows)")
+        return cache.load_frame('scrape', key), meta['output_hash'], True
+
+    with timer.stage('scrape') as record:
+        df = rows_to_frame(scraper.scrape(), scraper.FIELDNAMES)
+        record['rows_out'] = len(df)
+    if df.empty:
+        raise ValueError("No data was extracted. Check your selectors.")
+    output_hash = frame_hash(df)
+    cache.store('scrape', key, {'rows': len(df), 'output_hash': output_hash}, df)
+    return df, output_hash, False
+
+
+def _clean_stage(cache: StageCache, timer: StageTimer, scraped: pd.DataFrame, scraped_hash: str, force: bool):
+    """
+    Returns the cleaned DataFrame, its content hash, its cache key and whether it was reused.
+    """
+    key = stage_key('clean', scraped_hash, clean_data.CLEANING_CONFIG)
+    meta = None if force else cache.meta('clean', key)
+    if meta is not None:
+        print(f"✓ Cleaning unchanged, reusing {meta['rows']} cleaned rows")
+        return cache.load_frame('clean', key), meta['output_hash'], key, True
+
+    fitted = {'fill': {}, 'normalize': {}}
+    cleaned = as_read_csv(clean_data.clean_frame(scraped.copy(), fitted, set(), timer))
+    output_hash = frame_hash(cleaned)
+    cache.store('clean', key, {'rows': len(cleaned), 'input_hash': scraped_hash,
+                               'output_hash': output_hash, 'fitted': fitted}, cleaned)
+    return cleaned, output_hash, key, False
+
+
+def _train_stage(cache: StageCache, cleaned: pd.DataFrame, cleaned_hash: str,
+                 clean_file: str, force: bool):
+    """
+    Returns the training results, their cache key and whether they were reused.
+    """
+    config = {
+        'config': train_model.TRAINING_CONFIG,
+        'variants': train_model.VARIANTS,
+        'search_space': train_model.SEARCH_SPACE,
+    }
+    key = stage_key('train', cleaned_hash, config)
+    meta = None if force else cache.meta('train', key)
+    if meta is not None:
+        print(f"✓ Training data and configuration unchanged, reusing results from {meta['created']}")
+        return meta['results'], key, True
+
+    results = train_model.train_models(clean_file, None, train_model.TRAINING_CONFIG, cleaned, cleaned_hash)
+    cache.store('train', key, {'input_hash': cleaned_hash, 'results': results})
+    return results, key, False
+
+
+def run_pipeline(exports: Dict[str, Optional[str]], source_file: Optional[str] = None,
+                 scrape_max_age: Optional[float] = 3600, force: bool = False) -> Dict:
+    """
+    Runs the scrape, clean and train stages, skipping those whose input and
+    configuration are unchanged.
+
+    Args:
+        exports: Stage ('scrape', 'clean', 'train') -> export filename, or None for no export
+        source_file: Scraped CSV to start from instead of scraping
+        scrape_max_age: Seconds a stored scrape with the same configuration is reused for
+        force: Run every stage even when its output is stored
+
+    Returns:
+        Dict with the training 'results', whether each stage was 'reused' and the stage timings
+    """
+    start_time = datetime.now()
+    cache = StageCache()
+    timer = StageTimer()
+
+    print("=" * 70)
+    print("🚀 Pipeline Runner - Starting")
+    print("=" * 70)
+
+    print("\n[1/3] Scrape")
+    scraped, scraped_hash, scrape_reused = _scrape_stage(cache, timer, source_file, scrape_max_age, force)
+    if exports.get('scrape') and not source_file:
+        _export_frame(cache, scraped, exports['scrape'], scraped_hash)
+
+    print("\n[2/3] Clean")
+    cleaned, cleaned_hash, clean_key, clean_reused = _clean_stage(cache, timer, scraped, scraped_hash, force)
+    if exports.get('clean'):
+        clean_export = exports['clean']
+        if not cache.export_current(clean_export, clean_key):
+            # The incremental cleaner's manifest describes the previous export
+            discard_manifest(clean_export)
+        _export_frame(cache, cleaned, clean_export, clean_key, charts=True)
+
+    print("\n[3/3] Train")
+    results, train_key, train_reused = _train_stage(
+        cache, cleaned, cleaned_hash, exports.get('clean') or 'clean_data.csv', force
+    )
+    if exports.get('train'):
+        with open(exports['train'], 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✓ Results saved to: {exports['train']}")
+
+    reused = {'scrape': scrape_reused, 'clean': clean_reused, 'train': train_reused}
+    timer.print_summary()
+
+    execution_time = (datetime.now() - start_time).total_seconds()
+    print("\n" + "=" * 70)
+    print(f"✅ Pipeline completed ({', '.join(s for s, r in reused.items() if r) or 'no'} stage(s) reused)")
+    print(f"⏱️  Execution time: {execution_time:.2f} seconds")
+    print("=" * 70)
+
+    return {'results': results, 'reused': reused, 'stages': timer.stages}
+
+
+if __name__ == "__main__":
+    # Set to a scraped CSV (e.g. "scraped_data.csv") to skip scraping
+    SOURCE_FILE = None
+    SCRAPE_MAX_AGE = 3600
+    # Stage -> export filename (None to keep a stage's output in the cache only)
+    EXPORTS = {
+        'scrape': "scraped_data.csv",
+        'clean': "clean_data.csv",
+        'train': "model_results.json",
+    }
+    FORCE = '--force' in sys.argv[1:]
+
+    try:
+        run_pipeline(EXPORTS, SOURCE_FILE, SCRAPE_MAX_AGE, FORCE)
+    except Exception as e:
+        print(f"\n❌ An error occurred: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,232 @@
+# pipeline_utils.py
+"""
+Pipeline caching utilities
+Content-addressed storage of stage outputs for pipeline.py. A stage's key is
+the hash of its input's content and its own configuration, so a re-run with
+the same input and configuration loads the stored output instead of running
+the stage. DataFrames are stored as pickles, which keep dtypes exactly and
+need no parsing or type inference on load.
+"""
+
+import hashlib
+import json
+import os
+import time
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+PIPELINE_CACHE_DIR = 'pipeline_cache'
+PIPELINE_VERSION = 2   # bump when a stage's code changes what it outputs
+MAX_STAGE_ENTRIES = 4
+NUMERIC_PROBE_ROWS = 100
+# Strings pandas.read_csv reads as NaN by default (its na_values defaults)
+CSV_NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+# Strings pandas.read_csv reads as booleans when a column holds nothing else
+CSV_BOOLEAN_VALUES = {'True': True, 'TRUE': True, 'true': True, 'False': False, 'FALSE': False, 'false': False}
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """
+    Hashes a DataFrame's columns, dtypes and values.
+
+    Args:
+        df: DataFrame
+
+    Returns:
+        sha1 hex digest
+    """
+    digest = hashlib.sha1()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, input_hash: Optional[str], config: Any) -> str:
+    """
+    Builds a stage's cache key.
+
+    Args:
+        stage: Stage name
+        input_hash: Content hash of the stage's input (None for a source stage)
+        config: JSON-serialisable stage configuration
+
+    Returns:
+        sha1 hex digest
+    """
+    payload = json.dumps([stage, input_hash, config, PIPELINE_VERSION], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def as_read_csv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gives a DataFrame handed between stages the values and dtypes writing it
+    to CSV and reading it back would give, so in-memory runs match file-based
+    ones: pandas' default missing-value strings (including the 'nan' left by
+    str conversions) become NaN, columns holding only numbers become numeric,
+    columns holding only True/False strings become booleans and the index is
+    reset.
+
+    Args:
+        df: DataFrame
+
+    Returns:
+        Normalised DataFrame
+    """
+    df = df.reset_index(drop=True)
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        # Exact matches only: read_csv does not strip fields before comparing
+        values = df[col].mask(df[col].isna() | df[col].isin(CSV_NA_VALUES))
+        present = values.dropna()
+        # A text value among the first ones rules out a numeric column without parsing it all
+        if pd.to_numeric(present.head(NUMERIC_PROBE_ROWS), errors='coerce').isna().any():
+            if present.head(NUMERIC_PROBE_ROWS).isin(CSV_BOOLEAN_VALUES).all() and present.isin(CSV_BOOLEAN_VALUES).all():
+                # read_csv keeps object dtype when a boolean column has missing values
+                booleans = values.map(CSV_BOOLEAN_VALUES)
+                df[col] = booleans.astype(bool) if len(present) == len(values) else booleans.astype(object)
+            else:
+                df[col] = values
+            continue
+        numeric = pd.to_numeric(values, errors='coerce')
+        df[col] = numeric if numeric.notna().sum() == len(present) else values
+    return df
+
+
+def rows_to_frame(rows: List[Dict], fieldnames: List[str]) -> pd.DataFrame:
+    """
+    Builds a DataFrame from scraped rows as reading them from a CSV file would.
+
+    Args:
+        rows: Row dicts
+        fieldnames: Column order
+
+    Returns:
+        DataFrame
+    """
+    return as_read_csv(pd.DataFrame.from_records(rows, columns=fieldnames))
+
+
+class StageCache:
+    """
+    Stage outputs stored under PIPELINE_CACHE_DIR/<stage>/<key>.*, keeping the
+    most recently used MAX_STAGE_ENTRIES per stage.
+    """
+
+    def __init__(self, directory: str = PIPELINE_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, stage: str, key: str, ext: str) -> str:
+        return os.path.join(self.directory, stage, f'{key}.{ext}')
+
+    def meta(self, stage: str, key: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        Returns the metadata of a stored output, or None if it is missing or
+        older than max_age seconds.
+        """
+        path = self._path(stage, key, 'json')
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if max_age is not None and time.time() - meta['stored_at'] > max_age:
+            return None
+        os.utime(path)
+        return meta
+
+    def load_frame(self, stage: str, key: str) -> pd.DataFrame:
+        """
+        Loads a stored DataFrame.
+        """
+        return pd.read_pickle(self._path(stage, key, 'pkl'))
+
+    def store(self, stage: str, key: str, meta: Dict, df: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        Stores a stage output: its metadata (which may hold a JSON result)
+        and optionally a DataFrame. Files are written under temporary names
+        and renamed, metadata last, so a partial entry is never read.
+
+        Args:
+            stage: Stage name
+            key: Stage cache key
+            meta: JSON-serialisable metadata
+            df: DataFrame output
+
+        Returns:
+            Stored metadata (with 'stored_at')
+        """
+        os.makedirs(os.path.join(self.directory, stage), exist_ok=True)
+        meta = {**meta, 'key': key, 'stored_at': time.time(), 'created': datetime.now().isoformat()}
+
+        if df is not None:
+            path = self._path(stage, key, 'pkl')
+            df.to_pickle(path + '.tmp', compression=None)
+            os.replace(path + '.tmp', path)
+
+        path = self._path(stage, key, 'json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(path + '.tmp', path)
+
+        self._prune(stage)
+        return meta
+
+    def _prune(self, stage: str):
+        """
+        Removes the least recently used entries of a stage beyond MAX_STAGE_ENTRIES.
+        """
+        directory = os.path.join(self.directory, stage)
+        metas = sorted(
+            (entry for entry in os.listdir(directory) if entry.endswith('.json')),
+            key=lambda entry: os.path.getmtime(os.path.join(directory, entry)),
+            reverse=True,
+        )
+        for entry in metas[MAX_STAGE_ENTRIES:]:
+            key = entry[:-len('.json')]
+            for ext in ('json', 'pkl'):
+                try:
+                    os.remove(os.path.join(directory, f'{key}.{ext}'))
+                except FileNotFoundError:
+                    pass
+
+    def export_current(self, path: str, key: str) -> bool:
+        """
+        Whether an export file still holds the output it was written from.
+
+        Args:
+            path: Export filename
+            key: Stage cache key of the output
+
+        Returns:
+            True if the file is unchanged since it was exported from key
+        """
+        exports = self._exports()
+        entry = exports.get(os.path.abspath(path))
+        if entry is None or entry['key'] != key or not os.path.isfile(path):
+            return False
+        stat = os.stat(path)
+        return entry['size'] == stat.st_size and entry['mtime_ns'] == str(stat.st_mtime_ns)
+
+    def record_export(self, path: str, key: str):
+        """
+        Records that an export file was written from a stage output.
+        """
+        exports = self._exports()
+        stat = os.stat(path)
+        exports[os.path.abspath(path)] = {'key': key, 'size': stat.st_size, 'mtime_ns': str(stat.st_mtime_ns)}
+        os.makedirs(self.directory, exist_ok=True)
+        exports_file = os.path.join(self.directory, 'exports.json')
+        with open(exports_file + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(exports, f, indent=2)
+        os.replace(exports_file + '.tmp', exports_file)
+
+    def _exports(self) -> Dict:
+        exports_file = os.path.join(self.directory, 'exports.json')
+        if not os.path.isfile(exports_file):
+            return {}
+        with open(exports_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
@@ -0,0 +1,22 @@
+"""
+Batch Prediction Script
+Scores new rows with the latest model saved by train_model.py
+
+Usage: python predict.py [input_file] [output_file] [model_path]
+"""
+
+import sys
+from model_utils import predict_file
+
+
+if __name__ == "__main__":
+    INPUT_FILE = sys.argv[1] if len(sys.argv) > 1 else "scraped_data.csv"
+    OUTPUT_FILE = sys.argv[2] if len(sys.argv) > 2 else "predictions.csv"
+    MODEL_PATH = sys.argv[3] if len(sys.argv) > 3 else None
+    BATCH_SIZE = 50_000
+
+    try:
+        predict_file(INPUT_FILE, OUTPUT_FILE, MODEL_PATH, BATCH_SIZE)
+    except Exception as e:
+        print(f"\nError: {e}")
+        sys.exit(1)
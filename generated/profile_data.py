@@ -0,0 +1,56 @@
+"""
+Profile Rebuild Script
+Rebuilds the profile and chart views sidecars of CSV files when they are
+missing or stale, e.g. after an incremental clean appended rows and discarded
+them (see profile_utils and chart_utils). The API routes start it when they
+find no fresh sidecar. The file is read once for both, with the NA handling
+of profile_utils.read_csv_cells.
+
+Usage: python profile_data.py [csv_file ...]   (defaults to clean_data.csv)
+"""
+
+import os
+import sys
+from profile_utils import load_profile, read_csv_cells, write_profile
+from chart_utils import load_chart_views, write_chart_views
+
+
+def rebuild_sidecars(csv_files) -> int:
+    """
+    Writes the profile and chart views of each file that lacks a fresh one.
+
+    Args:
+        csv_files: CSV filenames
+
+    Returns:
+        Number of sidecars written
+    """
+    written = 0
+    for csv_file in csv_files:
+        if not os.path.isfile(csv_file):
+            print(f"⚠️  {csv_file} not found")
+            continue
+        stale_profile = load_profile(csv_file) is None
+        stale_charts = load_chart_views(csv_file) is None
+        if not (stale_profile or stale_charts):
+            print(f"✓ {csv_file} sidecars are up to date")
+            continue
+
+        df = read_csv_cells(csv_file)
+        if stale_profile and write_profile(csv_file, df) is not None:
+            written += 1
+        if stale_charts and write_chart_views(csv_file, df) is not None:
+            written += 1
+    return written
+
+
+if __name__ == "__main__":
+    CSV_FILES = sys.argv[1:] or ["clean_data.csv"]
+
+    try:
+        rebuild_sidecars(CSV_FILES)
+    except Exception as e:
+        print(f"\n❌ An error occurred: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,472 @@
+# profile_utils.py
+"""
+Dataset profiling utilities
+Computes the statistics shown by the data and visualization pages in a single
+pass and caches them in a JSON sidecar next to the CSV file
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+from csv_utils import read_row_index
+from sketch_utils import HyperLogLog, KLLQuantiles, FrequentItems, as_text
+
+TOP_FREQUENCIES = 20
+SAMPLE_VALUES = 5
+TYPE_THRESHOLD = 0.8
+APPROXIMATE_CHUNKSIZE = 100_000
+# Files with more rows are profiled with sketches unless overridden
+APPROXIMATE_PROFILE_ROWS = 1_000_000
+ROW_SIZE_SAMPLE_BYTES = 1 << 20
+
+
+def profile_path(csv_file: str) -> str:
+    """
+    Returns the profile sidecar path for a CSV file.
+
+    Args:
+        csv_file: CSV filename
+
+    Returns:
+        Sidecar filename (e.g. clean_data.profile.json)
+    """
+    return os.path.splitext(csv_file)[0] + '.profile.json'
+
+
+def file_key(csv_file: str) -> Dict:
+    """
+    Identifies a version of a file by size, modification time and content hash.
+
+    Args:
+        csv_file: CSV filename
+
+    Returns:
+        Dict with file name, size, mtime_ns (as a string, to survive JSON
+        number precision in JavaScript) and sha1
+    """
+    stat = os.stat(csv_file)
+    digest = hashlib.sha1()
+    with open(csv_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {
+        'file': os.path.basename(csv_file),
+        'size': stat.st_size,
+        'mtime_ns': str(stat.st_mtime_ns),
+        'sha1': digest.hexdigest(),
+    }
+
+
+def read_csv_cells(csv_file: str, **kwargs) -> pd.DataFrame:
+    """
+    Reads a CSV file for profiling. Only empty cells become NaN: strings
+    pandas would otherwise read as missing ('NA', 'null', 'None', ...) are
+    kept, as the API routes keep them.
+
+    Args:
+        csv_file: CSV filename
+        **kwargs: Other pandas.read_csv arguments (e.g. chunksize)
+
+    Returns:
+        DataFrame, or a chunk iterator when chunksize is given
+    """
+    return pd.read_csv(csv_file, keep_default_na=False, na_values=[''], **kwargs)
+
+
+def _missing_mask(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Marks nulls and blank strings, matching what the API routes count as missing.
+    """
+    mask = df.isnull()
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            mask[col] |= df[col].astype(str).str.strip() == ''
+    return mask
+
+
+def _detect_type(values: pd.Series) -> str:
+    """
+    Classifies non-missing values as numeric, datetime or categorical.
+    """
+    if values.empty:
+        return 'categorical'
+    if pd.api.types.is_numeric_dtype(values):
+        return 'numeric'
+    if pd.to_numeric(values, errors='coerce').notna().mean() > TYPE_THRESHOLD:
+        return 'numeric'
+    dates = pd.to_datetime(values, errors='coerce', format='mixed')
+    if dates.notna().mean() > TYPE_THRESHOLD:
+        return 'datetime'
+    return 'categorical'
+
+
+def _numeric_stats(values: np.ndarray) -> Dict:
+    """
+    Computes min, max, mean, median, std (population) and quartiles.
+    """
+    ordered = np.sort(values)
+    n = len(ordered)
+    return {
+        'min': float(ordered[0]),
+        'max': float(ordered[-1]),
+        'mean': round(float(ordered.mean()), 2),
+        'median': round(float(np.median(ordered)), 2),
+        'std': round(float(ordered.std()), 2),
+        'q1': float(ordered[int(n * 0.25)]),
+        'q3': float(ordered[int(n * 0.75)]),
+    }
+
+
+def _frequencies(values: pd.Series) -> List[Dict]:
+    """
+    Returns the most frequent values with counts and percentages.
+    """
+    counts = as_text(values).value_counts()
+    total = len(values)
+    return [
+        {'value': value, 'count': int(count), 'percentage': round(count / total * 100, 2)}
+        for value, count in counts.head(TOP_FREQUENCIES).items()
+    ]
+
+
+def profile_dataframe(df: pd.DataFrame) -> Dict:
+    """
+    Profiles a DataFrame: missing values, duplicates, column types, unique
+    counts, numeric summaries and value frequencies.
+
+    Args:
+        df: DataFrame to profile
+
+    Returns:
+        Profile dict using the field names returned by the API routes
+    """
+    missing = _missing_mask(df)
+    missing_counts = missing.sum()
+    total_rows = len(df)
+    total_cells = df.size
+    total_missing = int(missing_counts.sum())
+
+    column_stats = []
+    columns = []
+    numeric_columns = []
+    categorical_columns = []
+    summary = {}
+
+    for col in df.columns:
+        missing_count = int(missing_counts[col])
+        values = df[col][~missing[col]]
+        col_type = _detect_type(values)
+        text = as_text(values)
+
+        column_stats.append({
+            'columnName': col,
+            'missingCount': missing_count,
+            'missingPercentage': round(missing_count / total_rows * 100, 2) if total_rows else 0,
+        })
+        columns.append({
+            'name': col,
+            'type': col_type,
+            'uniqueValues': int(text.nunique()),
+            'nullCount': missing_count,
+            'sampleValues': text.drop_duplicates().head(SAMPLE_VALUES).tolist(),
+        })
+
+        if col_type == 'numeric':
+            numeric_columns.append(col)
+            numbers = pd.to_numeric(values, errors='coerce').dropna().to_numpy(dtype=float)
+            if len(numbers):
+                summary[col] = _numeric_stats(numbers)
+        elif col_type == 'categorical':
+            categorical_columns.append(col)
+            summary[col] = _frequencies(values)
+
+    return {
+        'totalRows': total_rows,
+        'totalColumns': len(df.columns),
+        'totalCells': int(total_cells),
+        'totalMissingValues': total_missing,
+        'completenessRate': round((total_cells - total_missing) / total_cells * 100, 2) if total_cells else 100,
+        'duplicateRows': int(df.duplicated().sum()),
+        'columnStats': column_stats,
+        'columns': columns,
+        'numericColumns': numeric_columns,
+        'categoricalColumns': categorical_columns,
+        'summary': summary,
+    }
+
+
+def estimate_rows(csv_file: str) -> int:
+    """
+    Estimates the number of data rows in a CSV file without parsing it: exact
+    when its row index is current, otherwise extrapolated from the size of the
+    rows in the first megabyte.
+
+    Args:
+        csv_file: CSV filename
+
+    Returns:
+        Estimated row count
+    """
+    stat = os.stat(csv_file)
+    index = read_row_index(csv_file)
+    if index and index['size'] == stat.st_size and index['mtime_ns'] == stat.st_mtime_ns:
+        return index['rows']
+
+    with open(csv_file, 'rb') as f:
+        sample = f.read(ROW_SIZE_SAMPLE_BYTES)
+    lines = sample.count(b'\n')
+    if len(sample) == stat.st_size:
+        return max(0, lines - 1 + (not sample.endswith(b'\n') and bool(sample)))
+    return int(stat.st_size / len(sample) * lines)
+
+
+def use_approximate(csv_file: str, df: Optional[pd.DataFrame] = None,
+                    approximate: Optional[bool] = None) -> bool:
+    """
+    Decides between the exact and the approximate profile.
+
+    Args:
+        csv_file: CSV filename
+        df: DataFrame already holding the file contents, if any
+        approximate: True or False to force a mode; None to choose
+                     automatically from the row count
+
+    Returns:
+        True for the approximate profile
+    """
+    if approximate is not None:
+        return approximate
+    rows = len(df) if df is not None else estimate_rows(csv_file)
+    return rows > APPROXIMATE_PROFILE_ROWS
+
+
+def profile_csv_approximate(csv_file: str, chunksize: int = APPROXIMATE_CHUNKSIZE,
+                            df: Optional[pd.DataFrame] = None) -> Dict:
+    """
+    Profiles a CSV file in one streaming pass using bounded memory. Row, missing
+    value counts, min, max, mean and std are exact; unique counts, quartiles
+    and frequencies are estimated with mergeable sketches. The number of
+    duplicate rows is reported as unknown (None): it is the difference between
+    the row count and an estimated distinct row count, whose error is larger
+    than the duplicate count itself on most datasets.
+
+    Args:
+        csv_file: CSV filename
+        chunksize: Rows read per chunk
+        df: DataFrame already holding the file contents, sketched in chunks
+            instead of re-reading the file
+
+    Returns:
+        Profile dict with the same fields as profile_dataframe, plus
+        'approximate', 'duplicateRowsEstimate' and 'errorBounds'
+    """
+    columns: Dict[str, Dict] = {}
+    row_sketch = HyperLogLog()
+    total_rows = 0
+
+    if df is not None:
+        chunks = (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+    else:
+        chunks = read_csv_cells(csv_file, chunksize=chunksize)
+
+    for chunk in chunks:
+        total_rows += len(chunk)
+        row_sketch.add_hashes(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+        missing = _missing_mask(chunk)
+
+        for col in chunk.columns:
+            values = chunk[col][~missing[col]]
+            state = columns.get(col)
+            if state is None:
+                # Column types are decided on the first chunk
+                state = columns[col] = {
+                    'type': _detect_type(values),
+                    'missing': 0,
+                    'samples': [],
+                    'distinct': HyperLogLog(),
+                    'quantiles': KLLQuantiles(),
+                    'frequent': FrequentItems(),
+                    'moments': {'count': 0, 'mean': 0.0, 'm2': 0.0, 'min': np.inf, 'max': -np.inf},
+                }
+            state['missing'] += int(missing[col].sum())
+            state['distinct'].add(values)
+            if len(state['samples']) < SAMPLE_VALUES:
+                for value in as_text(values).drop_duplicates():
+                    if value not in state['samples'] and len(state['samples']) < SAMPLE_VALUES:
+                        state['samples'].append(value)
+
+            if state['type'] == 'numeric':
+                numbers = pd.to_numeric(values, errors='coerce').dropna().to_numpy(dtype=float)
+                if len(numbers):
+                    state['quantiles'].add(numbers)
+                    moments = state['moments']
+                    n_a, n_b = moments['count'], len(numbers)
+                    mean_b = float(numbers.mean())
+                    diff = mean_b - moments['mean']
+                    moments['m2'] += float(((numbers - mean_b) ** 2).sum()) + diff ** 2 * n_a * n_b / (n_a + n_b)
+                    moments['mean'] += diff * n_b / (n_a + n_b)
+                    moments['count'] = n_a + n_b
+                    moments['min'] = min(moments['min'], float(numbers.min()))
+                    moments['max'] = max(moments['max'], float(numbers.max()))
+            elif state['type'] == 'categorical':
+                state['frequent'].add(values)
+
+    column_stats = []
+    column_info = []
+    numeric_columns = []
+    categorical_columns = []
+    summary = {}
+    total_missing = 0
+
+    for col, state in columns.items():
+        total_missing += state['missing']
+        column_stats.append({
+            'columnName': col,
+            'missingCount': state['missing'],
+            'missingPercentage': round(state['missing'] / total_rows * 100, 2) if total_rows else 0,
+        })
+        column_info.append({
+            'name': col,
+            'type': state['type'],
+            'uniqueValues': state['distinct'].estimate(),
+            'nullCount': state['missing'],
+            'sampleValues': state['samples'],
+        })
+
+        if state['type'] == 'numeric':
+            numeric_columns.append(col)
+            moments = state['moments']
+            if moments['count']:
+                q1, median, q3 = state['quantiles'].quantiles([0.25, 0.5, 0.75])
+                summary[col] = {
+                    'min': moments['min'],
+                    'max': moments['max'],
+                    'mean': round(moments['mean'], 2),
+                    'median': round(median, 2),
+                    'std': round(float(np.sqrt(moments['m2'] / moments['count'])), 2),
+                    'q1': q1,
+                    'q3': q3,
+                }
+        elif state['type'] == 'categorical':
+            categorical_columns.append(col)
+            frequent = state['frequent']
+            summary[col] = [
+                {
+                    'value': item['value'],
+                    'count': item['lowerBound'],
+                    'percentage': round(item['lowerBound'] / frequent.total * 100, 2),
+                    'maxUndercount': frequent.max_error(),
+                }
+                for item in frequent.top(TOP_FREQUENCIES)
+            ]
+
+    total_cells = total_rows * len(columns)
+    reference = next(iter(columns.values()), None)
+    distinct_rows = row_sketch.estimate()
+    return {
+        'totalRows': total_rows,
+        'totalColumns': len(columns),
+        'totalCells': total_cells,
+        'totalMissingValues': total_missing,
+        'completenessRate': round((total_cells - total_missing) / total_cells * 100, 2) if total_cells else 100,
+        'duplicateRows': None,
+        'duplicateRowsEstimate': max(0, total_rows - distinct_rows),
+        'columnStats': column_stats,
+        'columns': column_info,
+        'numericColumns': numeric_columns,
+        'categoricalColumns': categorical_columns,
+        'summary': summary,
+        'approximate': True,
+        'errorBounds': {
+            'uniqueValuesRelativeError': float(row_sketch.relative_error()),
+            # One standard error of the distinct row estimate, in rows
+            'duplicateRowsAbsoluteError': int(np.ceil(row_sketch.relative_error() * distinct_rows)),
+            'quantileRankError': reference['quantiles'].rank_error() if reference else 0,
+        },
+    }
+
+
+def write_profile(csv_file: str, df: Optional[pd.DataFrame] = None,
+                  approximate: Optional[bool] = None) -> Optional[Dict]:
+    """
+    Profiles a CSV file and writes the profile sidecar next to it.
+
+    Args:
+        csv_file: CSV filename
+        df: DataFrame already holding the file contents (read from disk if
+            None). Missing values are NaN and blank cells only; a frame read
+            with pandas' default missing-value strings counts those as well
+        approximate: Stream the file through approximate sketches instead of
+                     profiling it exactly in memory; None does so for files
+                     with more than APPROXIMATE_PROFILE_ROWS rows
+
+    Returns:
+        Profile dict, or None if profiling failed
+    """
+    try:
+        if use_approximate(csv_file, df, approximate):
+            profile = profile_csv_approximate(csv_file, df=df)
+        else:
+            if df is None:
+                df = read_csv_cells(csv_file)
+            profile = profile_dataframe(df)
+        profile['source'] = file_key(csv_file)
+        profile['generatedAt'] = datetime.now().isoformat()
+
+        with open(profile_path(csv_file), 'w', encoding='utf-8') as f:
+            json.dump(profile, f, ensure_ascii=False)
+
+        print(f"✓ Profile saved to {profile_path(csv_file)}")
+        return profile
+
+    except Exception as e:
+        print(f"Error writing profile for {csv_file}: {e}")
+        return None
+
+
+def discard_profile(csv_file: str) -> None:
+    """
+    Removes the profile sidecar of a CSV file, e.g. once rows were appended
+    to it, so it is rebuilt on next use (see profile_data.py) rather than on
+    every append.
+
+    Args:
+        csv_file: CSV filename
+    """
+    try:
+        os.remove(profile_path(csv_file))
+    except FileNotFoundError:
+        pass
+
+
+def load_profile(csv_file: str, verify_hash: bool = False) -> Optional[Dict]:
+    """
+    Loads the profile sidecar of a CSV file if it matches the current file.
+
+    Args:
+        csv_file: CSV filename
+        verify_hash: Also compare the content hash (reads the whole file)
+
+    Returns:
+        Profile dict, or None if missing or stale
+    """
+    path = profile_path(csv_file)
+    if not os.path.isfile(path) or not os.path.isfile(csv_file):
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+        source = profile['source']
+        stat = os.stat(csv_file)
+        if source['size'] != stat.st_size or source['mtime_ns'] != str(stat.st_mtime_ns):
+            return None
+        if verify_hash and source['sha1'] != file_key(csv_file)['sha1']:
+            return None
+        return profile
+    except (OSError, ValueError, KeyError):
+        return None
@@ -0,0 +1,303 @@
+"""
+Job Scheduler Script
+Runs scrape, clean, train and predict jobs from the persistent queue in
+job_utils on a pool of warm workers (worker.py). Each job works in its own
+directory and its outputs are published to this directory when it succeeds,
+so concurrent runs never overwrite each other's files half-way, and a job
+never publishes over the outputs of a job submitted after it.
+
+Protocol: one JSON object per line on stdin, one per line on stdout.
+
+Requests:
+  {"op": "submit", "ref": "r1", "stage": "train", "script": "...", "priority": 5}
+  {"op": "cancel", "id": "<job id>"}
+  {"op": "watch", "ref": "r2", "id": "<job id>", "after": 0}
+  {"op": "list", "ref": "r3"}
+  {"op": "ping", "ref": "r4"}
+  {"op": "shutdown"}
+
+Events:
+  {"event": "submitted", "ref": "r1", "id": "<job id>", "coalesced": false}
+  {"event": "started" | "progress" | "done", "id": "<job id>", "seq": 3, ...}
+  {"event": "watched", "ref": "r2", "id": "<job id>", "job": {...}}
+  {"event": "jobs", "ref": "r3", "jobs": [...]}
+  {"event": "error", "ref": "r1", "error": "..."}
+
+Job events carry a sequence number and are stored in the queue, so a client
+can replay them with "watch" (events after "after", tagged with the watch's
+"ref") and then keep receiving live ones.
+
+Usage: python scheduler.py
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from typing import Dict, List, Optional
+from job_utils import JOB_DB, JOBS_DIR, KEEP_FINISHED, STAGES, JobQueue, PublishConflict, publish_job, stage_job
+from model_utils import MODEL_DIR, prune_models
+
+SCHEDULER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class WorkerProcess:
+    """
+    A warm worker subprocess, running at most one job at a time.
+    """
+
+    def __init__(self, scheduler: 'Scheduler'):
+        self.scheduler = scheduler
+        self.job: Optional[Dict] = None
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(SCHEDULER_DIR, 'worker.py')],
+            cwd=SCHEDULER_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            text=True, encoding='utf-8', bufsize=1,
+        )
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def send(self, request: Dict):
+        self.process.stdin.write(json.dumps(request) + '\n')
+        self.process.stdin.flush()
+
+    def _read(self):
+        for line in self.process.stdout:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self.scheduler.on_worker_event(self, event)
+        self.scheduler.on_worker_exit(self)
+
+    def stop(self):
+        if self.process.poll() is None:
+            try:
+                self.send({'op': 'shutdown'})
+                self.process.stdin.close()
+            except OSError:
+                pass
+        self.process.wait()
+
+
+class Scheduler:
+    """
+    Claims jobs from the queue within the per-stage concurrency limits and
+    runs them on idle workers.
+    """
+
+    def __init__(self, db_path: str = JOB_DB, max_workers: Optional[int] = None, out=None):
+        self.queue = JobQueue(db_path)
+        self.limits = {stage: spec['concurrency'] for stage, spec in STAGES.items()}
+        self.max_workers = max_workers or sum(self.limits.values())
+        self.workers: List[WorkerProcess] = []
+        self.out = out or sys.stdout
+        # Guards dispatching and publishing, so a job is staged from a consistent set of files
+        self.lock = threading.RLock()
+        self.stopping = False
+
+    def emit(self, event: Dict, log: bool = True):
+        """
+        Writes one event line to the protocol stream, logging job events
+        with their sequence number.
+
+        Args:
+            event: JSON-serialisable event
+            log: Add job events to the job's event log
+        """
+        with self.lock:
+            if log and event.get('id') and event['event'] in ('started', 'progress', 'done'):
+                event['seq'] = self.queue.add_event(event['id'], event)
+            self.out.write(json.dumps(event) + '\n')
+            self.out.flush()
+
+    def dispatch(self):
+        """
+        Starts as many pending jobs as the limits and worker pool allow.
+        """
+        with self.lock:
+            while not self.stopping:
+                idle = next((w for w in self.workers if w.job is None), None)
+                if idle is None and len(self.workers) >= self.max_workers:
+                    return
+                job = self.queue.claim(self.limits)
+                if job is None:
+                    return
+                if idle is None:
+                    idle = WorkerProcess(self)
+                    self.workers.append(idle)
+
+                try:
+                    workdir = stage_job(job, SCHEDULER_DIR, os.path.join(SCHEDULER_DIR, JOBS_DIR))
+                except OSError as e:
+                    self.queue.finish(job['id'], 'failed', error=f"Could not stage inputs: {e}")
+                    self.emit({'event': 'done', 'id': job['id'], 'status': 'failed', 'exit_code': None,
+                               'error': str(e), 'seconds': 0})
+                    continue
+                self.queue.update(job['id'], workdir=workdir)
+                job['workdir'] = workdir
+                idle.job = job
+                idle.send({'op': 'run', 'id': job['id'], 'script': STAGES[job['stage']]['script'], 'cwd': workdir})
+
+    def on_worker_event(self, worker: WorkerProcess, event: Dict):
+        """
+        Forwards a worker's job events and completes the job when it is done.
+        """
+        if event.get('event') not in ('started', 'progress', 'done', 'error') or not event.get('id'):
+            return
+
+        with self.lock:
+            job = worker.job
+            if job is None or job['id'] != event['id'] or self.stopping:
+                # Jobs interrupted by shutdown stay running and are requeued
+                return
+            if event['event'] in ('started', 'progress'):
+                self.emit(event)
+                return
+
+            status = event.get('status', 'failed')
+            error = event.get('error')
+            published = []
+            if status == 'succeeded':
+                try:
+                    published = publish_job(job, job['workdir'], SCHEDULER_DIR, self.queue)
+                except (OSError, PublishConflict) as e:
+                    status, error = 'failed', f"Could not publish outputs: {e}"
+                if any(path.startswith(MODEL_DIR + os.sep) for path in published):
+                    # Jobs prune only their own copy of models/
+                    prune_models(os.path.join(SCHEDULER_DIR, MODEL_DIR))
+            self.queue.finish(job['id'], status, event.get('exit_code'), error)
+            worker.job = None
+            self.emit({
+                'event': 'done',
+                'id': job['id'],
+                'stage': job['stage'],
+                'status': status,
+                'exit_code': event.get('exit_code'),
+                'error': error,
+                'seconds': event.get('seconds', 0),
+                'workdir': job['workdir'],
+                'published': published,
+            })
+            self._prune()
+        self.dispatch()
+
+    def on_worker_exit(self, worker: WorkerProcess):
+        """
+        Fails the job of a worker that exited and drops it from the pool.
+        """
+        with self.lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+            job = worker.job
+            worker.job = None
+            if job is not None and not self.stopping:
+                self.queue.finish(job['id'], 'failed', error='Worker exited')
+                self.emit({'event': 'done', 'id': job['id'], 'stage': job['stage'], 'status': 'failed',
+                           'exit_code': None, 'error': 'Worker exited', 'seconds': 0})
+        self.dispatch()
+
+    def _prune(self):
+        """
+        Removes working directories and event logs of finished jobs beyond KEEP_FINISHED.
+        """
+        for job_id in self.queue.prune_finished(KEEP_FINISHED):
+            shutil.rmtree(os.path.join(SCHEDULER_DIR, JOBS_DIR, job_id), ignore_errors=True)
+            self.queue.update(job_id, workdir=None)
+
+    def cancel(self, job_id: str):
+        """
+        Cancels a pending job, or asks its worker to cancel a running one.
+        """
+        with self.lock:
+            if self.queue.cancel_pending(job_id):
+                self.emit({'event': 'done', 'id': job_id, 'status': 'cancelled', 'exit_code': None, 'seconds': 0})
+                return
+            worker = next((w for w in self.workers if w.job and w.job['id'] == job_id), None)
+            if worker is not None:
+                worker.send({'op': 'cancel', 'id': job_id})
+
+    def handle(self, request: Dict) -> bool:
+        """
+        Handles one protocol request.
+
+        Args:
+            request: Decoded request
+
+        Returns:
+            False once the scheduler should shut down
+        """
+        op = request.get('op')
+        ref = request.get('ref')
+
+        if op == 'submit':
+            try:
+                job_id, coalesced = self.queue.submit(request['stage'], request['script'], request.get('priority'))
+            except (KeyError, ValueError) as e:
+                self.emit({'event': 'error', 'ref': ref, 'error': f"Invalid submission: {e}"})
+                return True
+            self.emit({'event': 'submitted', 'ref': ref, 'id': job_id, 'coalesced': coalesced})
+            self.dispatch()
+        elif op == 'cancel':
+            self.cancel(request.get('id'))
+        elif op == 'watch':
+            with self.lock:
+                job = self.queue.get(request.get('id'))
+                if job is None:
+                    self.emit({'event': 'error', 'ref': ref, 'error': f"Unknown job: {request.get('id')}"})
+                    return True
+                for seq, event in self.queue.events(job['id'], request.get('after', 0)):
+                    self.emit({**event, 'seq': seq, 'ref': ref}, log=False)
+                self.emit({'event': 'watched', 'ref': ref, 'id': job['id'], 'job': job})
+        elif op == 'list':
+            self.emit({'event': 'jobs', 'ref': ref, 'jobs': self.queue.list()})
+        elif op == 'ping':
+            with self.lock:
+                running = [w.job['id'] for w in self.workers if w.job]
+            self.emit({'event': 'pong', 'ref': ref, 'pid': os.getpid(), 'workers': len(self.workers),
+                       'running': running})
+        elif op == 'shutdown':
+            return False
+        else:
+            self.emit({'event': 'error', 'ref': ref, 'error': f"Unknown op: {op}"})
+        return True
+
+    def serve(self, requests=None):
+        """
+        Requeues jobs interrupted by a previous shutdown, then reads requests
+        until shutdown or end of input. Running jobs are cancelled on exit and
+        go back to the queue.
+
+        Args:
+            requests: Iterable of request lines (defaults to stdin)
+        """
+        requeued = self.queue.requeue_running()
+        if requeued:
+            print(f"Requeued {len(requeued)} interrupted job(s)", file=sys.stderr)
+        self.dispatch()
+
+        for line in requests or sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.emit({'event': 'error', 'error': f"Invalid request: {e}"})
+                continue
+            if not self.handle(request):
+                break
+
+        with self.lock:
+            self.stopping = True
+            workers = list(self.workers)
+        for worker in workers:
+            worker.stop()
+        self.queue.requeue_running()
+
+
+if __name__ == "__main__":
+    os.chdir(SCHEDULER_DIR)
+    Scheduler().serve()
@@ -18,6 +18,7 @@ Field Mappings:
 
 from scraper_utils import fetch_page, scrape_items, generate_pagination_urls
 from csv_utils import save_to_csv
+from profile_utils import write_profile
 import sys
 
 # Configuration
@@ -26,6 +27,8 @@ PAGINATION_TEMPLATE = "https://www.rekrute.com/fr/offres.html?s=3&p={page}"
 PAGES = 50
 CONTAINER_SELECTOR = "li.post-id"
 OUTPUT_FILE = "scraped_data.csv"
+# None: approximate profile above profile_utils.APPROXIMATE_PROFILE_ROWS rows
+APPROXIMATE_PROFILE = None
 
 # Field extractors configuration
 FIELD_EXTRACTORS = {
@@ -42,8 +45,13 @@ FIELD_EXTRACTORS = {
 FIELDNAMES = ["job_title","company_name","job_sector","job_function","education_level","experience_level","published_to","contract_type"]
 
 
-def main():
-    """Main scraping function"""
+def scrape():
+    """
+    Fetches the configured pages and extracts one row per container.
+    
+    Returns:
+        List of row dicts keyed by FIELDNAMES
+    """
     print("=" * 70)
     print("Web Scraper - Starting")
     print("=" * 70)
@@ -84,11 +92,19 @@ def main():
             #time.sleep(1)
     
     
+    return all_data
+
+
+def main():
+    """Main scraping function"""
+    all_data = scrape()
+    
     # Save results to CSV
     print("=" * 70)
     if all_data:
         success = save_to_csv(all_data, FIELDNAMES, OUTPUT_FILE)
         if success:
+            write_profile(OUTPUT_FILE, approximate=APPROXIMATE_PROFILE)
             print(f"\nSuccessfully scraped {len(all_data)} items!")
             print(f"Data saved to: {OUTPUT_FILE}")
             
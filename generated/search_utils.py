@@ -0,0 +1,179 @@
+# search_utils.py
+"""
+Hyperparameter search utilities
+Successive halving over a declared parameter space: many candidates are
+trained on a small sample of the training set, and only the best third of
+them move on to a three times larger sample, until the full training set is
+reached or the time budget runs out. A search stopped by its time budget
+before the full training set picks no candidate.
+"""
+
+import json
+import math
+import time
+import numpy as np
+from typing import Dict, List, Optional
+from sklearn.metrics import f1_score
+from sklearn.model_selection import ParameterSampler, train_test_split
+from train_utils import run_variants
+
+HALVING_FACTOR = 3
+MIN_RESOURCES = 100
+VALIDATION_SIZE = 0.2
+
+# Search space keys each model accepts ('k_neighbors' applies to SMOTE)
+MODEL_PARAMS = {
+    'decision_tree': {'max_depth', 'min_samples_leaf'},
+    'random_forest': {'max_depth', 'min_samples_leaf', 'n_estimators'},
+}
+
+
+def sample_candidates(search_space: Dict[str, List], variants: List[Dict], model_type: str,
+                      n_candidates: int, random_state: int) -> List[Dict]:
+    """
+    Draws distinct candidates, each a balancing variant with model and SMOTE
+    parameters taken from the search space.
+
+    Args:
+        search_space: Parameter name -> list of values
+        variants: Balancing variants to choose from (see train_utils.fit_variant)
+        model_type: 'decision_tree' or 'random_forest'
+        n_candidates: Number of candidates to draw
+        random_state: Random seed
+
+    Returns:
+        List of variant dicts with 'params' and, for SMOTE variants, 'smote'
+    """
+    allowed = MODEL_PARAMS[model_type] | {'k_neighbors'}
+    space = {name: values for name, values in search_space.items() if name in allowed}
+    space['variant'] = list(range(len(variants)))
+
+    candidates = []
+    seen = set()
+    for params in ParameterSampler(space, n_candidates, random_state=random_state):
+        base = variants[params.pop('variant')]
+        k_neighbors = params.pop('k_neighbors', None)
+        candidate = {**base, 'params': params}
+        if base['balancing'] in ('smote', 'smote_subset') and k_neighbors is not None:
+            candidate['smote'] = {'k_neighbors': k_neighbors}
+
+        key = json.dumps([base['name'], params, candidate.get('smote')], sort_keys=True, default=str)
+        if key not in seen:
+            seen.add(key)
+            candidate['name'] = f"candidate_{len(candidates) + 1}"
+            candidates.append(candidate)
+    return candidates
+
+
+def count_rungs(n: int, factor: int) -> int:
+    """
+    Returns floor(log_factor(n)) + 1 (at least 1) in integer arithmetic:
+    math.log(243, 3) is 4.999..., which int() would truncate to 4.
+
+    Args:
+        n: Number of candidates, or of sample sizes of MIN_RESOURCES
+        factor: Growth factor per rung
+
+    Returns:
+        Number of rungs
+    """
+    rungs, size = 1, factor
+    while size <= n:
+        rungs += 1
+        size *= factor
+    return rungs
+
+
+def successive_halving(candidates: List[Dict], model_type: str, X, y, train_idx,
+                       random_state: int, n_cores: Optional[int] = None,
+                       time_budget: Optional[float] = None, X_path: Optional[str] = None,
+                       factor: int = HALVING_FACTOR) -> Dict:
+    """
+    Runs successive halving, scoring candidates by weighted F1 on a validation
+    split carved out of the training set (the test set stays untouched).
+
+    Args:
+        candidates: Candidate variants (see sample_candidates)
+        model_type: 'decision_tree' or 'random_forest'
+        X: Feature matrix (dense or CSR)
+        y: Encoded target vector
+        train_idx: Row indices available for the search
+        random_state: Random seed
+        n_cores: Core budget for each rung (defaults to all cores)
+        time_budget: Seconds after which no further candidate is fitted
+        X_path: Feature cache entry holding X (see feature_utils.load_features)
+        factor: Fraction of candidates dropped, and growth of the sample, per rung
+
+    Returns:
+        Dict with the 'best' candidate (None unless the last rung, on the
+        full sample, scored at least one candidate within the time budget),
+        'completed', the 'leaderboard' of every evaluation, the 'rungs' run
+        and the 'elapsed' seconds
+    """
+    start = time.perf_counter()
+    deadline = time.time() + time_budget if time_budget is not None else None
+    y = np.asarray(y)
+
+    _, counts = np.unique(y[train_idx], return_counts=True)
+    fit_idx, val_idx = train_test_split(
+        train_idx, test_size=VALIDATION_SIZE, random_state=random_state,
+        stratify=y[train_idx] if counts.min() >= 2 else None
+    )
+    # Nested samples: each rung's sample contains the previous one
+    order = np.random.default_rng(random_state).permutation(fit_idx)
+
+    n_rungs = min(count_rungs(len(candidates), factor), count_rungs(len(fit_idx) // MIN_RESOURCES, factor))
+
+    alive = candidates
+    leaderboard = []
+    rungs = []
+    completed = False
+
+    for rung in range(n_rungs):
+        n_samples = len(fit_idx) // factor ** (n_rungs - 1 - rung)
+        print(f"\n🔎 Rung {rung + 1}/{n_rungs}: {len(alive)} candidate(s) on {n_samples} samples")
+
+        trained = run_variants(
+            alive, model_type, X, y, order[:n_samples], val_idx,
+            random_state, n_cores, X_path, verbose=False, deadline=deadline
+        )
+        if not trained:
+            print(f"  Time budget of {time_budget}s used up before this rung")
+            break
+        scores = {
+            name: float(f1_score(y[val_idx], result['y_pred'], average='weighted', zero_division=0))
+            for name, result in trained.items()
+        }
+        # Candidates skipped at the deadline drop out
+        alive = sorted((c for c in alive if c['name'] in scores), key=lambda c: scores[c['name']], reverse=True)
+        completed = rung == n_rungs - 1
+
+        for candidate in alive:
+            leaderboard.append({
+                'rung': rung + 1,
+                'samples': n_samples,
+                'name': candidate['name'],
+                'balancing': candidate['label'],
+                'params': candidate['params'],
+                'smote': candidate.get('smote'),
+                'f1_score': scores[candidate['name']],
+                'balance_seconds': trained[candidate['name']]['balance_seconds'],
+                'fit_seconds': trained[candidate['name']]['fit_seconds'],
+            })
+
+        elapsed = time.perf_counter() - start
+        rungs.append({'rung': rung + 1, 'samples': n_samples, 'candidates': len(alive), 'seconds': elapsed})
+        print(f"  Best so far: {alive[0]['name']} (F1 {scores[alive[0]['name']]:.4f}) after {elapsed:.1f}s")
+
+        if deadline is not None and time.time() >= deadline and not completed:
+            print(f"  Time budget of {time_budget}s used up, stopping the search")
+            break
+        alive = alive[:max(1, math.ceil(len(alive) / factor))]
+
+    return {
+        'best': alive[0] if completed else None,
+        'completed': completed,
+        'leaderboard': leaderboard,
+        'rungs': rungs,
+        'elapsed': time.perf_counter() - start,
+    }
@@ -0,0 +1,257 @@
+# sketch_utils.py
+"""
+Approximate streaming statistics
+Mergeable sketches for distinct counts, quantiles and frequent values, used to
+profile datasets too large to hold (or sort) in memory. Each sketch accepts
+batches of values, can be merged with a sketch built on another chunk or
+partition, and reports its error bound.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+
+def as_text(values: pd.Series) -> pd.Series:
+    """
+    Converts values to strings, writing integral numbers without a decimal
+    point: pandas reads an integer column as float when a chunk holds a null,
+    and '19' and '19.0' would otherwise hash or compare as different values.
+
+    Args:
+        values: Series of any dtype
+
+    Returns:
+        Series of strings, with nulls kept as NaN
+    """
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return values.where(values.isna(), values.astype(str))
+    if values.dtype.kind in 'iu':
+        return values.astype(str).astype(object)
+    numbers = values.astype(np.float64)
+    integral = np.isfinite(numbers) & (numbers % 1 == 0) & (numbers.abs() < 2 ** 53)
+    text = numbers.astype(str).astype(object)
+    text[integral] = numbers[integral].astype(np.int64).astype(str)
+    return text.where(numbers.notna())
+
+
+def _hash_values(values) -> np.ndarray:
+    """
+    Hashes values to uint64 (consistent across chunks and processes).
+    """
+    return pd.util.hash_pandas_object(as_text(pd.Series(values)), index=False).to_numpy()
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """
+    Vectorized int.bit_length() for uint64 arrays.
+    """
+    remaining = values.copy()
+    lengths = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = remaining >= (np.uint64(1) << np.uint64(shift))
+        lengths[mask] += shift
+        remaining[mask] >>= np.uint64(shift)
+    return lengths + (remaining > 0)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter.
+
+    Args:
+        precision: Number of index bits; uses 2**precision one-byte registers
+    """
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values) -> None:
+        """
+        Adds a batch of values.
+        """
+        if len(values) == 0:
+            return
+        self.add_hashes(_hash_values(values))
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """
+        Adds precomputed uint64 hashes (e.g. row hashes).
+        """
+        if len(hashes) == 0:
+            return
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """
+        Merges another sketch with the same precision into this one.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> int:
+        """
+        Returns the estimated number of distinct values.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            raw = m * np.log(m / zeros)
+        return int(round(raw))
+
+    def relative_error(self) -> float:
+        """
+        Returns the standard error of the estimate, relative to the true count.
+        """
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+class KLLQuantiles:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty) over numeric values.
+
+    Args:
+        k: Accuracy parameter; memory grows linearly with k and rank error
+           shrinks roughly as 1/k
+        seed: Seed for the random compaction offsets
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        while True:
+            for level, items in enumerate(self.levels):
+                if len(items) > self._capacity(level):
+                    break
+            else:
+                return
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays at this level; every other sorted item is
+            # promoted with double weight
+            keep = items[:1] if len(items) % 2 else items[:0]
+            promoted = items[len(keep):][self._rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def add(self, values) -> None:
+        """
+        Adds a batch of numeric values (NaN is ignored).
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: 'KLLQuantiles') -> 'KLLQuantiles':
+        """
+        Merges another sketch into this one.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantiles(self, fractions: List[float]) -> List[Optional[float]]:
+        """
+        Returns approximate values at the given rank fractions (0 to 1).
+        """
+        if self.count == 0:
+            return [None for _ in fractions]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level) for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(fractions) * cumulative[-1], side='left')
+        return [float(items[min(p, len(items) - 1)]) for p in positions]
+
+    def rank_error(self) -> float:
+        """
+        Returns the approximate normalized rank error of a single quantile query.
+        """
+        return 2.296 / self.k ** 0.9723
+
+
+class FrequentItems:
+    """
+    Frequent items sketch (Misra-Gries / Space-Saving family). Counts are lower
+    bounds that undercount by at most the reported error.
+
+    Args:
+        capacity: Maximum number of tracked values
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.offset = 0
+        self.total = 0
+
+    def _trim(self) -> None:
+        if len(self.counts) <= self.capacity:
+            return
+        ordered = sorted(self.counts.values(), reverse=True)
+        cut = ordered[self.capacity]
+        self.offset += cut
+        self.counts = {value: count - cut for value, count in self.counts.items() if count > cut}
+
+    def add(self, values) -> None:
+        """
+        Adds a batch of values.
+        """
+        batch = as_text(pd.Series(values)).value_counts()
+        self.total += int(batch.sum())
+        for value, count in batch.items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        self._trim()
+
+    def merge(self, other: 'FrequentItems') -> 'FrequentItems':
+        """
+        Merges another sketch into this one.
+        """
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self.offset += other.offset
+        self.total += other.total
+        self._trim()
+        return self
+
+    def top(self, n: int) -> List[Dict]:
+        """
+        Returns the n most frequent values with count bounds.
+        """
+        ordered = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [
+            {'value': value, 'lowerBound': count, 'upperBound': count + self.offset}
+            for value, count in ordered
+        ]
+
+    def max_error(self) -> int:
+        """
+        Returns the maximum undercount of any reported count.
+        """
+        return self.offset
@@ -0,0 +1,175 @@
+# stage_utils.py
+"""
+Stage instrumentation utilities
+Records wall time, CPU time and row counts for each stage of a script, so the
+results JSON can show where the time goes, and optionally peak traced memory.
+Timing costs next to nothing; memory tracing slows code that allocates many
+Python objects several times over, so it is opt-in. A disabled timer runs
+every stage without measuring anything.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Peaks of the traced_peak blocks currently open, outermost first
+_open_peaks: List[Dict] = []
+
+
+def stages_path(output_file: str) -> str:
+    """
+    Returns the stage timings sidecar path for an output file.
+
+    Args:
+        output_file: Output filename
+
+    Returns:
+        Sidecar filename (e.g. clean_data.stages.json)
+    """
+    return os.path.splitext(output_file)[0] + '.stages.json'
+
+
+@contextmanager
+def traced_peak() -> Iterator[Dict]:
+    """
+    Measures the peak memory traced by tracemalloc while the block runs.
+    Blocks may nest: an inner block resets tracemalloc's peak, so the peak
+    reached so far is carried over to the enclosing blocks first.
+
+    Returns:
+        Context manager yielding a dict that receives 'peak_memory_mb' on exit
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    else:
+        peak = tracemalloc.get_traced_memory()[1]
+        for section in _open_peaks:
+            section['peak'] = max(section['peak'], peak)
+        tracemalloc.reset_peak()
+    section = {'peak': 0}
+    _open_peaks.append(section)
+    result = {}
+
+    try:
+        yield result
+    finally:
+        _open_peaks.remove(section)
+        peak = max(section['peak'], tracemalloc.get_traced_memory()[1])
+        for outer in _open_peaks:
+            outer['peak'] = max(outer['peak'], peak)
+        result['peak_memory_mb'] = round(peak / 2 ** 20, 2)
+        if started:
+            tracemalloc.stop()
+
+
+class StageTimer:
+    """
+    Collects per-stage measurements. CPU time covers this process only (not
+    worker processes). With trace_memory, peak memory is traced with
+    tracemalloc, so memory allocated inside compiled library code is not
+    included.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.stages: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Measures the enclosed block.
+
+        Args:
+            name: Stage name
+            rows: Rows entering the stage
+
+        Returns:
+            Context manager yielding the stage record, to which the block may
+            add fields (e.g. 'rows_out')
+        """
+        if not self.enabled:
+            yield {}
+            return
+
+        record = {'stage': name, 'rows': rows}
+        memory = traced_peak() if self.trace_memory else nullcontext({})
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            with memory as peak:
+                yield record
+        finally:
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 4)
+            record['cpu_seconds'] = round(time.process_time() - cpu_start, 4)
+            if 'peak_memory_mb' in peak:
+                record['peak_memory_mb'] = peak['peak_memory_mb']
+            self.stages.append(record)
+
+    def run(self, name: str, step: Callable, df, *args, **kwargs):
+        """
+        Runs a DataFrame step as a stage, recording rows in and out.
+
+        Args:
+            name: Stage name
+            step: Function taking the DataFrame first and returning a DataFrame
+            df: Input DataFrame
+            *args: Further arguments for step
+            **kwargs: Keyword arguments for step
+
+        Returns:
+            The step's result
+        """
+        if not self.enabled:
+            return step(df, *args, **kwargs)
+        with self.stage(name, len(df)) as record:
+            result = step(df, *args, **kwargs)
+            record['rows_out'] = len(result)
+        return result
+
+    def add(self, name: str, wall_seconds: float, rows: Optional[int] = None, **measurements):
+        """
+        Records a stage measured elsewhere (e.g. in a worker process).
+
+        Args:
+            name: Stage name
+            wall_seconds: Wall time
+            rows: Rows processed
+            **measurements: Other fields (cpu_seconds, peak_memory_mb, ...)
+        """
+        if self.enabled:
+            record = {'stage': name, 'rows': rows, 'wall_seconds': round(wall_seconds, 4)}
+            record.update({key: round(value, 4) for key, value in measurements.items()})
+            self.stages.append(record)
+
+    def print_summary(self):
+        """
+        Prints the recorded stages as a table.
+        """
+        if not self.stages:
+            return
+        print(f"\n{'Stage':<32}{'Rows':>10}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak (MB)':>11}")
+        for record in self.stages:
+            rows = '' if record.get('rows') is None else record['rows']
+            cpu = record.get('cpu_seconds')
+            peak = record.get('peak_memory_mb')
+            print(
+                f"{record['stage']:<32}{rows:>10}{record['wall_seconds']:>10.3f}"
+                f"{'' if cpu is None else f'{cpu:.3f}':>10}{'' if peak is None else f'{peak:.1f}':>11}"
+            )
+
+    def save(self, path: str):
+        """
+        Writes the recorded stages to a JSON file.
+
+        Args:
+            path: Output filename
+        """
+        if self.enabled:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'stages': self.stages}, f, indent=2)
@@ -0,0 +1,177 @@
+# synthetic_utils.py
+"""
+Synthetic data utilities
+Generates datasets of any size with the schema and value distributions of a
+source CSV, for benchmarking. Each column keeps its source null rate, share
+of values with stray whitespace and, depending on its cardinality:
+- categorical columns (e.g. job_sector, contract_type) sample their source
+  values with the source frequencies, so cardinality stays low and skews such
+  as contract_type's are preserved;
+- near-unique text columns (e.g. job_title) keep their unique-value ratio,
+  so their cardinality grows with the row count;
+- numeric columns sample their source values.
+Duplicate rows are added at the source duplicate rate.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+NEAR_UNIQUE_RATIO = 0.5      # text columns with more unique values per row than this are near-unique
+GENERATE_CHUNK_ROWS = 500_000
+
+
+def fit_schema(df: pd.DataFrame) -> Dict:
+    """
+    Describes a DataFrame's columns for generate_frame.
+
+    Args:
+        df: Source DataFrame
+
+    Returns:
+        Schema dict with the 'columns' and the 'duplicate_rate'
+    """
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        values = series.dropna()
+        spec = {
+            'name': str(col),
+            'null_rate': float(series.isna().mean()),
+        }
+        if pd.api.types.is_numeric_dtype(series):
+            counts = values.value_counts(normalize=True)
+            spec.update({
+                'kind': 'numeric',
+                'dtype': str(series.dtype),
+                'values': counts.index.tolist(),
+                'weights': counts.tolist(),
+            })
+        else:
+            strings = values.astype(str)
+            unique_ratio = strings.nunique() / max(len(strings), 1)
+            spec['whitespace_rate'] = float((strings != strings.str.strip()).mean()) if len(strings) else 0.0
+            counts = strings.str.strip().value_counts(normalize=True)
+            spec.update({
+                'kind': 'text' if unique_ratio > NEAR_UNIQUE_RATIO else 'categorical',
+                'unique_ratio': float(unique_ratio),
+                'values': counts.index.tolist(),
+                'weights': counts.tolist(),
+            })
+        columns.append(spec)
+
+    return {
+        'source_rows': len(df),
+        'duplicate_rate': float(df.duplicated().mean()),
+        'columns': columns,
+    }
+
+
+def schema_hash(schema: Dict) -> str:
+    """
+    Hashes a schema, to tell whether generated files are still current.
+    """
+    return hashlib.sha1(json.dumps(schema, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _sample(rng: np.random.Generator, spec: Dict, n_rows: int) -> np.ndarray:
+    weights = np.asarray(spec['weights'], dtype=float)
+    picks = rng.choice(len(spec['values']), size=n_rows, p=weights / weights.sum())
+    return np.asarray(spec['values'], dtype=object)[picks]
+
+
+def generate_frame(schema: Dict, n_rows: int, seed: int = 42, start: int = 0) -> pd.DataFrame:
+    """
+    Generates rows following a schema from fit_schema.
+
+    Args:
+        schema: Schema dict
+        n_rows: Number of rows
+        seed: Random seed
+        start: Number of rows generated before this chunk, keeping
+               near-unique values distinct across chunks
+
+    Returns:
+        DataFrame
+    """
+    rng = np.random.default_rng([seed, start])
+    data = {}
+    for spec in schema['columns']:
+        values = _sample(rng, spec, n_rows)
+        if spec['kind'] == 'numeric':
+            column = pd.Series(values, dtype='float64')
+        else:
+            column = pd.Series(values, dtype=object)
+            if spec['kind'] == 'text':
+                # Variants of source values, one per row, keep the unique-value ratio
+                unique = rng.random(n_rows) < spec['unique_ratio']
+                suffixes = pd.Series(np.arange(start, start + n_rows)[unique]).astype(str).to_numpy()
+                column[unique] = column[unique].to_numpy() + ' #' + suffixes
+            padded = rng.random(n_rows) < spec['whitespace_rate']
+            column[padded] = ' ' + column[padded] + ' '
+
+        column[rng.random(n_rows) < spec['null_rate']] = np.nan
+        if spec['kind'] == 'numeric' and spec['dtype'].startswith('int') and not column.isna().any():
+            column = column.astype(spec['dtype'])
+        data[spec['name']] = column
+
+    df = pd.DataFrame(data)
+    rows = np.arange(n_rows)
+    duplicates = rng.random(n_rows) < schema['duplicate_rate']
+    rows[duplicates] = rng.integers(0, n_rows, int(duplicates.sum()))
+    return df.iloc[rows].reset_index(drop=True)
+
+
+def write_synthetic_csv(schema: Dict, path: str, n_rows: int, seed: int = 42,
+                        chunk_rows: int = GENERATE_CHUNK_ROWS) -> str:
+    """
+    Writes a synthetic CSV chunk by chunk, so large sizes never sit in memory
+    at once. A file generated earlier from the same schema, size and seed is
+    kept.
+
+    Args:
+        schema: Schema dict
+        path: Output CSV filename
+        n_rows: Number of rows
+        seed: Random seed
+        chunk_rows: Rows generated per chunk
+
+    Returns:
+        path
+    """
+    meta_file = os.path.splitext(path)[0] + '.meta.json'
+    meta = {'schema_hash': schema_hash(schema), 'rows': n_rows, 'seed': seed}
+    if os.path.isfile(path) and os.path.isfile(meta_file):
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            if json.load(f) == meta:
+                return path
+
+    with open(path + '.tmp', 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, n_rows, chunk_rows):
+            chunk = generate_frame(schema, min(chunk_rows, n_rows - start), seed, start)
+            chunk.to_csv(f, index=False, header=start == 0)
+    os.replace(path + '.tmp', path)
+    with open(meta_file, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return path
+
+
+def load_schema(source_file: str, schema_file: Optional[str] = None) -> Dict:
+    """
+    Fits a schema to a source CSV, saving it as JSON when schema_file is given.
+
+    Args:
+        source_file: Source CSV filename
+        schema_file: Optional schema JSON filename
+
+    Returns:
+        Schema dict
+    """
+    schema = fit_schema(pd.read_csv(source_file))
+    if schema_file:
+        with open(schema_file, 'w', encoding='utf-8') as f:
+            json.dump(schema, f, indent=2, ensure_ascii=False)
+    return schema
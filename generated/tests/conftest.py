@@ -0,0 +1,11 @@
+# conftest.py
+"""
+Makes the generated scripts' utility modules importable from the tests.
+"""
+
+import os
+import sys
+
+GENERATED_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if GENERATED_DIR not in sys.path:
+    sys.path.insert(0, GENERATED_DIR)
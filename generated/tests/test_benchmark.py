@@ -0,0 +1,58 @@
+# test_benchmark.py
+"""
+Tests for the scaling report's growth exponents and superlinear flag.
+"""
+
+import pytest
+from benchmark import SUPERLINEAR_EXPONENT, scaling_report
+
+
+def record(rows, seconds, memory=None, benchmark='clean'):
+    return {'benchmark': benchmark, 'rows': rows, 'wall_seconds': seconds, 'peak_memory_mb': memory}
+
+
+def test_linear_growth_is_not_flagged():
+    report = scaling_report([record(10_000, 1.0, 10.0), record(100_000, 10.0, 100.0)])
+
+    assert report == [{'benchmark': 'clean', 'from_rows': 10_000, 'to_rows': 100_000,
+                       'time_exponent': 1.0, 'memory_exponent': 1.0, 'superlinear': []}]
+
+
+def test_quadratic_time_is_flagged():
+    report = scaling_report([record(10_000, 1.0, 10.0), record(100_000, 100.0, 20.0)])
+
+    assert report[0]['time_exponent'] == 2.0
+    assert report[0]['superlinear'] == ['time']
+
+
+def test_flag_threshold():
+    # 10x the rows: an exponent just above the threshold is flagged, one at it is not
+    at = record(100_000, 10 ** SUPERLINEAR_EXPONENT)
+    above = record(100_000, 10 ** (SUPERLINEAR_EXPONENT + 0.05))
+
+    assert scaling_report([record(10_000, 1.0), at])[0]['superlinear'] == []
+    assert scaling_report([record(10_000, 1.0), above])[0]['superlinear'] == ['time']
+
+
+def test_short_timings_are_not_judged():
+    report = scaling_report([record(1_000, 0.001, 0.1), record(10_000, 0.1, 0.5)])
+
+    assert 'time_exponent' not in report[0] and 'memory_exponent' not in report[0]
+    assert report[0]['superlinear'] == []
+
+
+def test_consecutive_sizes_per_benchmark():
+    records = [
+        record(100_000, 100.0, benchmark='train'),
+        record(10_000, 1.0, benchmark='train'),
+        record(1_000, 0.5, benchmark='train'),
+        record(10_000, 2.0, benchmark='clean'),
+        {'benchmark': 'clean', 'rows': 100_000, 'error': 'MemoryError'},
+    ]
+
+    report = scaling_report(records)
+
+    assert [(e['benchmark'], e['from_rows'], e['to_rows']) for e in report] == [
+        ('train', 1_000, 10_000), ('train', 10_000, 100_000),
+    ]
+    assert report[1]['time_exponent'] == pytest.approx(2.0)
@@ -0,0 +1,90 @@
+# test_csv_utils.py
+"""
+Tests for the binary row index and seeking reads of CSV pages.
+"""
+
+import csv
+import numpy as np
+import pytest
+import csv_utils
+from csv_utils import append_to_csv, build_row_index, read_row_index, read_rows, save_to_csv
+
+FIELDS = ['id', 'text']
+
+
+def make_rows(start, stop):
+    # Every third row holds a newline, every fifth an escaped quote
+    return [
+        {'id': str(i), 'text': f'line {i}' + ('\nsecond line' if i % 3 == 0 else '') + (' "quoted"' if i % 5 == 0 else '')}
+        for i in range(start, stop)
+    ]
+
+
+def parsed(csv_file):
+    with open(csv_file, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """
+    Records the offset each scan of the CSV file starts at.
+    """
+    positions = []
+    scan = csv_utils._scan_row_starts
+    monkeypatch.setattr(csv_utils, '_scan_row_starts',
+                        lambda f, position, end: positions.append(position) or scan(f, position, end))
+    return positions
+
+
+def test_index_skips_quoted_newlines(tmp_path):
+    csv_file = str(tmp_path / 'data.csv')
+    save_to_csv(make_rows(0, 50), FIELDS, csv_file)
+    index = build_row_index(csv_file, stride=4)
+
+    assert index['rows'] == 50
+    assert len(index['offsets']) == 13
+    assert read_rows(csv_file, 0, 50) == parsed(csv_file)
+
+
+@pytest.mark.parametrize('start, stop', [(0, 1), (0, 6), (3, 9), (45, 50), (49, 50), (48, 60), (50, 55)])
+def test_read_rows_pages(tmp_path, start, stop):
+    csv_file = str(tmp_path / 'data.csv')
+    save_to_csv(make_rows(0, 50), FIELDS, csv_file)
+    build_row_index(csv_file, stride=4)
+
+    assert read_rows(csv_file, start, stop) == parsed(csv_file)[start:stop]
+
+
+def test_append_resumes_from_the_last_indexed_row(tmp_path, scans):
+    csv_file = str(tmp_path / 'data.csv')
+    save_to_csv(make_rows(0, 600), FIELDS, csv_file)
+    append_to_csv(make_rows(600, 700), FIELDS, csv_file)
+
+    assert scans[0] == 0 and scans[1] > 0
+    resumed = read_row_index(csv_file)
+    fresh = build_row_index(csv_file)
+    assert resumed['rows'] == 700
+    assert np.array_equal(resumed['offsets'], fresh['offsets'])
+    assert read_rows(csv_file, 598, 603) == parsed(csv_file)[598:603]
+
+
+def test_append_rebuilds_when_the_prefix_was_rewritten(tmp_path, scans):
+    csv_file = str(tmp_path / 'data.csv')
+    save_to_csv(make_rows(0, 600), FIELDS, csv_file)
+    index = read_row_index(csv_file)
+    # Rewritten with rows of other lengths but an index that still looks current
+    save_to_csv([{'id': row['id'], 'text': 'x' * 40} for row in make_rows(0, 900)], FIELDS, csv_file)
+    with open(csv_utils.index_path(csv_file), 'wb') as f:
+        f.write(csv_utils.ROW_INDEX_HEADER.pack(
+            csv_utils.ROW_INDEX_MAGIC, csv_utils.ROW_INDEX_VERSION, index['stride'], index['rows'],
+            index['size'], index['mtime_ns'], index['header_end'], bytes.fromhex(index['fingerprint'])
+        ))
+        f.write(index['offsets'].tobytes())
+    scans.clear()
+
+    append_to_csv(make_rows(900, 910), FIELDS, csv_file)
+
+    assert scans == [0]
+    assert read_row_index(csv_file)['rows'] == 910
+    assert read_rows(csv_file, 899, 901) == parsed(csv_file)[899:901]
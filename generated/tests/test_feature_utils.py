@@ -0,0 +1,90 @@
+# test_feature_utils.py
+"""
+Tests for the feature encodings and the encoded feature cache.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+import feature_utils
+from feature_utils import cache_dir, cache_key, encode_features, load_features, transform_features
+
+TRAIN = pd.DataFrame({
+    'code': ['3', 'x', '3', '7', None, 'x'],
+    'amount': [1.5, 2.0, 3.5, 4.0, 5.0, 6.0],
+    'label': [1, 0, 1, 0, 1, 0],
+})
+
+
+def test_label_encoding_maps_float_batches_like_training():
+    encoded = encode_features(TRAIN, ['code', 'amount'], 'label')
+    # A batch without letters is read as float
+    batch = pd.DataFrame({'code': [3.0, 7.0, np.nan], 'amount': [1.0, 2.0, 3.0]})
+
+    X, unknown = transform_features(batch, ['code', 'amount'], encoded['encoders'])
+
+    classes = encoded['encoders']['code']
+    assert X[:, 0].tolist() == [classes.index('3'), classes.index('7'), classes.index('missing')]
+    assert unknown == {'code': 0}
+    assert encoded['target_classes'] == ['0', '1']
+
+
+def test_sparse_encoding_maps_float_batches_like_training():
+    encoded = encode_features(TRAIN, ['code', 'amount'], 'label', encoding='sparse')
+    spec = encoded['sparse_spec']
+    batch = pd.DataFrame({'code': [3.0, 7.0, 8.0], 'amount': [1.0, 2.0, 3.0]})
+
+    X, unknown = transform_features(batch, ['code', 'amount'], {}, spec)
+
+    assert unknown == {'code': 1}
+    categories = spec['one_hot']['code']
+    one_hot = X[:, 1:1 + len(categories)].toarray()
+    assert one_hot[0, categories.index('3')] == 1 and one_hot[1, categories.index('7')] == 1
+    assert one_hot[2].sum() == 0
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = str(tmp_path / 'clean.csv')
+    TRAIN.to_csv(path, index=False)
+    return path
+
+
+def test_cache_key_depends_on_data_and_config(csv_file):
+    key = cache_key(csv_file, ['code', 'amount'], 'label')
+
+    assert cache_key(csv_file, ['code', 'amount'], 'label') == key
+    assert cache_key(csv_file, ['amount', 'code'], 'label') != key
+    assert cache_key(csv_file, ['code', 'amount'], 'code') != key
+    assert cache_key(csv_file, ['code', 'amount'], 'label', 'sparse') != key
+    TRAIN.assign(amount=TRAIN['amount'] + 1).to_csv(csv_file, index=False)
+    assert cache_key(csv_file, ['code', 'amount'], 'label') != key
+
+
+@pytest.mark.parametrize('encoding', ['label', 'sparse'])
+def test_load_features_hits_the_cache_until_the_data_changes(csv_file, encoding):
+    first = load_features(csv_file, ['code', 'amount'], 'label', encoding)
+    second = load_features(csv_file, ['code', 'amount'], 'label', encoding)
+
+    assert not first['cached'] and second['cached']
+    assert second['cache_path'] == first['cache_path']
+    dense = (lambda X: X.toarray()) if encoding == 'sparse' else np.asarray
+    assert np.array_equal(dense(second['X']), dense(first['X']))
+    assert np.array_equal(second['y'], first['y'])
+    assert sparse.issparse(second['X']) == (encoding == 'sparse')
+    assert second['target_encoder'].classes_.tolist() == ['0', '1']
+
+    TRAIN.iloc[:-1].to_csv(csv_file, index=False)
+    third = load_features(csv_file, ['code', 'amount'], 'label', encoding)
+    assert not third['cached'] and third['cache_path'] != first['cache_path']
+    assert len(third['y']) == len(TRAIN) - 1
+
+
+def test_cache_keeps_the_newest_entries(csv_file, monkeypatch):
+    monkeypatch.setattr(feature_utils, 'MAX_CACHE_ENTRIES', 2)
+    paths = [load_features(csv_file, columns, 'label')['cache_path']
+             for columns in (['code'], ['amount'], ['code', 'amount'])]
+
+    assert sorted(os.listdir(cache_dir(csv_file))) == sorted(os.path.basename(p) for p in paths[1:])
@@ -0,0 +1,130 @@
+# test_incremental_utils.py
+"""
+Tests for the incremental clean and its fallbacks to a full clean.
+"""
+
+import pandas as pd
+import pytest
+from clean_utils import remove_duplicates, trim_whitespaces
+from incremental_utils import (
+    clean_appended_rows,
+    discard_manifest,
+    load_manifest,
+    save_manifest,
+    start_manifest,
+)
+
+CONFIG = {'trim_whitespaces': True, 'remove_duplicates': True}
+
+
+def clean_frame(df, fitted, seen_hashes):
+    return remove_duplicates(trim_whitespaces(df), seen_hashes)
+
+
+def rows(start, stop, value=lambda i: i % 10):
+    return pd.DataFrame({'id': [f'row {i}' for i in range(start, stop)], 'value': [float(value(i)) for i in range(start, stop)],
+                         'name': [f' item {i % 7} ' for i in range(start, stop)]})
+
+
+@pytest.fixture
+def cleaned(tmp_path):
+    """
+    Full clean of 100 rows, returning the (input, output) filenames.
+    """
+    input_file, output_file = str(tmp_path / 'scraped.csv'), str(tmp_path / 'clean.csv')
+    rows(0, 100).to_csv(input_file, index=False)
+    df = pd.read_csv(input_file)
+    manifest = start_manifest(input_file, len(open(input_file, 'rb').read()), CONFIG, df)
+    df = clean_frame(df, manifest['fitted'], manifest['seen_hashes'])
+    df.to_csv(output_file, index=False)
+    save_manifest(output_file, manifest, df)
+    return input_file, output_file
+
+
+def append(input_file, df):
+    df.to_csv(input_file, mode='a', header=False, index=False)
+
+
+def test_appends_only_new_rows(cleaned):
+    input_file, output_file = cleaned
+    append(input_file, rows(100, 120))
+
+    assert clean_appended_rows(input_file, output_file, CONFIG, clean_frame) == 20
+    output = pd.read_csv(output_file)
+    assert output['id'].tolist() == [f'row {i}' for i in range(120)]
+    assert output['name'].str.startswith('item').all()
+    assert load_manifest(output_file)['cleaned_rows'] == 120
+
+
+def test_no_new_rows(cleaned):
+    input_file, output_file = cleaned
+    assert clean_appended_rows(input_file, output_file, CONFIG, clean_frame) == 0
+
+
+def test_drops_duplicates_of_earlier_runs(cleaned):
+    input_file, output_file = cleaned
+    append(input_file, pd.concat([rows(0, 10), rows(100, 110)]))
+
+    assert clean_appended_rows(input_file, output_file, CONFIG, clean_frame) == 10
+
+
+def test_falls_back_without_manifest(cleaned):
+    input_file, output_file = cleaned
+    discard_manifest(output_file)
+    append(input_file, rows(100, 120))
+
+    assert clean_appended_rows(input_file, output_file, CONFIG, clean_frame) is None
+
+
+def test_falls_back_when_config_changes(cleaned):
+    input_file, output_file = cleaned
+    append(input_file, rows(100, 120))
+
+    config = {**CONFIG, 'remove_duplicates': False}
+    assert clean_appended_rows(input_file, output_file, config, clean_frame) is None
+
+
+def test_falls_back_when_input_is_rewritten(cleaned):
+    input_file, output_file = cleaned
+    # Same length, different bytes in the already cleaned prefix
+    rows(0, 100, value=lambda i: (i + 1) % 10).to_csv(input_file, index=False)
+    append(input_file, rows(100, 120))
+
+    assert clean_appended_rows(input_file, output_file, CONFIG, clean_frame) is None
+
+
+def test_falls_back_when_input_shrinks(cleaned):
+    input_file, output_file = cleaned
+    rows(0, 50).to_csv(input_file, index=False)
+
+    assert clean_appended_rows(input_file, output_file, CONFIG, clean_frame) is None
+
+
+def test_falls_back_when_types_change(cleaned):
+    input_file, output_file = cleaned
+    append(input_file, pd.DataFrame({'id': ['row 100'], 'value': ['abc'], 'name': ['item 1']}))
+
+    assert clean_appended_rows(input_file, output_file, CONFIG, clean_frame) is None
+
+
+def test_falls_back_on_drift(cleaned):
+    input_file, output_file = cleaned
+    append(input_file, rows(100, 120, value=lambda i: 1000.0))
+
+    assert clean_appended_rows(input_file, output_file, CONFIG, clean_frame) is None
+
+
+def test_falls_back_when_delta_is_large(cleaned):
+    input_file, output_file = cleaned
+    append(input_file, rows(100, 200))
+
+    assert clean_appended_rows(input_file, output_file, CONFIG, clean_frame,
+                               {'delta_fraction': 0.5}) is None
+
+
+def test_ignores_unreadable_manifest(cleaned):
+    input_file, output_file = cleaned
+    with open(output_file.replace('.csv', '.manifest.json'), 'w') as f:
+        f.write('{not json')
+
+    assert load_manifest(output_file) is None
@@ -0,0 +1,101 @@
+# test_job_utils.py
+"""
+Tests for job coalescing, ordering and cancellation in the job queue.
+"""
+
+import pytest
+from job_utils import STAGES, JobQueue
+
+LIMITS = {stage: spec['concurrency'] for stage, spec in STAGES.items()}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / 'jobs.db'))
+
+
+def test_identical_pending_jobs_coalesce(queue):
+    job_id, coalesced = queue.submit('clean', 'CONFIG = 1')
+    again, coalesced_again = queue.submit('clean', 'CONFIG = 1')
+    other, coalesced_other = queue.submit('clean', 'CONFIG = 2')
+
+    assert not coalesced and coalesced_again and not coalesced_other
+    assert again == job_id and other != job_id
+
+
+def test_coalescing_raises_priority(queue):
+    job_id, _ = queue.submit('scrape', 'URL = 1')
+    queue.submit('scrape', 'URL = 1', priority=9)
+
+    assert queue.get(job_id)['priority'] == 9
+
+
+def test_running_job_coalesces_until_inputs_are_republished(queue):
+    job_id, _ = queue.submit('train', 'MODEL = 1')
+    assert queue.claim(LIMITS)['id'] == job_id
+
+    assert queue.submit('train', 'MODEL = 1') == (job_id, True)
+
+    clean_id, _ = queue.submit('clean', 'CONFIG = 1')
+    queue.record_outputs(queue.get(clean_id), ['clean_data.csv'])
+    queue.cancel_pending(clean_id)
+    resubmitted, coalesced = queue.submit('train', 'MODEL = 1')
+    assert not coalesced and resubmitted != job_id
+
+
+def test_no_coalescing_past_a_newer_upstream_job(queue):
+    train_id, _ = queue.submit('train', 'MODEL = 1')
+    queue.submit('clean', 'CONFIG = 1')
+
+    # The earlier train job would not see the new clean's output
+    job_id, coalesced = queue.submit('train', 'MODEL = 1')
+    assert not coalesced and job_id != train_id
+
+
+def test_identical_job_waits_for_the_running_one(queue):
+    first, _ = queue.submit('clean', 'CONFIG = 1')
+    assert queue.claim(LIMITS)['id'] == first
+    queue.record_outputs({'id': 'scrape', 'created': '9999'}, ['scraped_data.csv'])
+    second, coalesced = queue.submit('clean', 'CONFIG = 1')
+
+    # Not joined (its input changed), but never run alongside the identical job
+    assert not coalesced and second != first
+    assert queue.claim(LIMITS) is None
+    queue.finish(first, 'succeeded', 0)
+    assert queue.claim(LIMITS)['id'] == second
+
+
+def test_claim_waits_for_earlier_upstream_jobs(queue):
+    clean_id, _ = queue.submit('clean', 'CONFIG = 1')
+    train_id, _ = queue.submit('train', 'MODEL = 1')
+
+    assert queue.claim(LIMITS)['id'] == clean_id
+    assert queue.claim(LIMITS) is None
+    queue.finish(clean_id, 'succeeded', 0)
+    assert queue.claim(LIMITS)['id'] == train_id
+
+
+def test_cancel_pending(queue):
+    job_id, _ = queue.submit('clean', 'CONFIG = 1')
+
+    assert queue.cancel_pending(job_id)
+    assert queue.get(job_id)['status'] == 'cancelled'
+    assert queue.claim(LIMITS) is None
+    # A cancelled job is not joined
+    assert queue.submit('clean', 'CONFIG = 1')[0] != job_id
+
+
+def test_cancel_pending_leaves_running_jobs(queue):
+    job_id, _ = queue.submit('clean', 'CONFIG = 1')
+    queue.claim(LIMITS)
+
+    assert not queue.cancel_pending(job_id)
+    assert queue.get(job_id)['status'] == 'running'
+
+
+def test_requeue_running(queue):
+    job_id, _ = queue.submit('clean', 'CONFIG = 1')
+    queue.claim(LIMITS)
+
+    assert queue.requeue_running() == [job_id]
+    assert queue.get(job_id)['status'] == 'pending'
@@ -0,0 +1,95 @@
+# test_online_utils.py
+"""
+Tests for resuming the online model and its fallbacks to a full retrain.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from online_utils import update_online_model
+
+CONFIG = {'target': 'label', 'features': ['color', 'size'], 'online_model': 'sgd', 'random_state': 42}
+
+
+def rows(n, seed, flip=False):
+    """
+    Rows whose label follows the color (inverted when flip is set).
+    """
+    rng = np.random.default_rng(seed)
+    color = rng.choice(['red', 'blue'], size=n)
+    label = np.where((color == 'red') != flip, 'yes', 'no')
+    return pd.DataFrame({'color': color, 'size': rng.integers(1, 4, size=n), 'label': label})
+
+
+@pytest.fixture
+def csv_file(tmp_path, monkeypatch):
+    # Checkpoints are written to models/ in the working directory
+    monkeypatch.chdir(tmp_path)
+    rows(1000, 0).to_csv('clean.csv', index=False)
+    return 'clean.csv'
+
+
+def append(csv_file, df):
+    df.to_csv(csv_file, mode='a', header=False, index=False)
+
+
+def update(csv_file, config=CONFIG):
+    return update_online_model(csv_file, config, chunksize=100)
+
+
+def test_first_update_is_a_full_pass(csv_file):
+    state = update(csv_file)
+
+    assert state['full_retrain'] == 'no checkpoint'
+    assert state['new_rows'] == 1000
+    assert state['metrics']['f1_score'] > 0.9
+
+
+def test_resumes_with_only_the_appended_rows(csv_file):
+    update(csv_file)
+    append(csv_file, rows(300, 1))
+
+    state = update(csv_file)
+
+    assert state['full_retrain'] is None
+    assert state['new_rows'] == 300
+    assert state['online']['rows_seen'] == 1300
+    assert update(csv_file)['new_rows'] == 0
+
+
+def test_f1_drop_triggers_a_full_retrain(csv_file):
+    update(csv_file)
+    append(csv_file, rows(300, 1, flip=True))
+
+    state = update(csv_file)
+
+    assert state['full_retrain'].startswith('F1 on new rows fell')
+    assert state['online']['rows_seen'] == 1300
+
+
+def test_new_class_triggers_a_full_retrain(csv_file):
+    update(csv_file)
+    append(csv_file, rows(100, 1).assign(label='maybe'))
+
+    state = update(csv_file)
+
+    assert state['full_retrain'] == "new target classes ['maybe']"
+    assert state['target_classes'] == ['maybe', 'no', 'yes']
+
+
+def test_config_change_triggers_a_full_retrain(csv_file):
+    update(csv_file)
+
+    state = update(csv_file, {**CONFIG, 'features': ['color']})
+
+    assert state['full_retrain'] == 'training configuration changed'
+
+
+def test_rewritten_data_triggers_a_full_retrain(csv_file):
+    update(csv_file)
+    rows(1200, 5).to_csv(csv_file, index=False)
+
+    state = update(csv_file)
+
+    assert state['full_retrain'] == 'training data was rewritten'
+    assert state['new_rows'] == 1200
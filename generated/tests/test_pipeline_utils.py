@@ -0,0 +1,105 @@
+# test_pipeline_utils.py
+"""
+Tests for the pipeline's stage cache keys, stored outputs and in-memory
+frames matching what reading a CSV file gives.
+"""
+
+import io
+import os
+import time
+import pandas as pd
+import pytest
+import pipeline_utils
+from pandas.testing import assert_frame_equal
+from pipeline_utils import StageCache, as_read_csv, frame_hash, rows_to_frame, stage_key
+
+
+def read_back(df):
+    """
+    What clean_data.py reads after the frame was written to CSV.
+    """
+    return pd.read_csv(io.StringIO(df.to_csv(index=False)))
+
+
+def test_stage_key_invalidation(monkeypatch):
+    key = stage_key('clean', 'abc', {'trim': True, 'nulls': 'rows'})
+
+    assert stage_key('clean', 'abc', {'nulls': 'rows', 'trim': True}) == key
+    assert stage_key('train', 'abc', {'trim': True, 'nulls': 'rows'}) != key
+    assert stage_key('clean', 'abd', {'trim': True, 'nulls': 'rows'}) != key
+    assert stage_key('clean', 'abc', {'trim': False, 'nulls': 'rows'}) != key
+    monkeypatch.setattr(pipeline_utils, 'PIPELINE_VERSION', pipeline_utils.PIPELINE_VERSION + 1)
+    assert stage_key('clean', 'abc', {'trim': True, 'nulls': 'rows'}) != key
+
+
+def test_frame_hash_sees_values_and_dtypes():
+    df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+
+    assert frame_hash(df.copy()) == frame_hash(df)
+    assert frame_hash(df.assign(a=[1, 3])) != frame_hash(df)
+    assert frame_hash(df.astype({'a': float})) != frame_hash(df)
+    assert frame_hash(df.rename(columns={'b': 'c'})) != frame_hash(df)
+
+
+@pytest.mark.parametrize('values', [
+    ['1', '2', '3'],
+    ['1.5', '', '2'],
+    ['1', 'NA', 'nan', None, '4'],
+    ['a', 'NA', 'N/A', ' NA', 'null ', ''],
+    ['1', '2', 'x'],
+    ['-3', '1e3', '0.25'],
+    ['True', 'False', 'TRUE', 'false'],
+    ['True', '', 'False'],
+    ['True', 'yes'],
+    [str(i) for i in range(150)] + ['late text'],
+])
+def test_as_read_csv_matches_reading_the_csv(values):
+    df = pd.DataFrame({'col': values, 'other': ['v'] * len(values)})
+
+    assert_frame_equal(as_read_csv(df), read_back(df))
+
+
+def test_rows_to_frame_matches_reading_the_csv():
+    rows = [{'title': 'Engineer', 'salary': '5000', 'city': ''}, {'title': 'NA', 'salary': '', 'city': 'Oslo'}]
+    df = rows_to_frame(rows, ['title', 'salary', 'city'])
+
+    assert_frame_equal(df, read_back(pd.DataFrame.from_records(rows, columns=['title', 'salary', 'city'])))
+    assert df['salary'].dtype == float
+
+
+def test_stage_cache_round_trip_and_expiry(tmp_path):
+    cache = StageCache(str(tmp_path / 'cache'))
+    df = pd.DataFrame({'a': [1, 2]})
+    cache.store('clean', 'k1', {'rows': 2}, df)
+
+    assert cache.meta('clean', 'k1')['rows'] == 2
+    assert cache.meta('clean', 'missing') is None
+    assert_frame_equal(cache.load_frame('clean', 'k1'), df)
+    time.sleep(0.05)
+    assert cache.meta('clean', 'k1', max_age=0.01) is None
+    assert cache.meta('clean', 'k1', max_age=60) is not None
+
+
+def test_stage_cache_keeps_the_most_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_utils, 'MAX_STAGE_ENTRIES', 2)
+    cache = StageCache(str(tmp_path / 'cache'))
+    for key in ('k1', 'k2'):
+        cache.store('clean', key, {}, pd.DataFrame({'a': [1]}))
+        time.sleep(0.01)
+    cache.meta('clean', 'k1')
+    time.sleep(0.01)
+    cache.store('clean', 'k3', {})
+
+    assert sorted(os.listdir(tmp_path / 'cache' / 'clean')) == ['k1.json', 'k1.pkl', 'k3.json']
+
+
+def test_export_is_current_until_the_file_changes(tmp_path):
+    cache = StageCache(str(tmp_path / 'cache'))
+    export = tmp_path / 'clean_data.csv'
+    export.write_text('a\n1\n')
+    cache.record_export(str(export), 'k1')
+
+    assert cache.export_current(str(export), 'k1')
+    assert not cache.export_current(str(export), 'k2')
+    export.write_text('a\n1\n2\n')
+    assert not cache.export_current(str(export), 'k1')
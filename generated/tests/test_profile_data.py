@@ -0,0 +1,27 @@
+# test_profile_data.py
+"""
+Tests for rebuilding stale profile and chart views sidecars.
+"""
+
+import pandas as pd
+from chart_utils import load_chart_views
+from profile_data import rebuild_sidecars
+from profile_utils import load_profile
+
+
+def test_rebuilds_both_sidecars_from_one_read(tmp_path, monkeypatch):
+    csv_file = str(tmp_path / 'clean.csv')
+    pd.DataFrame({'kind': ['NA', 'a', '', 'a', 'b'], 'value': [1, 2, 3, 4, 5]}).to_csv(csv_file, index=False)
+    reads = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(pd, 'read_csv', lambda *args, **kwargs: reads.append(args) or read_csv(*args, **kwargs))
+
+    assert rebuild_sidecars([csv_file]) == 2
+    assert len(reads) == 1
+    assert rebuild_sidecars([csv_file]) == 0
+
+    # Both treat the text 'NA' as a value and only the blank as missing
+    profile, views = load_profile(csv_file), load_chart_views(csv_file)
+    assert profile['columnStats'][0]['missingCount'] == 1
+    assert {item['value'] for item in profile['summary']['kind']} == {'NA', 'a', 'b'}
+    assert {item['value'] for item in views['groupCounts']['kind']} == {'NA', 'a', 'b'}
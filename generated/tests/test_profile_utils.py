@@ -0,0 +1,28 @@
+# test_profile_utils.py
+"""
+Tests for the exact and approximate dataset profiles.
+"""
+
+import pandas as pd
+from profile_utils import profile_csv_approximate, profile_dataframe, read_csv_cells
+
+
+def column(profile, name):
+    return next(info for info in profile['columns'] if info['name'] == name)
+
+
+def test_approximate_profile_counts_numbers_alike_across_chunks(tmp_path):
+    csv_file = str(tmp_path / 'data.csv')
+    # Only the second chunk holds blanks, so pandas reads it as float
+    ids = [str(i % 50) for i in range(100)]
+    ids[60] = ids[70] = ''
+    pd.DataFrame({'id': ids, 'name': [f'item {i}' for i in range(100)]}).to_csv(csv_file, index=False)
+
+    exact = profile_dataframe(read_csv_cells(csv_file))
+    approximate = profile_csv_approximate(csv_file, chunksize=50)
+
+    assert column(exact, 'id')['uniqueValues'] == 50
+    assert column(approximate, 'id')['uniqueValues'] == 50
+    assert column(approximate, 'id')['nullCount'] == 2
+    assert column(approximate, 'id')['sampleValues'] == column(exact, 'id')['sampleValues']
+    assert not any('.' in value for value in column(approximate, 'id')['sampleValues'])
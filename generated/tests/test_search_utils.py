@@ -0,0 +1,77 @@
+# test_search_utils.py
+"""
+Tests for successive halving and its time budget.
+"""
+
+import time
+import numpy as np
+import pytest
+import search_utils
+from search_utils import count_rungs, sample_candidates, successive_halving
+
+VARIANTS = [
+    {'name': 'baseline', 'label': 'No balancing', 'balancing': 'none'},
+    {'name': 'smote', 'label': 'SMOTE', 'balancing': 'smote'},
+]
+SPACE = {'max_depth': [2, 4, 8, None], 'min_samples_leaf': [1, 5], 'k_neighbors': [3, 5]}
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1200, 4))
+    y = (X[:, 0] + 0.5 * rng.normal(size=1200) > 0.8).astype(np.int64)
+    return X, y, np.arange(1000)
+
+
+@pytest.mark.parametrize('n, factor, expected', [
+    (243, 3, 6), (242, 3, 5), (9, 3, 3), (8, 3, 2), (1, 3, 1), (0, 3, 1), (1024, 2, 11),
+])
+def test_count_rungs(n, factor, expected):
+    assert count_rungs(n, factor) == expected
+
+
+def test_candidates_are_distinct():
+    candidates = sample_candidates(SPACE, VARIANTS, 'decision_tree', 20, 0)
+
+    keys = {(c['balancing'], tuple(sorted(c['params'].items(), key=str)), str(c.get('smote'))) for c in candidates}
+    assert len(keys) == len(candidates)
+    assert all('smote' not in c for c in candidates if c['balancing'] == 'none')
+
+
+def test_search_without_budget_completes_on_the_full_sample(data):
+    X, y, train_idx = data
+    candidates = sample_candidates(SPACE, VARIANTS, 'decision_tree', 9, 0)
+
+    result = successive_halving(candidates, 'decision_tree', X, y, train_idx, 0, n_cores=1)
+
+    assert result['completed'] and result['best'] is not None
+    assert [rung['candidates'] for rung in result['rungs']] == [len(candidates), 3]
+    assert result['rungs'][-1]['samples'] == 800
+
+
+def test_search_out_of_time_picks_no_candidate(data):
+    X, y, train_idx = data
+    candidates = sample_candidates(SPACE, VARIANTS, 'decision_tree', 9, 0)
+
+    result = successive_halving(candidates, 'decision_tree', X, y, train_idx, 0, n_cores=1, time_budget=0)
+
+    assert result == {**result, 'best': None, 'completed': False, 'rungs': [], 'leaderboard': []}
+
+
+def test_search_stopped_before_the_last_rung_picks_no_candidate(data, monkeypatch):
+    X, y, train_idx = data
+    candidates = sample_candidates(SPACE, VARIANTS, 'decision_tree', 9, 0)
+    run_variants = search_utils.run_variants
+
+    def slow_first_rung(*args, **kwargs):
+        trained = run_variants(*args, **kwargs)
+        time.sleep(max(0.0, kwargs['deadline'] - time.time()))
+        return trained
+    monkeypatch.setattr(search_utils, 'run_variants', slow_first_rung)
+
+    result = successive_halving(candidates, 'decision_tree', X, y, train_idx, 0, n_cores=1, time_budget=1)
+
+    assert result['best'] is None and not result['completed']
+    assert len(result['rungs']) == 1
+    assert len(result['leaderboard']) == len(candidates)
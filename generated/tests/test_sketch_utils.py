@@ -0,0 +1,118 @@
+# test_sketch_utils.py
+"""
+Tests that the sketches stay within the error bounds they report, also after
+merging sketches built on separate chunks.
+"""
+
+import numpy as np
+import pandas as pd
+from sketch_utils import FrequentItems, HyperLogLog, KLLQuantiles, as_text
+
+
+def test_hyperloglog_within_error_bound():
+    values = np.arange(200_000)
+    sketch = HyperLogLog()
+    sketch.add(values)
+
+    # Three standard errors
+    assert abs(sketch.estimate() - len(values)) <= 3 * sketch.relative_error() * len(values)
+
+
+def test_hyperloglog_small_counts_are_exact_enough():
+    sketch = HyperLogLog()
+    sketch.add(pd.Series(['a', 'b', 'c', 'a', 'b']))
+
+    assert sketch.estimate() == 3
+
+
+def test_hyperloglog_merge_counts_the_union():
+    left, right, whole = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.add(np.arange(0, 60_000))
+    right.add(np.arange(40_000, 100_000))
+    whole.add(np.arange(0, 100_000))
+
+    merged = left.merge(right)
+    assert np.array_equal(merged.registers, whole.registers)
+    assert abs(merged.estimate() - 100_000) <= 3 * merged.relative_error() * 100_000
+
+
+def test_kll_quantiles_within_rank_error():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(size=100_000)
+    sketch = KLLQuantiles(seed=0)
+    for chunk in np.array_split(values, 10):
+        sketch.add(chunk)
+
+    fractions = [0.01, 0.25, 0.5, 0.75, 0.99]
+    ordered = np.sort(values)
+    for fraction, estimate in zip(fractions, sketch.quantiles(fractions)):
+        rank = np.searchsorted(ordered, estimate) / len(values)
+        assert abs(rank - fraction) <= 3 * sketch.rank_error()
+
+
+def test_kll_merge_within_rank_error():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=50_000)
+    sketches = [KLLQuantiles(seed=i) for i in range(5)]
+    for sketch, chunk in zip(sketches, np.array_split(values, 5)):
+        sketch.add(chunk)
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+
+    assert merged.count == len(values)
+    median = merged.quantiles([0.5])[0]
+    rank = np.searchsorted(np.sort(values), median) / len(values)
+    assert abs(rank - 0.5) <= 3 * merged.rank_error()
+
+
+def test_kll_ignores_nan_and_empty():
+    sketch = KLLQuantiles()
+    assert sketch.quantiles([0.5]) == [None]
+    sketch.add([np.nan, 1.0, 2.0, 3.0])
+
+    assert sketch.count == 3
+    assert sketch.quantiles([0.0, 1.0]) == [1.0, 3.0]
+
+
+def test_frequent_items_bounds_hold_the_true_counts():
+    rng = np.random.default_rng(2)
+    values = pd.Series(rng.zipf(1.5, size=50_000) % 5_000).astype(str)
+    sketch = FrequentItems(capacity=64)
+    for start in range(0, len(values), 7_000):
+        sketch.add(values[start:start + 7_000])
+
+    counts = values.value_counts()
+    assert sketch.total == len(values)
+    assert sketch.max_error() <= len(values) / 64
+    for item in sketch.top(10):
+        assert item['lowerBound'] <= counts[item['value']] <= item['upperBound']
+    # The most frequent value is always reported first
+    assert sketch.top(1)[0]['value'] == counts.index[0]
+
+
+def test_frequent_items_merge_keeps_bounds():
+    values = pd.Series([str(i % 300) for i in range(30_000)] + ['hot'] * 5_000)
+    left, right = FrequentItems(capacity=32), FrequentItems(capacity=32)
+    left.add(values[:17_000])
+    right.add(values[17_000:])
+    merged = left.merge(right)
+
+    counts = values.value_counts()
+    assert merged.total == len(values)
+    for item in merged.top(5):
+        assert item['lowerBound'] <= counts[item['value']] <= item['upperBound']
+    assert merged.top(1)[0]['value'] == 'hot'
+
+
+def test_numbers_read_as_float_match_integers():
+    ints = pd.Series([1, 2, 3, 3])
+    floats = pd.Series([1.0, 2.0, None, 3.0])
+    distinct, frequent = HyperLogLog(), FrequentItems()
+    for values in (ints, floats.dropna()):
+        distinct.add(values)
+        frequent.add(values)
+
+    assert distinct.estimate() == 3
+    assert frequent.top(1) == [{'value': '3', 'lowerBound': 3, 'upperBound': 3}]
+    assert as_text(floats).tolist()[:2] == ['1', '2'] and pd.isna(as_text(floats)[2])
@@ -0,0 +1,92 @@
+# test_stage_utils.py
+"""
+Tests for stage timing and traced peak memory.
+"""
+
+import json
+import time
+import tracemalloc
+import pandas as pd
+from stage_utils import StageTimer, traced_peak
+
+MB = 2 ** 20
+
+
+def allocate(mb):
+    # Allocated and freed inside the block: only the peak sees it
+    block = bytearray(mb * MB)
+    del block
+
+
+def test_traced_peak_sees_freed_allocations():
+    with traced_peak() as memory:
+        allocate(20)
+
+    assert memory['peak_memory_mb'] >= 19
+    assert not tracemalloc.is_tracing()
+
+
+def test_nested_traced_peaks_carry_over_to_the_outer_block():
+    with traced_peak() as outer:
+        allocate(30)
+        with traced_peak() as inner:
+            allocate(10)
+        allocate(5)
+
+    assert 9 <= inner['peak_memory_mb'] < 25
+    assert outer['peak_memory_mb'] >= 29
+    assert not tracemalloc.is_tracing()
+
+
+def test_nested_stages():
+    timer = StageTimer(trace_memory=True)
+    with timer.stage('outer', 10) as record:
+        with timer.stage('inner', 5):
+            allocate(20)
+            time.sleep(0.02)
+        record['rows_out'] = 8
+
+    inner, outer = timer.stages
+    assert (inner['stage'], outer['stage']) == ('inner', 'outer')
+    assert outer['rows'] == 10 and outer['rows_out'] == 8
+    assert outer['wall_seconds'] >= inner['wall_seconds'] >= 0.02
+    assert outer['peak_memory_mb'] >= inner['peak_memory_mb'] >= 19
+
+
+def test_stage_is_recorded_when_the_block_raises():
+    timer = StageTimer()
+    try:
+        with timer.stage('failing'):
+            raise ValueError
+    except ValueError:
+        pass
+
+    assert [record['stage'] for record in timer.stages] == ['failing']
+    assert 'peak_memory_mb' not in timer.stages[0]
+
+
+def test_run_records_rows_in_and_out(tmp_path):
+    timer = StageTimer()
+    df = pd.DataFrame({'a': [1, 1, 2]})
+
+    result = timer.run('dedupe', lambda frame: frame.drop_duplicates(), df)
+    timer.add('remote', 1.23456, 3, cpu_seconds=0.5)
+    timer.save(str(tmp_path / 'stages.json'))
+
+    assert len(result) == 2
+    saved = json.loads((tmp_path / 'stages.json').read_text())['stages']
+    assert (saved[0]['rows'], saved[0]['rows_out']) == (3, 2)
+    assert saved[1] == {'stage': 'remote', 'rows': 3, 'wall_seconds': 1.2346, 'cpu_seconds': 0.5}
+
+
+def test_disabled_timer_records_nothing(tmp_path):
+    timer = StageTimer(enabled=False, trace_memory=True)
+    with timer.stage('load') as record:
+        record['rows_out'] = 1
+    assert timer.run('step', len, [1, 2]) == 2
+    timer.add('remote', 1.0)
+    timer.save(str(tmp_path / 'stages.json'))
+
+    assert timer.stages == []
+    assert not (tmp_path / 'stages.json').exists()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,88 @@
+# test_train_utils.py
+"""
+Tests for the core budget and the balancing strategies.
+"""
+
+import os
+import numpy as np
+import pytest
+from scipy import sparse
+from train_utils import balance, plan_core_budget
+
+STRATEGIES = ['none', 'class_weights', 'undersample', 'cluster_centroids', 'smote', 'smote_subset']
+
+
+def imbalanced(counts, seed=0):
+    """
+    Features shifted by class, with counts[c] rows of class c.
+    """
+    rng = np.random.default_rng(seed)
+    y = np.repeat(np.arange(len(counts)), counts)
+    return rng.normal(size=(len(y), 4)) + y[:, None], y
+
+
+@pytest.mark.parametrize('n_variants, n_cores, expected', [
+    (2, None, (2, 2)),
+    (3, None, (3, 1)),
+    (1, 16, (1, 4)),
+    (8, 100, (4, 1)),
+    (2, 2, (2, 1)),
+    (0, 0, (1, 4)),
+])
+def test_core_budget_is_capped_at_the_cpu_count(monkeypatch, n_variants, n_cores, expected):
+    monkeypatch.setattr(os, 'cpu_count', lambda: 4)
+
+    assert plan_core_budget(n_variants, n_cores) == expected
+
+
+def test_core_budget_without_a_cpu_count(monkeypatch):
+    monkeypatch.setattr(os, 'cpu_count', lambda: None)
+
+    assert plan_core_budget(3, 8) == (1, 1)
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_balancing_keeps_features_and_labels_aligned(strategy):
+    # The smallest class is below SMOTE's default k_neighbors
+    X, y = imbalanced([200, 50, 3])
+
+    X_bal, y_bal, params = balance(X, y, {'balancing': strategy}, 0, {})
+
+    counts = np.bincount(y_bal, minlength=3)
+    assert X_bal.shape == (len(y_bal), X.shape[1])
+    if strategy in ('none', 'class_weights'):
+        assert counts.tolist() == [200, 50, 3]
+    elif strategy in ('undersample', 'cluster_centroids'):
+        assert counts.tolist() == [3, 3, 3]
+    else:
+        assert counts.tolist() == [200, 200, 200]
+    assert params == ({'class_weight': 'balanced'} if strategy == 'class_weights' else {})
+
+
+@pytest.mark.parametrize('strategy', ['smote', 'smote_subset'])
+def test_smote_skips_a_single_row_class(strategy):
+    X, y = imbalanced([200, 1])
+
+    X_bal, y_bal, _ = balance(X, y, {'balancing': strategy}, 0, {})
+
+    assert np.bincount(y_bal).tolist() == [200, 1]
+    assert len(X_bal) == len(y_bal)
+
+
+def test_smote_subset_caps_each_class(monkeypatch):
+    monkeypatch.setattr('train_utils.SMOTE_SUBSET_PER_CLASS', 100)
+    X, y = imbalanced([300, 40])
+
+    X_bal, y_bal, _ = balance(sparse.csr_matrix(X), y, {'balancing': 'smote_subset'}, 0, {})
+
+    assert sparse.issparse(X_bal)
+    assert np.bincount(y_bal).tolist() == [100, 100]
+    assert X_bal.shape == (200, 4)
+
+
+def test_smote_neighbours_are_limited_by_the_smallest_class():
+    X, y = imbalanced([100, 4])
+
+    _, y_bal, _ = balance(X, y, {'balancing': 'smote', 'smote': {'k_neighbors': 10}}, 0, {})
+
+    assert np.bincount(y_bal).tolist() == [100, 100]
@@ -0,0 +1,104 @@
+# test_worker.py
+"""
+Tests for cancelling queued and running jobs in the warm worker.
+"""
+
+import json
+import os
+import sys
+import threading
+import pytest
+from worker import WORKER_DIR, Worker
+
+SLOW_SCRIPT = """
+import os, sys, time
+print('running', flush=True)
+os.chdir('..')
+sys.argv = ['changed']
+while True:
+    time.sleep(0.01)
+"""
+
+
+class EventLog:
+    """
+    Protocol stream collecting the worker's events.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.changed = threading.Condition()
+
+    def write(self, text: str):
+        with self.changed:
+            self.events.extend(json.loads(line) for line in text.splitlines() if line)
+            self.changed.notify_all()
+
+    def flush(self):
+        pass
+
+    def wait_for(self, predicate, timeout: float = 10):
+        with self.changed:
+            assert self.changed.wait_for(lambda: any(predicate(e) for e in self.events), timeout)
+
+
+def done(job_id):
+    return lambda event: event.get('event') == 'done' and event.get('id') == job_id
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ('slow', 'fast'):
+        (tmp_path / name).mkdir()
+    (tmp_path / 'slow' / 'predict.py').write_text(SLOW_SCRIPT)
+    (tmp_path / 'fast' / 'predict.py').write_text("print('fast')\n")
+
+    log = EventLog()
+    worker = Worker(out=log)
+    worker.thread.start()
+    yield worker, log, tmp_path
+    worker.jobs.put(None)
+    worker.thread.join(timeout=10)
+
+
+def run(worker, tmp_path, job_id, name):
+    worker.handle({'op': 'run', 'id': job_id, 'script': 'predict.py', 'cwd': str(tmp_path / name)})
+
+
+def test_cancel_running_job_restores_state(worker):
+    worker, log, tmp_path = worker
+    argv = sys.argv
+    run(worker, tmp_path, 'slow', 'slow')
+    run(worker, tmp_path, 'fast', 'fast')
+    log.wait_for(lambda e: e.get('event') == 'progress' and e.get('line') == 'running')
+
+    worker.handle({'op': 'cancel', 'id': 'slow'})
+    worker.handle({'op': 'cancel', 'id': 'slow'})
+    log.wait_for(done('fast'))
+
+    finished = [e for e in log.events if e.get('event') == 'done']
+    assert [(e['id'], e['status']) for e in finished] == [('slow', 'cancelled'), ('fast', 'succeeded')]
+    assert sys.argv is argv
+    assert os.getcwd() == WORKER_DIR
+
+
+def test_cancel_queued_job_never_starts(worker):
+    worker, log, tmp_path = worker
+    run(worker, tmp_path, 'slow', 'slow')
+    run(worker, tmp_path, 'fast', 'fast')
+    log.wait_for(lambda e: e.get('event') == 'started' and e.get('id') == 'slow')
+
+    worker.handle({'op': 'cancel', 'id': 'fast'})
+    worker.handle({'op': 'cancel', 'id': 'slow'})
+    log.wait_for(done('fast'))
+
+    assert not any(e.get('event') == 'started' and e.get('id') == 'fast' for e in log.events)
+    assert [e['status'] for e in log.events if done('fast')(e)] == ['cancelled']
+
+
+def test_rejects_unknown_scripts(worker):
+    worker, log, tmp_path = worker
+    worker.handle({'op': 'run', 'id': 'bad', 'script': 'rm.py', 'cwd': str(tmp_path / 'fast')})
+
+    assert log.events[-1] == {'event': 'error', 'id': 'bad', 'error': 'Unknown script: rm.py'}
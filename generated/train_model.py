@@ -16,16 +16,59 @@ import json
 import sys
 from datetime import datetime
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.tree import DecisionTreeClassifier
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     confusion_matrix, classification_report
 )
-from imblearn.over_sampling import SMOTE
+from feature_utils import label_encoder_from_classes, load_features
+from train_utils import run_variants
+from model_utils import save_model
+from online_utils import update_online_model
+from search_utils import sample_candidates, successive_halving
+from stage_utils import StageTimer
 import warnings
 warnings.filterwarnings('ignore')
 
+# Model variants compared by this run (trained concurrently)
+VARIANTS = [
+    {'name': 'baseline', 'title': 'Baseline Model', 'balancing': 'none', 'label': 'none'},
+    {'name': 'smote_balanced', 'title': 'SMOTE-Balanced Model', 'balancing': 'smote', 'label': 'SMOTE'},
+]
+
+# Parameter space explored when TRAINING_CONFIG['search'] is enabled
+SEARCH_SPACE = {
+    'max_depth': [None, 5, 10, 20, 40],
+    'min_samples_leaf': [1, 2, 5, 10],
+    'n_estimators': [50, 100, 200],
+    'k_neighbors': [1, 3, 5, 7],
+}
+
+# Configuration
+TRAINING_CONFIG = {
+    'target': 'contract_type',
+    'features': ["job_function","job_sector","job_title","experience_level","education_level"],
+    'model_type': 'decision_tree',
+    'balancing': 'smote',
+    'test_size': 0.2,
+    'random_state': 42,
+    'feature_encoding': 'label',
+    'n_cores': None,
+    'save_model': True,
+    'online_model': 'sgd',
+    'search': False,
+    'search_candidates': 27,
+    'search_time_budget': 60,
+    'profile_stages': True,
+    'trace_memory': False
+}
+
+# Reported with the results, since peak memory is left empty unless traced
+MEMORY_TRACING_NOTE = (
+    "Peak memory is recorded only when memory tracing is enabled: set "
+    "TRAINING_CONFIG['trace_memory'] = True, or traceMemory in the train-model "
+    "request. Tracing slows balancing and fitting, so it is off by default."
+)
+
 
 def detect_imbalance(y, target_name):
     """
@@ -117,119 +160,174 @@ def print_metrics(model_name, metrics):
     print(cm)
 
 
-def train_models(input_file: str, output_file: str, config: dict):
+def train_models(input_file: str, output_file: str, config: dict, df: pd.DataFrame = None, dataset: str = None):
     """
     Main training function.
+    
+    Args:
+        input_file: Cleaned CSV filename
+        output_file: Results JSON filename (nothing is written when None)
+        config: Training configuration
+        df: Cleaned DataFrame already in memory, used instead of reading input_file
+        dataset: Content hash of df, keying the feature cache
+        
+    Returns:
+        Results dict
     """
     start_time = datetime.now()
+    timer = StageTimer(config.get('profile_stages', True), config.get('trace_memory', False))
         
     try:
         print("Loading dataset...")
-        df = pd.read_csv(input_file)
-        
         target_col = config['target']
         feature_cols = config['features']
         
+        features = load_features(
+            input_file, feature_cols, target_col, config.get('feature_encoding', 'label'), timer, df, dataset
+        )
+        X, y = features['X'], features['y']
+        le = features['target_encoder']
         
-        df = df[df[target_col].notna()]
-        
-        le = LabelEncoder()
-        y = le.fit_transform(df[target_col].astype(str))
-        
-        imbalance_info = detect_imbalance(y, target_col)
-        
-        X = df[feature_cols].copy()
-        
-        encoders = {}
-        for col in X.columns:
-            if X[col].dtype == 'object' or X[col].dtype.name == 'category':
-                print(f"  Encoding '{col}'...")
-                le_feat = LabelEncoder()
-                X[col] = X[col].fillna('missing')
-                X[col] = le_feat.fit_transform(X[col].astype(str))
-                encoders[col] = le_feat
-        
-        X = X.fillna(0)
+        with timer.stage('imbalance_analysis', len(y)):
+            imbalance_info = detect_imbalance(y, target_col)
         
         print(f"\n Feature matrix shape: {X.shape}")
         
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
+        with timer.stage('split', len(y)):
+            train_idx, test_idx = train_test_split(
+                np.arange(len(y)), test_size=0.2, random_state=42, stratify=y
+            )
+            y_test = y[test_idx]
         
-        print(f"  Training set: {X_train.shape[0]} samples")
-        print(f"  Test set: {X_test.shape[0]} samples")
+        print(f"  Training set: {len(train_idx)} samples")
+        print(f"  Test set: {len(test_idx)} samples")
                 
-        model_baseline = DecisionTreeClassifier(random_state=42)
-        model_baseline.fit(X_train, y_train)
-        y_pred_baseline = model_baseline.predict(X_test)
+        variants = list(VARIANTS)
+        search = None
+        if config.get('search'):
+            candidates = sample_candidates(
+                SEARCH_SPACE, VARIANTS, config['model_type'],
+                config.get('search_candidates', 27), config['random_state']
+            )
+            with timer.stage('search', len(train_idx)):
+                search = successive_halving(
+                    candidates, config['model_type'], X, y, train_idx, config['random_state'],
+                    config.get('n_cores'), config.get('search_time_budget'), features['cache_path']
+                )
+            if search['best'] is None:
+                # Candidates were only compared on samples: keep the configured variants
+                print("⚠️  Search did not reach the full training set within its time budget, "
+                      "keeping the untuned model(s)")
+            else:
+                variants.append({
+                    **search['best'],
+                    'name': 'tuned',
+                    'title': 'Tuned Model',
+                    'label': f"{search['best']['label']} (tuned)"
+                })
         
-        metrics_baseline = calculate_metrics(y_test, y_pred_baseline, le)
-        print_metrics("Baseline Model", metrics_baseline)
+        with timer.stage('train', len(train_idx)):
+            trained = run_variants(
+                variants, config['model_type'], X, y, train_idx, test_idx,
+                config['random_state'], config.get('n_cores'), features['cache_path'],
+                trace_memory=config.get('trace_memory', False)
+            )
         
-
-        # Apply SMOTE for oversampling minority class
-        print("\nApplying SMOTE...")
-        smote = SMOTE(random_state=42)
-        X_train_balanced, y_train_balanced = smote.fit_resample(X_train, y_train)
-        print(f"  Original training set: {X_train.shape[0]} samples")
-        print(f"  Balanced training set: {X_train_balanced.shape[0]} samples")
-    
-        # Train balanced model with SMOTE
-        print("\nTraining model with SMOTE...")
-        model_balanced_smote = DecisionTreeClassifier(random_state=42)
-        model_balanced_smote.fit(X_train_balanced, y_train_balanced)
-        y_pred_balanced_smote = model_balanced_smote.predict(X_test)
-    
-        metrics_balanced_smote = calculate_metrics(y_test, y_pred_balanced_smote, le)
-        print_metrics("SMOTE-Balanced Model", metrics_balanced_smote)
-
+        # Per-variant stages, measured inside the (possibly separate) training processes
+        for variant in variants:
+            result = trained[variant['name']]
+            timer.add(f"balance [{variant['name']}]", result['balance_seconds'], len(train_idx),
+                      rows_out=result['train_samples'])
+            memory = {} if result['peak_memory_mb'] is None else {'peak_memory_mb': result['peak_memory_mb']}
+            timer.add(f"fit [{variant['name']}]", result['fit_seconds'], result['train_samples'],
+                      cpu_seconds=result['cpu_seconds'], **memory)
+            timer.add(f"predict [{variant['name']}]", result['predict_seconds'], len(test_idx))
+        
+        model_results = {}
+        for variant in variants:
+            with timer.stage(f"metrics [{variant['name']}]", len(test_idx)):
+                metrics = calculate_metrics(y_test, trained[variant['name']]['y_pred'], le)
+            print_metrics(variant['title'], metrics)
+            result = trained[variant['name']]
+            model_results[variant['name']] = {
+                'model_type': config['model_type'],
+                'balancing': variant['label'],
+                'metrics': metrics,
+                'cost': {
+                    'train_samples': result['train_samples'],
+                    'balance_seconds': round(result['balance_seconds'], 4),
+                    'fit_seconds': round(result['fit_seconds'], 4),
+                    'peak_memory_mb': None if result['peak_memory_mb'] is None else round(result['peak_memory_mb'], 2)
+                }
+            }
+        
+        best = max(variants, key=lambda v: model_results[v['name']]['metrics']['f1_score'])
+        model_path = None
+        if config.get('save_model', True):
+            with timer.stage('save_model'):
+                model_path = save_model(
+                    trained[best['name']]['model'], features, config, best,
+                    model_results[best['name']]['metrics']
+                )
         
         results = {
             'configuration': config,
             'dataset_info': {
-                'total_samples': int(len(df)),
-                'train_samples': int(len(X_train)),
-                'test_samples': int(len(X_test)),
+                'total_samples': int(len(y)),
+                'train_samples': int(len(train_idx)),
+                'test_samples': int(len(test_idx)),
                 'n_features': int(X.shape[1]),
                 'feature_names': feature_cols,
                 'target_classes': le.classes_.tolist()
             },
             'imbalance_analysis': imbalance_info,
-            'models': {
-                'baseline': {
-                    'model_type': 'decision_tree',
-                    'balancing': 'none',
-                    'metrics': metrics_baseline
-                }
+            'models': model_results,
+            'saved_model': {'variant': best['name'], 'path': model_path},
+            'search': {
+                'completed': search['completed'],
+                'best_params': search['best']['params'] if search['best'] else None,
+                'best_smote': search['best'].get('smote') if search['best'] else None,
+                'rungs': search['rungs'],
+                'leaderboard': search['leaderboard'],
+                'elapsed_seconds': search['elapsed']
+            } if search else None,
+            'stages': timer.stages,
+            'memory_tracing': {
+                'enabled': bool(config.get('trace_memory', False)),
+                'note': MEMORY_TRACING_NOTE
             },
             'training_date': datetime.now().isoformat()
-        }        
-
-        results['models']['smote_balanced'] = {
-            'model_type': 'decision_tree',
-            'balancing': 'SMOTE',
-            'metrics': metrics_balanced_smote
         }
-
         
+        if output_file:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        print("\nModel Comparison (F1-Score, balancing + fitting time, peak memory):")
+        for variant in variants:
+            entry = model_results[variant['name']]
+            peak = entry['cost']['peak_memory_mb']
+            print(
+                f"  {variant['title']}: {entry['metrics']['f1_score']:.4f} "
+                f"({entry['cost']['balance_seconds']:.2f}s + {entry['cost']['fit_seconds']:.2f}s"
+                f"{'' if peak is None else f', {peak:.1f} MB'})"
+            )
+        if not config.get('trace_memory', False):
+            print("  Peak memory not traced: set TRAINING_CONFIG['trace_memory'] = True to record it")
         
-        print("\nModel Comparison (F1-Score):")
-        print(f"  Baseline: {metrics_baseline['f1_score']:.4f}")
-        print(f"  SMOTE:    {metrics_balanced_smote['f1_score']:.4f}")
-
+        timer.print_summary()
         
         # Execution time
         end_time = datetime.now()
         execution_time = (end_time - start_time).total_seconds()
         
         print(f"\n⏱Total execution time: {execution_time:.2f} seconds")
-        print(f"Results saved to: {output_file}")
+        if output_file:
+            print(f"Results saved to: {output_file}")
         print("=" * 80)
         
+        return results
+        
     except Exception as e:
         print(f"\nError: {e}")
         import traceback
@@ -237,17 +335,84 @@ def train_models(input_file: str, output_file: str, config: dict):
         sys.exit(1)
 
 
+def train_online_model(input_file: str, output_file: str, config: dict):
+    """
+    Online training: updates a partial_fit model with the rows added since
+    the last checkpoint and reports its rolling holdout metrics.
+    """
+    start_time = datetime.now()
+    timer = StageTimer(config.get('profile_stages', True), config.get('trace_memory', False))
+    
+    try:
+        with timer.stage('update') as record:
+            state = update_online_model(input_file, config)
+            record['rows'] = state['new_rows']
+        online = state['online']
+        le = label_encoder_from_classes(state['target_classes'])
+        
+        y_seen = np.repeat(np.arange(len(online['class_counts'])), online['class_counts'])
+        imbalance_info = detect_imbalance(y_seen, config['target'])
+        
+        model_results = {}
+        if len(online['holdout_true']):
+            with timer.stage('metrics', len(online['holdout_true'])):
+                metrics = calculate_metrics(online['holdout_true'], online['holdout_pred'], le)
+            print_metrics("Online Model (rolling holdout)", metrics)
+            model_results['online'] = {
+                'model_type': state['model_type'],
+                'balancing': 'none',
+                'metrics': metrics
+            }
+        else:
+            print("\nNo holdout rows yet: metrics appear once the model has been updated with new rows")
+        
+        results = {
+            'configuration': config,
+            'dataset_info': {
+                'total_samples': int(online['rows_seen']),
+                'train_samples': int(online['rows_seen']),
+                'test_samples': int(len(online['holdout_true'])),
+                'n_features': len(state['features']) * state['sparse_spec']['hash_features'],
+                'feature_names': state['features'],
+                'target_classes': state['target_classes']
+            },
+            'imbalance_analysis': imbalance_info,
+            'models': model_results,
+            'online': {
+                'new_rows': state['new_rows'],
+                'full_retrain': state['full_retrain'],
+                'history': online['history']
+            },
+            'stages': timer.stages,
+            'memory_tracing': {
+                'enabled': bool(config.get('trace_memory', False)),
+                'note': MEMORY_TRACING_NOTE
+            },
+            'training_date': datetime.now().isoformat()
+        }
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        
+        timer.print_summary()
+        execution_time = (datetime.now() - start_time).total_seconds()
+        print(f"\n⏱Total execution time: {execution_time:.2f} seconds")
+        print(f"Results saved to: {output_file}")
+        print("=" * 80)
+        
+    except Exception as e:
+        print(f"\nError: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
 if __name__ == "__main__":
     INPUT_FILE = "clean_data.csv"
     OUTPUT_FILE = "model_results.json"
     
-    CONFIG = {
-        'target': 'contract_type',
-        'features': ["job_function","job_sector","job_title","experience_level","education_level"],
-        'model_type': 'decision_tree',
-        'balancing': 'smote',
-        'test_size': 0.2,
-        'random_state': 42
-    }
+    ONLINE = False
     
-    train_models(INPUT_FILE, OUTPUT_FILE, CONFIG)
+    if ONLINE:
+        train_online_model(INPUT_FILE, OUTPUT_FILE, TRAINING_CONFIG)
+    else:
+        train_models(INPUT_FILE, OUTPUT_FILE, TRAINING_CONFIG)
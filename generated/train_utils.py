@@ -0,0 +1,282 @@
+# train_utils.py
+"""
+Reusable model training utilities
+Builds and fits the model variants compared by train_model.py, running
+independent variants concurrently in a process pool.
+
+Balancing strategies:
+- 'none': train on the data as-is
+- 'smote': SMOTE oversampling with exact k-NN over the full training set
+- 'class_weights': reweight classes in the loss (nothing is materialised)
+- 'undersample': randomly drop majority-class rows
+- 'cluster_centroids': replace majority classes by k-means cluster representatives
+- 'smote_subset': SMOTE on a per-class capped sample, with approximate k-NN
+"""
+
+import multiprocessing
+import os
+import time
+from contextlib import nullcontext
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.neighbors import NearestNeighbors
+from sklearn.random_projection import SparseRandomProjection
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import RandomForestClassifier
+from imblearn.over_sampling import SMOTE
+from imblearn.under_sampling import ClusterCentroids, RandomUnderSampler
+from feature_utils import open_matrix
+from stage_utils import traced_peak
+
+MODEL_CLASSES = {
+    'decision_tree': DecisionTreeClassifier,
+    'random_forest': RandomForestClassifier,
+}
+
+# Pool workers start fresh instead of forking: the warm worker (worker.py) is
+# multi-threaded, and a forked child can inherit a lock held by another thread
+POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+SMOTE_SUBSET_PER_CLASS = 10_000
+PROJECTED_DIMENSIONS = 16
+
+
+class ProjectedNeighbors(NearestNeighbors):
+    """
+    Approximate nearest neighbours: exact search in a sparse random projection
+    of the features to a few dimensions, which keeps tree-based search fast on
+    wide (e.g. hashed) feature matrices.
+    """
+
+    def __init__(self, n_neighbors: int = 6, n_components: int = PROJECTED_DIMENSIONS,
+                 random_state: Optional[int] = None):
+        super().__init__(n_neighbors=n_neighbors)
+        self.n_components = n_components
+        self.random_state = random_state
+
+    def _project(self, X):
+        return X if self.projection_ is None else self.projection_.transform(X)
+
+    def fit(self, X, y=None):
+        self.projection_ = None
+        if X.shape[1] > self.n_components:
+            self.projection_ = SparseRandomProjection(
+                n_components=self.n_components, dense_output=True, random_state=self.random_state
+            ).fit(X)
+        return super().fit(self._project(X))
+
+    def kneighbors(self, X=None, n_neighbors=None, return_distance=True):
+        return super().kneighbors(None if X is None else self._project(X), n_neighbors, return_distance)
+
+
+def plan_core_budget(n_variants: int, n_cores: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Splits a core budget between concurrent variants and each model's own n_jobs.
+
+    Args:
+        n_variants: Number of independent variants to train
+        n_cores: Cores available (defaults to all cores, and never more)
+
+    Returns:
+        Tuple of (worker processes, n_jobs per model)
+    """
+    cpu_count = os.cpu_count() or 1
+    n_cores = max(1, min(n_cores or cpu_count, cpu_count))
+    workers = max(1, min(n_variants, n_cores))
+    return workers, max(1, n_cores // workers)
+
+
+def make_model(model_type: str, random_state: int, n_jobs: int = 1, **params):
+    """
+    Creates an unfitted estimator.
+
+    Args:
+        model_type: 'decision_tree' or 'random_forest'
+        random_state: Random seed
+        n_jobs: Parallel jobs for estimators that support it
+        **params: Extra estimator parameters (e.g. class_weight, max_depth)
+
+    Returns:
+        scikit-learn estimator
+    """
+    model_class = MODEL_CLASSES[model_type]
+    if model_type == 'random_forest':
+        params['n_jobs'] = n_jobs
+    return model_class(random_state=random_state, **params)
+
+
+def balance(X_train, y_train, variant: Dict, random_state: int, params: Dict) -> Tuple:
+    """
+    Applies a variant's balancing strategy to the training set.
+
+    Args:
+        X_train: Training features
+        y_train: Training labels
+        variant: Variant dict ('balancing' and optional 'smote' parameters)
+        random_state: Random seed
+        params: Estimator parameters (class weights are added here)
+
+    Returns:
+        Tuple of (training features, training labels, estimator parameters)
+    """
+    strategy = variant['balancing']
+
+    if strategy == 'class_weights':
+        params['class_weight'] = 'balanced'
+
+    elif strategy == 'undersample':
+        X_train, y_train = RandomUnderSampler(random_state=random_state).fit_resample(X_train, y_train)
+
+    elif strategy == 'cluster_centroids':
+        sampler = ClusterCentroids(
+            estimator=MiniBatchKMeans(n_init=1, random_state=random_state),
+            voting='hard', random_state=random_state
+        )
+        X_train, y_train = sampler.fit_resample(X_train, y_train)
+
+    elif strategy in ('smote', 'smote_subset'):
+        if strategy == 'smote_subset':
+            classes, counts = np.unique(y_train, return_counts=True)
+            caps = {cls: int(min(count, SMOTE_SUBSET_PER_CLASS)) for cls, count in zip(classes, counts)}
+            X_train, y_train = RandomUnderSampler(sampling_strategy=caps, random_state=random_state).fit_resample(X_train, y_train)
+
+        smote_params = dict(variant.get('smote', {}))
+        # SMOTE needs fewer neighbours than the smallest class has other members
+        smallest = np.unique(y_train, return_counts=True)[1].min()
+        k = min(smote_params.pop('k_neighbors', 5), smallest - 1)
+        if k >= 1:
+            neighbors = ProjectedNeighbors(k + 1, random_state=random_state) if strategy == 'smote_subset' else k
+            smote = SMOTE(k_neighbors=neighbors, random_state=random_state, **smote_params)
+            X_train, y_train = smote.fit_resample(X_train, y_train)
+
+    return X_train, y_train, params
+
+
+def fit_variant(variant: Dict, model_type: str, X, y, train_idx, test_idx,
+                random_state: int, n_jobs: int = 1, trace_memory: bool = False,
+                deadline: Optional[float] = None) -> Optional[Dict]:
+    """
+    Balances the training set as the variant requires, fits the model and
+    predicts the test set.
+
+    Args:
+        variant: Dict with 'name', 'balancing' (see module docstring),
+                 optional model 'params' and optional 'smote' parameters
+        model_type: 'decision_tree' or 'random_forest'
+        X: Feature matrix (dense or CSR), or the path of a feature cache
+           entry to memory-map (see feature_utils.open_matrix)
+        y: Encoded target vector
+        train_idx: Row indices of the training set
+        test_idx: Row indices of the test set
+        random_state: Random seed
+        n_jobs: Parallel jobs for the estimator
+        trace_memory: Trace the peak memory allocated while balancing and
+                      fitting (tracemalloc slows both down, so times are
+                      only comparable between runs with the same setting)
+        deadline: time.time() after which the variant is skipped instead of
+                  fitted (wall clock, so it holds across worker processes)
+
+    Returns:
+        Dict with the variant name, fitted model, test predictions, training
+        set size, balancing, model fitting and prediction times (separately),
+        the CPU time of the fit, and the traced peak memory in MB (None unless traced;
+        memory allocated inside compiled estimator code is not included), or
+        None if the deadline had passed
+    """
+    if deadline is not None and time.time() >= deadline:
+        return None
+    params = dict(variant.get('params', {}))
+
+    with traced_peak() if trace_memory else nullcontext({}) as memory:
+        if isinstance(X, str):
+            X = open_matrix(X)
+        X_train, y_train = X[train_idx], y[train_idx]
+
+        balance_start = time.perf_counter()
+        X_train, y_train, params = balance(X_train, y_train, variant, random_state, params)
+        balance_seconds = time.perf_counter() - balance_start
+
+        model = make_model(model_type, random_state, n_jobs, **params)
+        fit_start = time.perf_counter()
+        cpu_start = time.process_time()
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - fit_start
+        cpu_seconds = time.process_time() - cpu_start
+
+    predict_start = time.perf_counter()
+    y_pred = model.predict(X[test_idx])
+
+    return {
+        'name': variant['name'],
+        'model': model,
+        'y_pred': y_pred,
+        'train_samples': int(len(y_train)),
+        'balance_seconds': balance_seconds,
+        'fit_seconds': fit_seconds,
+        'predict_seconds': time.perf_counter() - predict_start,
+        'cpu_seconds': cpu_seconds,
+        'peak_memory_mb': memory.get('peak_memory_mb'),
+    }
+
+
+def run_variants(variants: List[Dict], model_type: str, X, y, train_idx, test_idx,
+                 random_state: int, n_cores: Optional[int] = None,
+                 X_path: Optional[str] = None, verbose: bool = True,
+                 trace_memory: bool = False, deadline: Optional[float] = None) -> Dict[str, Dict]:
+    """
+    Trains independent model variants, concurrently when the core budget allows.
+    When X comes from the feature cache, worker processes are handed its path
+    so they all map the same copy of the data instead of receiving a pickled one.
+
+    Args:
+        variants: Variant dicts (see fit_variant)
+        model_type: 'decision_tree' or 'random_forest'
+        X: Feature matrix (dense or CSR)
+        y: Encoded target vector
+        train_idx: Row indices of the training set
+        test_idx: Row indices of the test set
+        random_state: Random seed
+        n_cores: Core budget (defaults to all cores)
+        X_path: Feature cache entry holding X (see feature_utils.load_features)
+        verbose: Print the worker plan and each variant's fit time
+        trace_memory: Trace each variant's peak memory (see fit_variant)
+        deadline: time.time() after which variants not yet started are skipped
+
+    Returns:
+        Dict mapping variant name to its fit_variant result, in variant order
+        (skipped variants are left out)
+    """
+    workers, n_jobs = plan_core_budget(len(variants), n_cores)
+    if verbose:
+        print(f"\nTraining {len(variants)} variants with {workers} worker(s), n_jobs={n_jobs} each...")
+
+    y = np.asarray(y)
+    if workers == 1:
+        results = [
+            fit_variant(v, model_type, X, y, train_idx, test_idx, random_state, n_jobs, trace_memory, deadline)
+            for v in variants
+        ]
+    else:
+        shared_X = X_path or X
+        context = multiprocessing.get_context(POOL_START_METHOD)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(fit_variant, v, model_type, shared_X, y, train_idx, test_idx, random_state, n_jobs,
+                            trace_memory, deadline)
+                for v in variants
+            ]
+            results = [future.result() for future in futures]
+    results = [result for result in results if result is not None]
+
+    if verbose:
+        for result in results:
+            peak = result['peak_memory_mb']
+            print(
+                f"  {result['name']}: fitted on {result['train_samples']} samples in {result['fit_seconds']:.2f}s "
+                f"(balancing {result['balance_seconds']:.2f}s"
+                f"{'' if peak is None else f', peak {peak:.1f} MB'})"
+            )
+
+    return {result['name']: result for result in results}
@@ -0,0 +1,325 @@
+"""
+Warm Worker Script
+Long-lived process that keeps pandas, scikit-learn, imbalanced-learn and bs4
+imported and runs the generated scripts on request, so a request does not pay
+interpreter startup and imports again.
+
+Protocol: one JSON object per line on stdin, one per line on stdout. The
+worker keeps its original stdout for protocol messages only and points fd 1
+at stderr, so output written by compiled code cannot corrupt the protocol.
+
+Requests:
+  {"op": "run", "id": "job-1", "script": "train_model.py", "args": [], "cwd": "jobs/job-1"}
+  {"op": "cancel", "id": "job-1"}
+  {"op": "ping"}
+  {"op": "shutdown"}
+
+Events:
+  {"event": "ready", "pid": 123, "preloaded": [...], "seconds": 2.1}
+  {"event": "queued", "id": "job-1", "position": 0}
+  {"event": "started", "id": "job-1"}
+  {"event": "progress", "id": "job-1", "stream": "stdout", "line": "..."}
+  {"event": "done", "id": "job-1", "status": "succeeded", "exit_code": 0, "seconds": 1.3}
+  {"event": "pong", "pid": 123, "running": "job-1", "queued": 0}
+  {"event": "error", "id": "job-1", "error": "..."}
+
+Jobs run one at a time, in the order received, in "cwd" when given (the
+script is then read from there) and next to this file otherwise. Scripts are
+re-read on every run (the API rewrites them with each configuration); the
+utility modules they import stay loaded. Cancelling a running job raises
+JobCancelled in it at the next Python instruction, so a long compiled call
+(e.g. a single tree fit) finishes first. The job thread clears any pending
+cancellation before it restores the working directory and argv, so that
+restore cannot be interrupted.
+
+Usage: python worker.py
+"""
+
+import ctypes
+import importlib
+import io
+import json
+import os
+import queue
+import runpy
+import sys
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Dict, Optional
+
+WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Scripts a request may run (from this directory or the job's cwd)
+ALLOWED_SCRIPTS = {'scraper.py', 'clean_data.py', 'train_model.py', 'predict.py'}
+
+# Imported once at startup; they pull in pandas, scikit-learn, imblearn and bs4
+PRELOAD_MODULES = [
+    'scraper_utils', 'csv_utils', 'clean_utils', 'incremental_utils', 'profile_utils',
+    'chart_utils', 'stage_utils', 'feature_utils', 'train_utils', 'model_utils',
+    'online_utils', 'search_utils',
+]
+
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a running job when it is cancelled. Derives from
+    BaseException so the scripts' `except Exception` handlers do not catch it.
+    """
+
+
+class _ProgressStream(io.TextIOBase):
+    """
+    File-like object that turns every complete line written to it into a
+    progress event.
+    """
+
+    def __init__(self, emit, job_id: str, stream: str):
+        self.emit = emit
+        self.job_id = job_id
+        self.stream = stream
+        self.pending = ''
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.pending += text
+        *lines, self.pending = self.pending.split('\n')
+        for line in lines:
+            self.emit({'event': 'progress', 'id': self.job_id, 'stream': self.stream, 'line': line})
+        return len(text)
+
+    def flush(self):
+        if self.pending:
+            self.write('\n')
+
+
+class Worker:
+    """
+    Runs queued jobs on a single job thread and reports events on the
+    protocol stream.
+    """
+
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self.out_lock = threading.Lock()
+        self.jobs: 'queue.Queue[Optional[Dict]]' = queue.Queue()
+        self.cancelled = set()
+        self.current: Optional[Dict] = None
+        self.current_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._job_loop, name='job', daemon=True)
+
+    def emit(self, event: Dict):
+        """
+        Writes one event line to the protocol stream.
+
+        Args:
+            event: JSON-serialisable event
+        """
+        with self.out_lock:
+            self.out.write(json.dumps(event) + '\n')
+            self.out.flush()
+
+    def preload(self):
+        """
+        Imports the modules the generated scripts use, skipping those whose
+        dependencies are not installed.
+        """
+        start = time.perf_counter()
+        loaded = []
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+                loaded.append(name)
+            except ImportError as e:
+                print(f"  Skipping preload of {name}: {e}", file=sys.stderr)
+        self.emit({
+            'event': 'ready',
+            'pid': os.getpid(),
+            'preloaded': loaded,
+            'seconds': round(time.perf_counter() - start, 3),
+        })
+
+    def handle(self, request: Dict) -> bool:
+        """
+        Handles one protocol request.
+
+        Args:
+            request: Decoded request
+
+        Returns:
+            False once the worker should shut down
+        """
+        op = request.get('op')
+        job_id = request.get('id')
+
+        if op == 'run':
+            script = request.get('script')
+            cwd = os.path.abspath(request.get('cwd') or WORKER_DIR)
+            if script not in ALLOWED_SCRIPTS or not os.path.isfile(os.path.join(cwd, script)):
+                self.emit({'event': 'error', 'id': job_id, 'error': f"Unknown script: {script}"})
+                return True
+            self.emit({'event': 'queued', 'id': job_id, 'position': self.jobs.qsize()})
+            self.jobs.put({
+                'id': job_id,
+                'script': script,
+                'args': [str(a) for a in request.get('args', [])],
+                'cwd': cwd,
+            })
+        elif op == 'cancel':
+            self.cancel(job_id)
+        elif op == 'ping':
+            with self.current_lock:
+                running = self.current['id'] if self.current else None
+            self.emit({'event': 'pong', 'pid': os.getpid(), 'running': running, 'queued': self.jobs.qsize()})
+        elif op == 'shutdown':
+            return False
+        else:
+            self.emit({'event': 'error', 'id': job_id, 'error': f"Unknown op: {op}"})
+        return True
+
+    def cancel(self, job_id: str):
+        """
+        Cancels a queued or running job.
+
+        Args:
+            job_id: Job id
+        """
+        with self.current_lock:
+            if job_id in self.cancelled:
+                return
+            self.cancelled.add(job_id)
+            current = self.current
+            if current and current['id'] == job_id:
+                # Deliver JobCancelled asynchronously into the job thread
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self.thread.ident), ctypes.py_object(JobCancelled)
+                )
+
+    def _job_loop(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            with self.current_lock:
+                if job['id'] in self.cancelled:
+                    self.cancelled.discard(job['id'])
+                    self.emit({'event': 'done', 'id': job['id'], 'status': 'cancelled', 'exit_code': None, 'seconds': 0})
+                    continue
+                self.current = job
+            argv = sys.argv
+            try:
+                self._run(job)
+            except JobCancelled:
+                # Cancelled outside the script itself (while starting or finishing)
+                self._finish(job, argv)
+                self.emit({'event': 'done', 'id': job['id'], 'status': 'cancelled', 'exit_code': None, 'seconds': 0})
+
+    def _run(self, job: Dict):
+        """
+        Runs a script as __main__ with its output streamed as progress events.
+        """
+        self.emit({'event': 'started', 'id': job['id']})
+        stdout = _ProgressStream(self.emit, job['id'], 'stdout')
+        stderr = _ProgressStream(self.emit, job['id'], 'stderr')
+        argv = sys.argv
+        start = time.perf_counter()
+        status, exit_code, error = 'succeeded', 0, None
+
+        try:
+            sys.argv = [job['script']] + job['args']
+            os.chdir(job['cwd'])
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                try:
+                    runpy.run_path(os.path.join(job['cwd'], job['script']), run_name='__main__')
+                finally:
+                    stdout.flush()
+                    stderr.flush()
+        except JobCancelled:
+            status, exit_code = 'cancelled', None
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if exit_code != 0:
+                status = 'failed'
+        except Exception as e:
+            status, exit_code, error = 'failed', 1, str(e)
+            for line in traceback.format_exc().rstrip().split('\n'):
+                self.emit({'event': 'progress', 'id': job['id'], 'stream': 'stderr', 'line': line})
+        finally:
+            self._finish(job, argv)
+
+        event = {'event': 'done', 'id': job['id'], 'status': status, 'exit_code': exit_code,
+                 'seconds': round(time.perf_counter() - start, 3)}
+        if error:
+            event['error'] = error
+        self.emit(event)
+
+    def _finish(self, job: Dict, argv):
+        """
+        Detaches the finished job and restores the worker's argv and working
+        directory. Safe to call twice, when a cancellation lands in the first
+        call before it is cleared.
+
+        Args:
+            job: Finished job
+            argv: Worker's own argv
+        """
+        with self.current_lock:
+            self.current = None
+            self.cancelled.discard(job['id'])
+            # cancel() no longer targets this thread; drop a cancellation it already sent
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self.thread.ident), None)
+        sys.argv = argv
+        os.chdir(WORKER_DIR)
+
+    def serve(self, requests=None):
+        """
+        Reads requests until shutdown or end of input, then cancels the
+        running job and waits for the job thread.
+
+        Args:
+            requests: Iterable of request lines (defaults to stdin)
+        """
+        self.thread.start()
+        self.preload()
+
+        for line in requests or sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.emit({'event': 'error', 'id': None, 'error': f"Invalid request: {e}"})
+                continue
+            if not self.handle(request):
+                break
+
+        # Drop queued jobs and stop the running one
+        while not self.jobs.empty():
+            job = self.jobs.get_nowait()
+            if job is not None:
+                self.emit({'event': 'done', 'id': job['id'], 'status': 'cancelled', 'exit_code': None, 'seconds': 0})
+        with self.current_lock:
+            running = self.current['id'] if self.current else None
+        if running:
+            self.cancel(running)
+        self.jobs.put(None)
+        self.thread.join()
+
+
+if __name__ == "__main__":
+    # Generated scripts use paths relative to this directory
+    os.chdir(WORKER_DIR)
+    if WORKER_DIR not in sys.path:
+        sys.path.insert(0, WORKER_DIR)
+
+    # Keep the original stdout for protocol messages and send anything else
+    # written to fd 1 (e.g. by compiled code) to stderr
+    protocol = os.fdopen(os.dup(1), 'w', encoding='utf-8', buffering=1)
+    sys.stdout.flush()
+    os.dup2(2, 1)
+
+    Worker(out=protocol).serve()